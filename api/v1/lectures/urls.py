@@ -4,6 +4,22 @@ from . import views
 urlpatterns = [
     # Lecture progress endpoints
     path("<int:lecture_id>/progress/", views.lecture_progress, name="lecture_progress"),
+    # Player state for in-place lecture switching
+    path(
+        "<int:lecture_id>/player-state/",
+        views.player_state,
+        name="lecture_player_state",
+    ),
+    # Byte offset of a playback time
+    path("<int:lecture_id>/seek/", views.lecture_seek, name="lecture_seek"),
+    # Peaks for the waveform scrubber
+    path(
+        "<int:lecture_id>/waveform/",
+        views.lecture_waveform,
+        name="lecture_waveform",
+    ),
+    # Audio with byte ranges
+    path("<int:lecture_id>/audio/", views.lecture_audio, name="lecture_audio"),
     # Set current lecture
     path(
         "<int:lecture_id>/set-current/",
@@ -1,15 +1,134 @@
-from django.shortcuts import get_object_or_404
+import math
+import mimetypes
+import os
+
+from django.conf import settings
+from django.db.models import Exists, OuterRef, Value
+from django.http import Http404, HttpResponse
+from django.shortcuts import get_object_or_404, redirect
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
+from django.views.decorators.http import require_safe
 from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.exceptions import ValidationError
+from rest_framework.fields import BooleanField
+from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from apps.lecture.models import (
     Lecture,
-    LectureProgress,
     CurrentLecture,
     FavoriteLecture,
     LectureHistory,
     LectureMarker,
 )
+from apps.lecture.services import (
+    ListenerPresence,
+    ProgressManager,
+    SeekIndex,
+    TopicIndex,
+    Waveform,
+)
+from apps.system.decorators import track_activity
+from apps.system.services import FileOffload, FileStream, Logger
+
+logger = Logger(app_name="api_lectures")
+
+
+def marker_data(marker):
+    return {
+        "id": marker.id,
+        "timestamp": marker.timestamp,
+        "text": marker.text,
+        "formatted_timestamp": marker.formatted_timestamp,
+    }
+
+
+def progress_data(progress):
+    if not progress:
+        return {
+            "current_time": 0,
+            "progress_percentage": 0,
+            "completed": False,
+            "listen_count": 0,
+        }
+
+    return {
+        "current_time": progress.current_time,
+        "progress_percentage": progress.progress_percentage,
+        "completed": progress.completed,
+        "listen_count": progress.listen_count,
+    }
+
+
+@api_view(["GET"])
+@permission_classes([AllowAny])
+@track_activity(view_name="lecture_player")
+def player_state(request, lecture_id):
+    """Everything the player needs to switch to a lecture in place, logged as
+    a view of the lecture page it replaces"""
+    user = request.user
+    lectures = Lecture.objects.select_related("topic", "waveform").defer(
+        "waveform__peaks"
+    )
+
+    if user.is_authenticated:
+        lectures = lectures.annotate(
+            is_favorite=Exists(
+                FavoriteLecture.objects.filter(user=user, lecture=OuterRef("pk"))
+            )
+        )
+    else:
+        lectures = lectures.annotate(is_favorite=Value(False))
+
+    lecture = get_object_or_404(lectures, id=lecture_id)
+    topic = lecture.topic
+
+    progress = None
+    markers = []
+    if user.is_authenticated:
+        progress = ProgressManager(user).get(lecture)
+        markers = LectureMarker.objects.filter(user=user, lecture=lecture).order_by(
+            "timestamp"
+        )
+
+    index = TopicIndex(topic.id)
+    prev_id, next_id = index.neighbors(lecture.id)
+
+    try:
+        listeners_count = ListenerPresence().count_for_lecture(lecture.id)
+    except Exception as e:
+        logger.error(f"Listener presence unavailable: {str(e)}")
+        listeners_count = 0
+
+    return Response(
+        {
+            "lecture": {
+                "id": lecture.id,
+                "title": lecture.title,
+                "audio_url": lecture.audio_url,
+                "content_hash": lecture.content_hash,
+                "manifest_url": lecture.manifest_url,
+                "waveform_url": lecture.waveform_url,
+                "duration": lecture.duration or 0,
+                "file_size_mb": lecture.file_size_mb,
+                "order": lecture.order,
+            },
+            "topic": {"id": topic.id, "title": topic.title},
+            "navigation": {
+                "prev_id": prev_id,
+                "next_id": next_id,
+                "position": index.position(lecture.id),
+                "total": len(index),
+                "remaining_duration": index.remaining_duration(
+                    lecture.id, progress.current_time if progress else 0
+                ),
+            },
+            "progress": progress_data(progress) if progress else None,
+            "is_favorite": lecture.is_favorite,
+            "markers": [marker_data(marker) for marker in markers],
+            "listeners_count": listeners_count,
+        }
+    )
 
 
 @api_view(["GET", "POST"])
@@ -18,55 +137,23 @@ def lecture_progress(request, lecture_id):
     """Get or update lecture progress"""
     lecture = get_object_or_404(Lecture, id=lecture_id)
 
+    manager = ProgressManager(request.user)
+
     if request.method == "GET":
-        progress = LectureProgress.objects.filter(
-            user=request.user, lecture=lecture
-        ).first()
-
-        if progress:
-            return Response(
-                {
-                    "current_time": progress.current_time,
-                    "progress_percentage": progress.progress_percentage,
-                    "completed": progress.completed,
-                    "listen_count": progress.listen_count,
-                }
-            )
-        else:
-            return Response(
-                {
-                    "current_time": 0,
-                    "progress_percentage": 0,
-                    "completed": False,
-                    "listen_count": 0,
-                }
-            )
+        return Response(progress_data(manager.get(lecture)))
 
     elif request.method == "POST":
         current_time = request.data.get("current_time", 0)
-        completed = request.data.get("completed", False)
+        try:
+            completed = BooleanField().to_internal_value(
+                request.data.get("completed", False)
+            )
+        except ValidationError:
+            return Response({"error": "Invalid completed flag"}, status=400)
 
-        progress, created = LectureProgress.objects.update_or_create(
-            user=request.user,
-            lecture=lecture,
-            defaults={"current_time": current_time, "completed": completed},
-        )
+        progress = manager.save(lecture, current_time, completed)
 
-        if completed:
-            progress.listen_count += 1
-            progress.save(update_fields=["listen_count", "updated_at"])
-        else:
-            progress.save(update_fields=["updated_at"])
-
-        return Response(
-            {
-                "success": True,
-                "current_time": progress.current_time,
-                "progress_percentage": progress.progress_percentage,
-                "completed": progress.completed,
-                "listen_count": progress.listen_count,
-            }
-        )
+        return Response({"success": True, **progress_data(progress)})
 
 
 @api_view(["POST"])
@@ -83,9 +170,7 @@ def set_current_lecture(request, lecture_id):
     # Save to lecture history
     from django.utils import timezone
 
-    progress = LectureProgress.objects.filter(
-        user=request.user, lecture=lecture
-    ).first()
+    progress = ProgressManager(request.user).get(lecture)
 
     completion_percentage = progress.progress_percentage if progress else 0.0
     duration_listened = int(progress.current_time) if progress else 0
@@ -137,18 +222,7 @@ def lecture_markers(request, lecture_id):
             user=request.user, lecture=lecture
         ).order_by("timestamp")
 
-        data = []
-        for marker in markers:
-            data.append(
-                {
-                    "id": marker.id,
-                    "timestamp": marker.timestamp,
-                    "text": marker.text,
-                    "formatted_timestamp": marker.formatted_timestamp,
-                }
-            )
-
-        return Response({"markers": data})
+        return Response({"markers": [marker_data(marker) for marker in markers]})
 
     elif request.method == "POST":
         timestamp = request.data.get("timestamp")
@@ -164,17 +238,7 @@ def lecture_markers(request, lecture_id):
             user=request.user, lecture=lecture, timestamp=timestamp, text=text
         )
 
-        return Response(
-            {
-                "success": True,
-                "marker": {
-                    "id": marker.id,
-                    "timestamp": marker.timestamp,
-                    "text": marker.text,
-                    "formatted_timestamp": marker.formatted_timestamp,
-                },
-            }
-        )
+        return Response({"success": True, "marker": marker_data(marker)})
 
 
 @api_view(["PUT", "DELETE"])
@@ -192,18 +256,122 @@ def marker_detail(request, marker_id):
         marker.text = text
         marker.save()
 
-        return Response(
-            {
-                "success": True,
-                "marker": {
-                    "id": marker.id,
-                    "timestamp": marker.timestamp,
-                    "text": marker.text,
-                    "formatted_timestamp": marker.formatted_timestamp,
-                },
-            }
-        )
+        return Response({"success": True, "marker": marker_data(marker)})
 
     elif request.method == "DELETE":
         marker.delete()
         return Response({"success": True})
+
+
+@api_view(["GET"])
+@permission_classes([AllowAny])
+def lecture_seek(request, lecture_id):
+    """Byte offset of the audio frame to play ``?t=`` seconds from"""
+    lecture = get_object_or_404(
+        Lecture.objects.only("id", "content_hash"), id=lecture_id
+    )
+
+    try:
+        seconds = float(request.query_params.get("t", 0))
+    except ValueError:
+        return Response({"error": "Invalid time"}, status=400)
+    if not math.isfinite(seconds):
+        return Response({"error": "Invalid time"}, status=400)
+
+    seek_index = SeekIndex.for_lecture(lecture)
+    if seek_index is None:
+        return Response({"error": "Seek index not built"}, status=404)
+
+    time, offset = seek_index.lookup(seconds)
+    return Response(
+        {
+            "time": time,
+            "offset": offset,
+            "data_end": seek_index.data_end,
+            "duration": seek_index.duration,
+        }
+    )
+
+
+@require_safe
+def lecture_waveform(request, lecture_id):
+    """Waveform peaks of a lecture, one unsigned byte per bucket.
+
+    Raw bytes, about 1 KB, so a plain Django view. The player requests it
+    as ``?v=<waveform version>``, which changes with the audio and with
+    every recompute of the peaks; that URL is cached for
+    ``WAVEFORM_CACHE_MAX_AGE`` without revalidation.
+    """
+    waveform = Waveform.current(lecture_id)
+    if waveform is None:
+        raise Http404("Waveform not built")
+
+    etag = quote_etag(waveform.version)
+    conditional = get_conditional_response(request, etag=etag)
+    if conditional is not None:
+        conditional["ETag"] = etag
+        return conditional
+
+    response = HttpResponse(
+        bytes(waveform.peaks), content_type="application/octet-stream"
+    )
+    response["ETag"] = etag
+    if request.GET.get("v") == waveform.version:
+        patch_cache_control(
+            response,
+            public=True,
+            max_age=settings.WAVEFORM_CACHE_MAX_AGE,
+            immutable=True,
+        )
+    else:
+        patch_cache_control(response, public=True, no_cache=True)
+    return response
+
+
+@require_safe
+def lecture_audio(request, lecture_id):
+    """Lecture audio with byte ranges and validators, ``?download=1`` to save.
+
+    A plain Django view: media elements send ``Range`` and ``Accept: audio/*``
+    and need the raw file, not DRF content negotiation. With
+    ``MEDIA_OFFLOAD`` set the front proxy sends the file instead.
+    """
+    lecture = get_object_or_404(
+        Lecture.objects.only("id", "title", "order", "audio_file", "content_hash"),
+        id=lecture_id,
+    )
+
+    if settings.USE_S3_MEDIA:
+        # S3 handles ranges and conditional requests itself
+        return redirect(lecture.audio_file.url)
+
+    name = lecture.audio_file.name
+    if not name:
+        raise Http404("Audio file not found")
+
+    content_type = mimetypes.guess_type(name)[0] or "audio/mpeg"
+    filename = f"{lecture.order:02d}. {lecture.title}{os.path.splitext(name)[1]}"
+    as_attachment = request.GET.get("download") == "1"
+
+    offload = FileOffload()
+    if offload.enabled:
+        # The proxy streams the bytes, the worker is free right away
+        return offload.response(
+            lecture.audio_file,
+            content_type,
+            filename=filename,
+            as_attachment=as_attachment,
+            max_age=settings.AUDIO_CACHE_MAX_AGE,
+        )
+
+    try:
+        stream = FileStream(
+            lecture.audio_file.path,
+            content_type,
+            etag=lecture.content_hash or None,
+            max_age=settings.AUDIO_CACHE_MAX_AGE,
+        )
+    except OSError:
+        raise Http404("Audio file not found")
+
+    return stream.response(request, filename=filename, as_attachment=as_attachment)
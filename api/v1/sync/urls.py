@@ -0,0 +1,7 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    # Batched offline events
+    path("", views.sync_events, name="sync_events"),
+]
@@ -0,0 +1,26 @@
+from django.conf import settings
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from apps.lecture.services import OfflineSync
+
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def sync_events(request):
+    """Apply a batch of queued offline events (progress, favorites, markers)"""
+    if not isinstance(request.data, dict):
+        return Response({"error": "Body must be an object"}, status=400)
+
+    events = request.data.get("events")
+    if not isinstance(events, list):
+        return Response({"error": "Field 'events' must be a list"}, status=400)
+
+    if len(events) > settings.SYNC_MAX_EVENTS:
+        return Response(
+            {"error": f"Too many events, max {settings.SYNC_MAX_EVENTS}"}, status=400
+        )
+
+    result = OfflineSync(request.user).apply(events)
+    return Response(result)
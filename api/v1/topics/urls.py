@@ -0,0 +1,7 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    # Ordered playlist of a topic for the player
+    path("<int:topic_id>/playlist/", views.topic_playlist, name="topic_playlist"),
+]
@@ -0,0 +1,55 @@
+from django.shortcuts import get_object_or_404
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+
+from api.v1.lectures.views import progress_data
+from apps.lecture.models import Lecture, Topic
+from apps.lecture.services import ProgressManager, TopicIndex
+
+
+@api_view(["GET"])
+@permission_classes([AllowAny])
+def topic_playlist(request, topic_id):
+    """Lectures of a topic in play order, for preloading the next one"""
+    topic = get_object_or_404(Topic.objects.only("id", "title"), id=topic_id)
+
+    index = TopicIndex(topic.id)
+    lectures = Lecture.objects.only(
+        "id",
+        "topic_id",
+        "title",
+        "audio_file",
+        "audio_manifest",
+        "content_hash",
+        "duration",
+        "file_size",
+    ).in_bulk(list(index.ids))
+    ordered = [lectures[pk] for pk in index.ids if pk in lectures]
+
+    progress = {}
+    if request.user.is_authenticated:
+        progress = ProgressManager(request.user).get_many(ordered)
+
+    return Response(
+        {
+            "topic": {"id": topic.id, "title": topic.title},
+            "lectures": [
+                {
+                    "id": lecture.id,
+                    "title": lecture.title,
+                    "audio_url": lecture.audio_url,
+                    "content_hash": lecture.content_hash,
+                    "manifest_url": lecture.manifest_url,
+                    "duration": lecture.duration or 0,
+                    "file_size": lecture.file_size or 0,
+                    "progress": (
+                        progress_data(progress[lecture.id])
+                        if lecture.id in progress
+                        else None
+                    ),
+                }
+                for lecture in ordered
+            ],
+        }
+    )
@@ -2,4 +2,6 @@ from django.urls import path, include
 
 urlpatterns = [
     path("lectures/", include("api.v1.lectures.urls")),
+    path("sync/", include("api.v1.sync.urls")),
+    path("topics/", include("api.v1.topics.urls")),
 ]
@@ -1,4 +1,5 @@
 from django.contrib import admin
+from django.db.models import Count
 from django.urls import path
 from django.shortcuts import render, get_object_or_404
 from django.contrib import messages
@@ -18,11 +19,37 @@ from apps.lecture.models import (
     LectureMarker,
 )
 
-from .services import LectureImport
+from .services import CatalogChanges, LectureImport
 
 logger = Logger(app_name="lecture_admin")
 
 
+class CatalogAdminMixin:
+    """Refresh catalog aggregates once per admin save or delete, not once
+    for every lecture an inline save or a cascade delete touches"""
+
+    def save_related(self, request, form, formsets, change):
+        with CatalogChanges.deferred():
+            super().save_related(request, form, formsets, change)
+
+    def delete_model(self, request, obj):
+        with CatalogChanges.deferred():
+            super().delete_model(request, obj)
+
+    def delete_queryset(self, request, queryset):
+        with CatalogChanges.deferred():
+            super().delete_queryset(request, queryset)
+
+
+class TopicListFilter(admin.RelatedFieldListFilter):
+    """Topic filter whose choices don't query the lecturer of every topic"""
+
+    def field_choices(self, field, request, model_admin):
+        ordering = self.field_admin_ordering(field, request, model_admin)
+        topics = Topic.objects.select_related("lecturer").order_by(*ordering)
+        return [(topic.pk, str(topic)) for topic in topics]
+
+
 @admin.register(Language)
 class LanguageAdmin(admin.ModelAdmin):
     list_display = ["code", "name", "native_name", "is_active", "created_at"]
@@ -41,16 +68,17 @@ class TopicGroupAdmin(admin.ModelAdmin):
     list_editable = ["order", "is_active"]
 
     def topics_count(self, obj):
-        return obj.topics.count()
+        return obj.topics_total
 
     topics_count.short_description = "Topics"
+    topics_count.admin_order_field = "topics_total"
 
     def get_queryset(self, request):
-        return super().get_queryset(request).prefetch_related("topics")
+        return super().get_queryset(request).annotate(topics_total=Count("topics"))
 
 
 @admin.register(Lecturer)
-class LecturerAdmin(admin.ModelAdmin):
+class LecturerAdmin(CatalogAdminMixin, admin.ModelAdmin):
     list_display = [
         "photo_thumbnail",
         "name",
@@ -97,13 +125,10 @@ class LecturerAdmin(admin.ModelAdmin):
     level_display.short_description = "Level"
 
     def topics_count(self, obj):
-        return obj.topics.count()
+        return obj.topic_count
 
     topics_count.short_description = "Topics"
 
-    def get_queryset(self, request):
-        return super().get_queryset(request).prefetch_related("topics")
-
 
 class LectureInline(admin.TabularInline):
     model = Lecture
@@ -130,7 +155,7 @@ class LectureInline(admin.TabularInline):
 
 
 @admin.register(Topic)
-class TopicAdmin(admin.ModelAdmin):
+class TopicAdmin(CatalogAdminMixin, admin.ModelAdmin):
     list_display = [
         "cover_thumbnail",
         "title",
@@ -174,18 +199,14 @@ class TopicAdmin(admin.ModelAdmin):
     lecturer_with_level.short_description = "Lecturer"
 
     def languages_display(self, obj):
-        languages = obj.languages.all()
-        if languages:
-            return ", ".join([lang.code for lang in languages])
-        return "-"
+        return ", ".join(obj.language_code_list) or "-"
 
     languages_display.short_description = "Languages"
 
     def lecture_count_with_import(self, obj):
-        count = obj.lectures.count()
         return format_html(
             '{} lectures <a href="{}/import-lectures/" style="margin-left:10px;">Import</a>',
-            count,
+            obj.lecture_count,
             obj.id,
         )
 
@@ -232,16 +253,11 @@ class TopicAdmin(admin.ModelAdmin):
         return render(request, "admin/import_lectures.html", {"topic": topic})
 
     def get_queryset(self, request):
-        return (
-            super()
-            .get_queryset(request)
-            .select_related("lecturer", "group")
-            .prefetch_related("languages")
-        )
+        return super().get_queryset(request).select_related("lecturer", "group")
 
 
 @admin.register(Lecture)
-class LectureAdmin(admin.ModelAdmin):
+class LectureAdmin(CatalogAdminMixin, admin.ModelAdmin):
     list_display = [
         "title",
         "topic_with_lecturer",
@@ -257,7 +273,7 @@ class LectureAdmin(admin.ModelAdmin):
     list_filter = [
         "topic__lecturer__level",
         "topic__lecturer",
-        "topic",
+        ("topic", TopicListFilter),
         "language",
         "year",
         "created_at",
@@ -388,7 +404,7 @@ class CurrentLectureAdmin(admin.ModelAdmin):
     list_filter = [
         "topic__lecturer__level",
         "topic__lecturer",
-        "topic",
+        ("topic", TopicListFilter),
         "lecture__language",
         "updated_at",
     ]
@@ -448,7 +464,7 @@ class FavoriteLectureAdmin(admin.ModelAdmin):
     list_filter = [
         "lecture__topic__lecturer__level",
         "lecture__topic__lecturer",
-        "lecture__topic",
+        ("lecture__topic", TopicListFilter),
         "lecture__language",
         "created_at",
     ]
@@ -511,7 +527,7 @@ class LectureHistoryAdmin(admin.ModelAdmin):
         "listened_at",
         "lecture__topic__lecturer__level",
         "lecture__topic__lecturer",
-        "lecture__topic",
+        ("lecture__topic", TopicListFilter),
         "lecture__language",
     ]
     search_fields = [
@@ -577,7 +593,7 @@ class LectureMarkerAdmin(admin.ModelAdmin):
     list_filter = [
         "created_at",
         "lecture__topic__lecturer",
-        "lecture__topic",
+        ("lecture__topic", TopicListFilter),
         "lecture__language",
     ]
     search_fields = [
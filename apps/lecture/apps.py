@@ -5,3 +5,6 @@ from django.apps import AppConfig
 class LectureConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.lecture"
+
+    def ready(self):
+        from apps.lecture import signals  # noqa: F401
@@ -0,0 +1,77 @@
+import hashlib
+from functools import wraps
+
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import (
+    get_conditional_response,
+    patch_cache_control,
+    patch_vary_headers,
+)
+from django.utils.http import http_date
+
+from apps.lecture.services.catalog_version.service import CatalogVersion
+
+PAGE_CACHE_KEY = "catalog:page:{build}:{version}:{path}"
+
+
+def catalog_page(view_func):
+    """Serve a catalog page to anonymous visitors from the page cache.
+
+    Anonymous responses are cached under the current catalog version and
+    carry ``ETag`` / ``Last-Modified`` derived from it, so repeat visits
+    revalidate with a 304. Both the cache key and the ``ETag`` include
+    ``STATIC_VERSION``, so a deploy never serves pages rendered by the old
+    templates. Authenticated requests, non-GET requests and requests with
+    pending flash messages always reach the view.
+    """
+
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        if (
+            request.method not in ("GET", "HEAD")
+            or request.user.is_authenticated
+            or len(get_messages(request))
+        ):
+            return view_func(request, *args, **kwargs)
+
+        version, changed_at = CatalogVersion.get()
+        etag = f'"catalog-{settings.STATIC_VERSION}-{version}"'
+        last_modified = int(changed_at)
+
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = _cached_response(request, version, view_func, args, kwargs)
+
+        response["ETag"] = etag
+        response["Last-Modified"] = http_date(last_modified)
+        patch_cache_control(response, public=True, max_age=0, must_revalidate=True)
+        patch_vary_headers(response, ("Cookie",))
+        return response
+
+    return wrapper
+
+
+def _cached_response(request, version, view_func, args, kwargs):
+    path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    key = PAGE_CACHE_KEY.format(
+        build=settings.STATIC_VERSION, version=version, path=path
+    )
+
+    cached = cache.get(key)
+    if cached is not None:
+        content, content_type = cached
+        return HttpResponse(content, content_type=content_type)
+
+    response = view_func(request, *args, **kwargs)
+    if response.status_code == 200 and not response.streaming:
+        cache.set(
+            key,
+            (response.content, response["Content-Type"]),
+            settings.CATALOG_PAGE_TIMEOUT,
+        )
+    return response
@@ -0,0 +1,85 @@
+import pickle
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.lecture.models import Lecture, Lecturer, Topic
+from apps.lecture.services import HomeCards
+
+
+class Command(BaseCommand):
+    help = "Compare cached home page entries: pickled models vs compact card rows"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--count", type=int, default=5, help="Objects per cached entry"
+        )
+        parser.add_argument(
+            "--iterations", type=int, default=2000, help="Unpickles per measurement"
+        )
+
+    def handle(self, *args, **options):
+        count = options["count"]
+        iterations = options["iterations"]
+        cards = HomeCards()
+
+        lecturer_ids = list(Lecturer.objects.values_list("id", flat=True)[:count])
+        topic_ids = list(Topic.objects.values_list("id", flat=True)[:count])
+        lecture_ids = list(Lecture.objects.values_list("id", flat=True)[:count])
+
+        if not (lecturer_ids or topic_ids or lecture_ids):
+            self.stderr.write("No catalog data found, import some first")
+            return
+
+        entries = [
+            (
+                "lecturers",
+                # The querysets HomePageManager cached before the card layer
+                lambda: list(
+                    Lecturer.objects.prefetch_related("topics").filter(
+                        id__in=lecturer_ids
+                    )
+                ),
+                lambda: [card.to_row() for card in cards.lecturers(lecturer_ids)],
+            ),
+            (
+                "topics",
+                lambda: list(
+                    Topic.objects.select_related("lecturer")
+                    .prefetch_related("lectures")
+                    .filter(id__in=topic_ids)
+                ),
+                lambda: [card.to_row() for card in cards.topics(topic_ids)],
+            ),
+            (
+                "recent lectures",
+                lambda: list(
+                    Lecture.objects.select_related("topic", "topic__lecturer").filter(
+                        id__in=lecture_ids
+                    )
+                ),
+                lambda: [card.to_row() for card in cards.lectures(lecture_ids)],
+            ),
+        ]
+
+        for name, build_models, build_rows in entries:
+            for label, build in (("models", build_models), ("card rows", build_rows)):
+                self._report(f"{name} / {label}", build(), iterations)
+
+    def _report(self, name, value, iterations):
+        payload = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+
+        timings = []
+        for _ in range(iterations):
+            started = time.perf_counter()
+            pickle.loads(payload)
+            timings.append((time.perf_counter() - started) * 1_000_000)
+
+        per_item = len(payload) / len(value) if value else 0
+        self.stdout.write(
+            f"{name:<28} "
+            f"bytes: {len(payload):>7}  "
+            f"bytes/item: {per_item:>8.0f}  "
+            f"unpickle mean: {statistics.mean(timings):>8.1f} us"
+        )
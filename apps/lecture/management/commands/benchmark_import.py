@@ -0,0 +1,187 @@
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+import traceback
+
+import mutagen
+from django.core.files.uploadedfile import InMemoryUploadedFile, TemporaryUploadedFile
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+from django.test.utils import override_settings
+
+from apps.lecture.models import Lecturer, Topic, TopicGroup
+from apps.lecture.services import LectureImport
+
+# A silent MPEG-1 layer III frame: 128 kbit/s, 44.1 kHz, mono
+FRAME = (0xFFFB90C0).to_bytes(4, "big") + bytes(413)
+FRAME_SECONDS = 1152 / 44100
+
+
+class LegacyImport(LectureImport):
+    """The import before the thread pool: each file read whole into a
+    ``BytesIO`` for mutagen, one file after the other"""
+
+    def _with_metadata(self, uploaded_files):
+        for uploaded_file in uploaded_files:
+            yield uploaded_file, self._extract_metadata(uploaded_file)
+
+    def _get_duration_from_file(self, uploaded_file):
+        file_data = uploaded_file.read()
+        uploaded_file.seek(0)
+        audio_file = mutagen.File(io.BytesIO(file_data))
+        return int(audio_file.info.length) if audio_file else None
+
+
+class Command(BaseCommand):
+    help = (
+        "Import a batch of synthetic MP3 uploads and report files per second "
+        "and peak RSS: legacy whole-file reads vs the thread pool. Each run is "
+        "a forked process, so its peak memory is measured on its own"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--files", type=int, default=500, help="Uploaded files per run"
+        )
+        parser.add_argument(
+            "--seconds", type=int, default=60, help="Audio length of each file"
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            help="Threads of the pooled run, defaults to LECTURE_IMPORT_WORKERS",
+        )
+        parser.add_argument(
+            "--in-memory",
+            action="store_true",
+            help="Upload as in-memory files instead of temporary files on disk",
+        )
+
+    def handle(self, *args, **options):
+        audio = FRAME * int(options["seconds"] / FRAME_SECONDS)
+        self.stdout.write(
+            f"{options['files']} files of {len(audio) / 1024 / 1024:.1f} MB, "
+            f"{'in memory' if options['in_memory'] else 'temporary files'}"
+        )
+
+        runs = [("legacy sequential", LegacyImport, {})]
+        workers = {}
+        if options["workers"]:
+            workers = {"LECTURE_IMPORT_WORKERS": options["workers"]}
+        runs.append(("header-only pooled", LectureImport, workers))
+
+        for name, service_class, overrides in runs:
+            imported, elapsed, peak = self._fork(
+                service_class, overrides, audio, options["files"], options["in_memory"]
+            )
+            self._report(name, imported, elapsed, peak)
+
+    def _fork(self, service_class, overrides, audio, count, in_memory):
+        """Run one import in a child process, return its results and the
+        peak RSS the kernel recorded for it"""
+        reader, writer = os.pipe()
+        # The child opens its own database connections
+        connections.close_all()
+        pid = os.fork()
+        if pid == 0:
+            os.close(reader)
+            status = 1
+            try:
+                uploads = self._uploads(audio, count, in_memory)
+                with override_settings(**overrides):
+                    result = self._run(service_class, uploads)
+                os.write(writer, json.dumps(result).encode())
+                status = 0
+            except BaseException:
+                traceback.print_exc()
+            finally:
+                os._exit(status)
+
+        os.close(writer)
+        with os.fdopen(reader) as pipe:
+            output = pipe.read()
+        _, status, usage = os.wait4(pid, 0)
+        if status != 0 or not output:
+            raise CommandError(f"{service_class.__name__} run failed")
+
+        imported, elapsed = json.loads(output)
+        # Kilobytes on Linux, bytes on macOS
+        peak = usage.ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+        return imported, elapsed, peak
+
+    def _uploads(self, audio, count, in_memory):
+        uploads = []
+        for number in range(1, count + 1):
+            name = f"{number:03d}. Benchmark lecture.mp3"
+            if in_memory:
+                # Written like Django's memory upload handler, not sharing ``audio``
+                file = io.BytesIO()
+                file.write(audio)
+                file.seek(0)
+                upload = InMemoryUploadedFile(
+                    file,
+                    "lecture_files",
+                    name,
+                    "audio/mpeg",
+                    len(audio),
+                    None,
+                )
+            else:
+                upload = TemporaryUploadedFile(name, "audio/mpeg", len(audio), None)
+                upload.write(audio)
+                upload.seek(0)
+            uploads.append(upload)
+        return uploads
+
+    def _run(self, service_class, uploads):
+        """Import into a throwaway topic and media root, rolled back after"""
+        stamp = time.time_ns()
+        with (
+            tempfile.TemporaryDirectory() as media_root,
+            override_settings(
+                MEDIA_ROOT=media_root,
+                USE_S3_MEDIA=False,
+                AUDIO_SEGMENTING=False,
+                STORAGES={
+                    "default": {
+                        "BACKEND": "django.core.files.storage.FileSystemStorage",
+                        "OPTIONS": {"location": media_root},
+                    },
+                    "staticfiles": {
+                        "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"
+                    },
+                },
+            ),
+            transaction.atomic(),
+        ):
+            lecturer = Lecturer.objects.create(
+                code=f"benchmark-{stamp}", name="Benchmark", order=0
+            )
+            group = TopicGroup.objects.create(
+                name=f"Benchmark {stamp}", code=f"benchmark-{stamp}"
+            )
+            topic = Topic.objects.create(
+                lecturer=lecturer,
+                group=group,
+                code="benchmark",
+                title="Benchmark",
+                order=0,
+            )
+
+            started = time.perf_counter()
+            imported = service_class(topic).import_files(uploads)
+            elapsed = time.perf_counter() - started
+
+            transaction.set_rollback(True)
+        return imported, elapsed
+
+    def _report(self, name, imported, elapsed, peak):
+        rate = imported / elapsed if elapsed else 0
+        self.stdout.write(
+            f"{name:<20} imported: {imported:>4}  "
+            f"time: {elapsed:7.2f} s  files/s: {rate:7.2f}  "
+            f"peak RSS: {peak / 1024 / 1024:.1f} MB"
+        )
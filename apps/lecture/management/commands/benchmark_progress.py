@@ -0,0 +1,96 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from apps.lecture.models import Lecture, LectureProgress
+from apps.lecture.services import ProgressRepository
+from apps.users.models import User
+
+
+class Command(BaseCommand):
+    help = "Compare queries and latency per progress heartbeat: legacy vs upsert"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--heartbeats", type=int, default=500, help="Heartbeats per path"
+        )
+        parser.add_argument(
+            "--complete-every",
+            type=int,
+            default=50,
+            help="Send completed=True every N heartbeats",
+        )
+
+    def handle(self, *args, **options):
+        lecture = Lecture.objects.first()
+        if lecture is None:
+            self.stderr.write("No lectures found, import some first")
+            return
+
+        heartbeats = options["heartbeats"]
+        complete_every = options["complete_every"]
+        repository = ProgressRepository()
+
+        self.stdout.write(
+            f"Backend: {connection.vendor}, "
+            f"native upsert: {repository.supports_native_upsert()}"
+        )
+
+        paths = [
+            ("legacy update_or_create", self._legacy_heartbeat),
+            (
+                "repository upsert",
+                lambda user, lec, t, c: repository.upsert(user.id, lec.id, t, c),
+            ),
+        ]
+
+        for name, heartbeat in paths:
+            # Everything runs inside a rolled back transaction
+            with transaction.atomic():
+                user = User.objects.create_user(
+                    email=f"benchmark-{time.time_ns()}@example.com"
+                )
+                timings, queries = self._run(
+                    heartbeat, user, lecture, heartbeats, complete_every
+                )
+                transaction.set_rollback(True)
+
+            self._report(name, timings, queries, heartbeats)
+
+    def _run(self, heartbeat, user, lecture, heartbeats, complete_every):
+        timings = []
+        with CaptureQueriesContext(connection) as context:
+            for i in range(1, heartbeats + 1):
+                completed = complete_every > 0 and i % complete_every == 0
+                started = time.perf_counter()
+                heartbeat(user, lecture, float(i * 5), completed)
+                timings.append((time.perf_counter() - started) * 1000)
+        return timings, len(context.captured_queries)
+
+    @staticmethod
+    def _legacy_heartbeat(user, lecture, current_time, completed):
+        """The pre-repository path of api.v1.lectures.views.lecture_progress"""
+        progress, created = LectureProgress.objects.update_or_create(
+            user=user,
+            lecture=lecture,
+            defaults={"current_time": current_time, "completed": completed},
+        )
+        if completed:
+            progress.listen_count += 1
+            progress.save(update_fields=["listen_count", "updated_at"])
+        else:
+            progress.save(update_fields=["updated_at"])
+        return progress
+
+    def _report(self, name, timings, queries, heartbeats):
+        timings.sort()
+        p95 = timings[int(len(timings) * 0.95) - 1]
+        self.stdout.write(
+            f"{name:<26} "
+            f"queries/heartbeat: {queries / heartbeats:.2f}  "
+            f"mean: {statistics.mean(timings):.3f} ms  "
+            f"p95: {p95:.3f} ms"
+        )
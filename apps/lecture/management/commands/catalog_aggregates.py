@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from apps.lecture.services import CatalogAggregates
+
+
+class Command(BaseCommand):
+    help = "Recompute or verify the denormalized Topic and Lecturer aggregates"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--verify",
+            action="store_true",
+            help="Only report mismatches, exit with an error if any are found",
+        )
+
+    def handle(self, *args, **options):
+        aggregates = CatalogAggregates()
+
+        if options["verify"]:
+            mismatches = list(aggregates.verify())
+            for model, pk, field, stored, expected in mismatches:
+                self.stdout.write(
+                    f"{model} {pk}: {field} is {stored!r}, expected {expected!r}"
+                )
+            if mismatches:
+                raise CommandError(f"{len(mismatches)} aggregate mismatches found")
+            self.stdout.write(self.style.SUCCESS("All aggregates are consistent"))
+            return
+
+        with transaction.atomic():
+            topics, lecturers = aggregates.refresh_all()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Recomputed aggregates of {topics} topics and {lecturers} lecturers"
+            )
+        )
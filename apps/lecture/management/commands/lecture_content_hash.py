@@ -0,0 +1,64 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from apps.lecture.models import Lecture
+from apps.lecture.services import CatalogChanges
+
+
+class Command(BaseCommand):
+    help = "Fill in the content hash and size of lectures missing them"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Rehash every lecture, not only the ones without a hash",
+        )
+        parser.add_argument(
+            "--lecture",
+            type=int,
+            action="append",
+            help="Only hash this lecture, may be repeated",
+        )
+
+    def handle(self, *args, **options):
+        lectures = Lecture.objects.exclude(audio_file="").only(
+            "id", "topic_id", "audio_file", "file_size"
+        )
+        if not options["force"]:
+            lectures = lectures.filter(Q(content_hash="") | Q(file_size=None))
+        if options["lecture"]:
+            lectures = lectures.filter(id__in=options["lecture"])
+
+        hashed = 0
+        missing = []
+        resized_topic_ids = set()
+        for lecture in lectures.order_by("id").iterator():
+            try:
+                with lecture.audio_file.open("rb") as audio:
+                    content_hash = Lecture.generate_content_hash(audio)
+                    file_size = audio.size
+            except (FileNotFoundError, OSError):
+                missing.append(lecture.id)
+                continue
+
+            # Bypass save(), only the size reaches cached catalog data
+            Lecture.objects.filter(id=lecture.id).update(
+                content_hash=content_hash, file_size=file_size
+            )
+            if file_size != lecture.file_size:
+                resized_topic_ids.add(lecture.topic_id)
+            hashed += 1
+
+        if resized_topic_ids:
+            # Topic and lecturer totals sum the sizes
+            CatalogChanges.record(topic_ids=resized_topic_ids)
+
+        if missing:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"Audio file missing for {len(missing)} lectures: "
+                    + ", ".join(map(str, missing))
+                )
+            )
+        self.stdout.write(self.style.SUCCESS(f"Hashed audio of {hashed} lectures"))
@@ -0,0 +1,67 @@
+from django.core.management.base import BaseCommand
+from django.db.models import F, Q
+
+from apps.lecture.models import Lecture
+from apps.lecture.services import MP3FrameError, SeekIndex
+
+
+class Command(BaseCommand):
+    help = "Build the MP3 seek table of lectures that have none or a stale one"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Rebuild every table, not only missing, stale or old ones",
+        )
+        parser.add_argument(
+            "--lecture",
+            type=int,
+            action="append",
+            help="Only build the table of this lecture, may be repeated",
+        )
+
+    def handle(self, *args, **options):
+        lectures = Lecture.objects.exclude(audio_file="").only(
+            "id", "audio_file", "content_hash"
+        )
+        if not options["force"]:
+            lectures = lectures.exclude(
+                Q(seek_index__content_hash=F("content_hash"))
+                & ~Q(seek_index__frame_duration=0)
+            )
+        if options["lecture"]:
+            lectures = lectures.filter(id__in=options["lecture"])
+
+        built = 0
+        skipped = []
+        missing = []
+        for lecture in lectures.order_by("id").iterator():
+            try:
+                with lecture.audio_file.open("rb") as audio:
+                    seek_index = SeekIndex.build(audio)
+            except MP3FrameError:
+                skipped.append(lecture.id)
+                continue
+            except (FileNotFoundError, OSError):
+                missing.append(lecture.id)
+                continue
+
+            seek_index.save(lecture)
+            built += 1
+
+        if skipped:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"Not MP3, skipped {len(skipped)} lectures: "
+                    + ", ".join(map(str, skipped))
+                )
+            )
+        if missing:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"Audio file missing for {len(missing)} lectures: "
+                    + ", ".join(map(str, missing))
+                )
+            )
+        self.stdout.write(self.style.SUCCESS(f"Built seek tables of {built} lectures"))
@@ -0,0 +1,79 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import F
+from django.utils.module_loading import import_string
+
+from apps.lecture.models import Lecture
+from apps.lecture.services import MP3FrameError, Waveform, WaveformError
+
+
+class Command(BaseCommand):
+    help = "Compute the waveform peaks of lectures that have none or stale ones"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Recompute every waveform, not only missing or stale ones",
+        )
+        parser.add_argument(
+            "--lecture",
+            type=int,
+            action="append",
+            help="Only compute the waveform of this lecture, may be repeated",
+        )
+        parser.add_argument(
+            "--decoder",
+            help="Dotted path of the decoder backend, defaults to WAVEFORM_DECODER",
+        )
+
+    def handle(self, *args, **options):
+        decoder = None
+        if options["decoder"]:
+            try:
+                decoder = import_string(options["decoder"])()
+            except ImportError as e:
+                raise CommandError(f"Unknown decoder: {e}")
+        waveform = Waveform(decoder=decoder)
+
+        lectures = Lecture.objects.exclude(audio_file="").only(
+            "id", "audio_file", "content_hash"
+        )
+        if not options["force"]:
+            lectures = lectures.exclude(waveform__content_hash=F("content_hash"))
+        if options["lecture"]:
+            lectures = lectures.filter(id__in=options["lecture"])
+
+        computed = 0
+        skipped = []
+        missing = []
+        for lecture in lectures.order_by("id").iterator():
+            try:
+                with lecture.audio_file.open("rb") as audio:
+                    peaks = waveform.compute(audio)
+            except (MP3FrameError, WaveformError):
+                skipped.append(lecture.id)
+                continue
+            except (FileNotFoundError, OSError):
+                missing.append(lecture.id)
+                continue
+
+            waveform.save(lecture, peaks)
+            computed += 1
+
+        if skipped:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"Not readable by {type(waveform.decoder).__name__}, "
+                    f"skipped {len(skipped)} lectures: " + ", ".join(map(str, skipped))
+                )
+            )
+        if missing:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"Audio file missing for {len(missing)} lectures: "
+                    + ", ".join(map(str, missing))
+                )
+            )
+        self.stdout.write(
+            self.style.SUCCESS(f"Computed waveforms of {computed} lectures")
+        )
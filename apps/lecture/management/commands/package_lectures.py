@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand
+
+from apps.lecture.models import Lecture
+from apps.lecture.services import LecturePackager, MP3FrameError, PackagingError
+
+
+class Command(BaseCommand):
+    help = "Cut lecture MP3s into streaming segments with an HLS playlist"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Rewrite existing packages, not only missing ones",
+        )
+        parser.add_argument(
+            "--lecture",
+            type=int,
+            action="append",
+            help="Only package this lecture, may be repeated",
+        )
+        parser.add_argument(
+            "--segment-duration",
+            type=int,
+            help="Seconds per segment, defaults to AUDIO_SEGMENT_DURATION",
+        )
+
+    def handle(self, *args, **options):
+        lectures = Lecture.objects.exclude(audio_file="").only(
+            "id", "audio_file", "content_hash", "audio_manifest"
+        )
+        if not options["force"]:
+            lectures = lectures.filter(audio_manifest="")
+        if options["lecture"]:
+            lectures = lectures.filter(id__in=options["lecture"])
+
+        packager = LecturePackager(segment_duration=options["segment_duration"])
+        packaged = 0
+        failed = []
+        for lecture in lectures.order_by("id").iterator():
+            try:
+                packager.package(lecture, force=options["force"])
+            except (MP3FrameError, PackagingError, OSError) as e:
+                failed.append(lecture.id)
+                self.stdout.write(f"Lecture {lecture.id}: {e}")
+                continue
+            packaged += 1
+
+        if failed:
+            self.stdout.write(
+                self.style.WARNING(f"{len(failed)} lectures could not be packaged")
+            )
+        self.stdout.write(self.style.SUCCESS(f"Packaged {packaged} lectures"))
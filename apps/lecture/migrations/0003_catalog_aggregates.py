@@ -0,0 +1,97 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:43
+
+from django.db import migrations, models
+
+
+def backfill_aggregates(apps, schema_editor):
+    Lecturer = apps.get_model("lecture", "Lecturer")
+    Topic = apps.get_model("lecture", "Topic")
+    Lecture = apps.get_model("lecture", "Lecture")
+
+    topics = {topic.id: topic for topic in Topic.objects.all()}
+    lecturers = {lecturer.id: lecturer for lecturer in Lecturer.objects.all()}
+
+    stats = (
+        Lecture.objects.order_by()
+        .values("topic_id")
+        .annotate(
+            count=models.Count("id"),
+            duration=models.Sum("duration"),
+            size=models.Sum("file_size"),
+        )
+    )
+    for row in stats:
+        topic = topics[row["topic_id"]]
+        topic.lecture_count = row["count"]
+        topic.total_duration = row["duration"] or 0
+        topic.total_size = row["size"] or 0
+
+    codes = {}
+    for topic_id, code in Topic.languages.through.objects.order_by(
+        "language__code"
+    ).values_list("topic_id", "language__code"):
+        codes.setdefault(topic_id, []).append(code)
+    for topic_id, topic_codes in codes.items():
+        topics[topic_id].language_codes = ",".join(topic_codes)
+
+    for topic in topics.values():
+        lecturer = lecturers[topic.lecturer_id]
+        lecturer.topic_count += 1
+        lecturer.lecture_count += topic.lecture_count
+
+    Topic.objects.bulk_update(
+        topics.values(),
+        ["lecture_count", "total_duration", "total_size", "language_codes"],
+        batch_size=500,
+    )
+    Lecturer.objects.bulk_update(
+        lecturers.values(), ["topic_count", "lecture_count"], batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("lecture", "0002_lecturemarker"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="lecturer",
+            name="lecture_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="lecturer",
+            name="topic_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="topic",
+            name="language_codes",
+            field=models.CharField(
+                blank=True,
+                editable=False,
+                help_text="Comma-separated codes of the topic languages",
+                max_length=255,
+            ),
+        ),
+        migrations.AddField(
+            model_name="topic",
+            name="lecture_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="topic",
+            name="total_duration",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, help_text="Seconds"
+            ),
+        ),
+        migrations.AddField(
+            model_name="topic",
+            name="total_size",
+            field=models.BigIntegerField(default=0, editable=False, help_text="Bytes"),
+        ),
+        migrations.RunPython(backfill_aggregates, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-17 05:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("lecture", "0003_catalog_aggregates"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="lecture",
+            name="content_hash",
+            field=models.CharField(
+                blank=True,
+                help_text="SHA256 hash of the audio content, versions copies cached on devices",
+                max_length=64,
+            ),
+        ),
+    ]
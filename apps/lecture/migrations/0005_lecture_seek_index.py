@@ -0,0 +1,54 @@
+# Generated by Django 5.2.18 on 2026-10-17 05:08
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("lecture", "0004_lecture_content_hash"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LectureSeekIndex",
+            fields=[
+                (
+                    "lecture",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="seek_index",
+                        serialize=False,
+                        to="lecture.lecture",
+                    ),
+                ),
+                (
+                    "content_hash",
+                    models.CharField(
+                        help_text="Content hash of the audio the table was built from",
+                        max_length=64,
+                    ),
+                ),
+                (
+                    "interval",
+                    models.FloatField(help_text="Seconds between table entries"),
+                ),
+                (
+                    "offsets",
+                    models.BinaryField(help_text="Little-endian uint32 frame offsets"),
+                ),
+                ("duration", models.FloatField(help_text="Audio duration in seconds")),
+                (
+                    "data_start",
+                    models.BigIntegerField(help_text="Offset of the first audio frame"),
+                ),
+                (
+                    "data_end",
+                    models.BigIntegerField(help_text="End of the last audio frame"),
+                ),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
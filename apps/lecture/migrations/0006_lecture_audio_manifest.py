@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-17 05:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("lecture", "0005_lecture_seek_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="lecture",
+            name="audio_manifest",
+            field=models.FileField(
+                blank=True,
+                editable=False,
+                help_text="HLS playlist of the audio cut into segments, see LecturePackager",
+                max_length=255,
+                upload_to="",
+            ),
+        ),
+    ]
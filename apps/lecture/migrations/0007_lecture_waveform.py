@@ -0,0 +1,49 @@
+# Generated by Django 5.2.18 on 2026-10-17 05:15
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("lecture", "0006_lecture_audio_manifest"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LectureWaveform",
+            fields=[
+                (
+                    "lecture",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="waveform",
+                        serialize=False,
+                        to="lecture.lecture",
+                    ),
+                ),
+                (
+                    "content_hash",
+                    models.CharField(
+                        help_text="Content hash of the audio the peaks come from",
+                        max_length=64,
+                    ),
+                ),
+                (
+                    "peaks",
+                    models.BinaryField(
+                        help_text="One uint8 level per bucket, dB scaled"
+                    ),
+                ),
+                (
+                    "decoder",
+                    models.CharField(
+                        help_text="Backend that computed the peaks", max_length=50
+                    ),
+                ),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
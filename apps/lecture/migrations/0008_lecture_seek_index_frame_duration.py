@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("lecture", "0007_lecture_waveform"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="lectureseekindex",
+            name="frame_duration",
+            field=models.FloatField(
+                default=0, help_text="Seconds of audio in one frame, 0 in older tables"
+            ),
+        ),
+    ]
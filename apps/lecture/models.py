@@ -2,8 +2,9 @@ import uuid
 import os
 import hashlib
 from django.db import models
-from django.core.exceptions import ValidationError
+from django.core.exceptions import ObjectDoesNotExist, ValidationError
 from django.conf import settings
+from django.urls import reverse
 
 from apps.users.models import User
 
@@ -104,6 +105,9 @@ class Lecturer(models.Model):
         default=2,
         help_text="Spiritual hierarchy level: 1=Founder-Acharya, 2=Direct Disciple, 3=Grand Disciple",
     )
+    # Aggregates maintained by CatalogAggregates
+    topic_count = models.PositiveIntegerField(default=0, editable=False)
+    lecture_count = models.PositiveIntegerField(default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
@@ -144,11 +148,27 @@ class Topic(models.Model):
         Language, related_name="topics", help_text="Languages available in this topic"
     )
     order = models.PositiveIntegerField()
+    # Aggregates maintained by CatalogAggregates
+    lecture_count = models.PositiveIntegerField(default=0, editable=False)
+    total_duration = models.PositiveIntegerField(
+        default=0, editable=False, help_text="Seconds"
+    )
+    total_size = models.BigIntegerField(default=0, editable=False, help_text="Bytes")
+    language_codes = models.CharField(
+        max_length=255,
+        blank=True,
+        editable=False,
+        help_text="Comma-separated codes of the topic languages",
+    )
     created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
         return f"{self.lecturer.name} - {self.title}"
 
+    @property
+    def language_code_list(self):
+        return self.language_codes.split(",") if self.language_codes else []
+
     def get_languages_display(self):
         """Return comma-separated list of language names"""
         return ", ".join(self.languages.values_list("native_name", flat=True))
@@ -187,6 +207,17 @@ class Lecture(models.Model):
         blank=True,
         help_text="SHA256 hash of original filename for duplicate detection",
     )
+    content_hash = models.CharField(
+        max_length=64,
+        blank=True,
+        help_text="SHA256 hash of the audio content, versions copies cached on devices",
+    )
+    audio_manifest = models.FileField(
+        max_length=255,
+        blank=True,
+        editable=False,
+        help_text="HLS playlist of the audio cut into segments, see LecturePackager",
+    )
     created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
@@ -214,11 +245,93 @@ class Lecture(models.Model):
             return round(self.file_size / (1024 * 1024), 1)
         return 0.0
 
+    @property
+    def audio_url(self):
+        """URL the player streams from: S3 directly, otherwise the ranged endpoint"""
+        if settings.USE_S3_MEDIA:
+            return self.audio_file.url
+        return reverse("lecture_audio", args=[self.id])
+
+    @property
+    def manifest_url(self):
+        """Segment playlist URL, empty until the lecture is packaged"""
+        return self.audio_manifest.url if self.audio_manifest else ""
+
+    @property
+    def waveform_url(self):
+        """Versioned peaks URL, empty until peaks of the current audio are stored"""
+        try:
+            waveform = self.waveform
+        except ObjectDoesNotExist:
+            return ""
+        if not self.content_hash or waveform.content_hash != self.content_hash:
+            return ""
+        url = reverse("lecture_waveform", args=[self.id])
+        return f"{url}?v={waveform.version}"
+
     @staticmethod
     def generate_file_hash(filename):
         """Generate SHA256 hash from filename"""
         return hashlib.sha256(filename.encode("utf-8")).hexdigest()
 
+    @staticmethod
+    def generate_content_hash(file):
+        """Generate SHA256 hash from file content, read in chunks"""
+        digest = hashlib.sha256()
+        for chunk in file.chunks():
+            digest.update(chunk)
+        file.seek(0)
+        return digest.hexdigest()
+
+
+class LectureSeekIndex(models.Model):
+    """Time to byte offset table of a lecture's MP3, see ``SeekIndex``"""
+
+    lecture = models.OneToOneField(
+        Lecture, on_delete=models.CASCADE, primary_key=True, related_name="seek_index"
+    )
+    content_hash = models.CharField(
+        max_length=64, help_text="Content hash of the audio the table was built from"
+    )
+    interval = models.FloatField(help_text="Seconds between table entries")
+    offsets = models.BinaryField(help_text="Little-endian uint32 frame offsets")
+    duration = models.FloatField(help_text="Audio duration in seconds")
+    data_start = models.BigIntegerField(help_text="Offset of the first audio frame")
+    data_end = models.BigIntegerField(help_text="End of the last audio frame")
+    frame_duration = models.FloatField(
+        default=0, help_text="Seconds of audio in one frame, 0 in older tables"
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Seek index of {self.lecture_id}"
+
+
+class LectureWaveform(models.Model):
+    """Waveform peaks of a lecture for the player scrubber, see ``Waveform``"""
+
+    lecture = models.OneToOneField(
+        Lecture, on_delete=models.CASCADE, primary_key=True, related_name="waveform"
+    )
+    content_hash = models.CharField(
+        max_length=64, help_text="Content hash of the audio the peaks come from"
+    )
+    peaks = models.BinaryField(help_text="One uint8 level per bucket, dB scaled")
+    decoder = models.CharField(
+        max_length=50, help_text="Backend that computed the peaks"
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Waveform of {self.lecture_id}"
+
+    @property
+    def version(self):
+        """Cache key of the peaks URL, changes with the audio and on every
+        recompute"""
+        source = f"{self.content_hash}:{self.decoder}:{self.updated_at.isoformat()}"
+        return hashlib.sha256(source.encode()).hexdigest()[:16]
+
 
 class LectureProgress(models.Model):
     user = models.ForeignKey(
@@ -1,5 +1,49 @@
 from apps.lecture.services.topic_player_manager.service import TopicPlayerManager
+from apps.lecture.services.catalog_aggregates.service import CatalogAggregates
+from apps.lecture.services.catalog_changes.service import CatalogChanges
+from apps.lecture.services.catalog_sampler.service import CatalogSampler
+from apps.lecture.services.catalog_version.service import CatalogVersion
+from apps.lecture.services.home_cards.service import HomeCards
+from apps.lecture.services.topic_index.service import TopicIndex
+from apps.lecture.services.topic_archive.service import TopicArchive
+from apps.lecture.services.mp3_frames.service import MP3FrameError, MP3Frames
+from apps.lecture.services.seek_index.service import SeekIndex
+from apps.lecture.services.waveform.service import Waveform, WaveformError
+from apps.lecture.services.lecture_packager.service import (
+    LecturePackager,
+    PackagingError,
+)
 from apps.lecture.services.home_page_manager.service import HomePageManager
 from apps.lecture.services.lecture_import.service import LectureImport
+from apps.lecture.services.listener_presence.service import ListenerPresence
+from apps.lecture.services.progress_buffer.service import ProgressBuffer
+from apps.lecture.services.offline_sync.service import OfflineSync
+from apps.lecture.services.presence_broadcaster.service import PresenceBroadcaster
+from apps.lecture.services.progress_manager.service import ProgressManager
+from apps.lecture.services.progress_repository.service import ProgressRepository
 
-__all__ = ["TopicPlayerManager", "LectureImport", "HomePageManager"]
+__all__ = [
+    "TopicPlayerManager",
+    "LectureImport",
+    "HomePageManager",
+    "CatalogSampler",
+    "CatalogAggregates",
+    "CatalogChanges",
+    "HomeCards",
+    "TopicIndex",
+    "TopicArchive",
+    "MP3Frames",
+    "MP3FrameError",
+    "SeekIndex",
+    "Waveform",
+    "WaveformError",
+    "LecturePackager",
+    "PackagingError",
+    "CatalogVersion",
+    "ListenerPresence",
+    "ProgressBuffer",
+    "OfflineSync",
+    "PresenceBroadcaster",
+    "ProgressManager",
+    "ProgressRepository",
+]
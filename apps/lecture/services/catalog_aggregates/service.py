@@ -0,0 +1,166 @@
+from django.db import transaction
+from django.db.models import Count, Sum
+
+from apps.lecture.models import Lecture, Lecturer, Topic
+
+
+class CatalogAggregates:
+    """Maintains the denormalized counters on Topic and Lecturer.
+
+    Topic keeps its lecture count, total duration, total size and language
+    codes; Lecturer keeps its topic and lecture counts. Values are always
+    recomputed from the source rows (never incremented), so a refresh is
+    idempotent and safe to repeat. The catalog signals call it in the
+    transaction that changed the catalog, see ``CatalogChanges``.
+    """
+
+    TOPIC_FIELDS = ("lecture_count", "total_duration", "total_size", "language_codes")
+    LECTURER_FIELDS = ("topic_count", "lecture_count")
+
+    BATCH_SIZE = 500
+
+    def refresh_topics(self, topic_ids):
+        """Recompute the aggregates of the given topics"""
+        ids = self._clean_ids(topic_ids)
+        if not ids:
+            return 0
+
+        expected = self._compute_topics(ids)
+        topics = [Topic(id=pk, **values) for pk, values in expected.items()]
+        return Topic.objects.bulk_update(topics, self.TOPIC_FIELDS)
+
+    def refresh_lecturers(self, lecturer_ids):
+        """Recompute the aggregates of the given lecturers"""
+        ids = self._clean_ids(lecturer_ids)
+        if not ids:
+            return 0
+
+        expected = self._compute_lecturers(ids)
+        lecturers = [Lecturer(id=pk, **values) for pk, values in expected.items()]
+        return Lecturer.objects.bulk_update(lecturers, self.LECTURER_FIELDS)
+
+    def refresh_for_topics(self, topic_ids, lecturer_ids=()):
+        """Recompute topics together with the lecturers they belong to.
+
+        The topic and lecturer rows are locked first, in id order, so a
+        concurrent refresh of the same rows waits and then counts the rows
+        this transaction wrote.
+        """
+        ids = self._clean_ids(topic_ids)
+        with transaction.atomic():
+            lecturer_ids = self._clean_ids(
+                set(lecturer_ids)
+                | set(
+                    Topic.objects.select_for_update()
+                    .filter(id__in=ids)
+                    .order_by("id")
+                    .values_list("lecturer_id", flat=True)
+                )
+            )
+            list(
+                Lecturer.objects.select_for_update()
+                .filter(id__in=lecturer_ids)
+                .order_by("id")
+                .values_list("id", flat=True)
+            )
+            self.refresh_topics(ids)
+            self.refresh_lecturers(lecturer_ids)
+
+    def refresh_all(self):
+        """Recompute every topic and lecturer, returns updated row counts"""
+        topics = sum(self.refresh_topics(ids) for ids in self._batches(Topic.objects))
+        lecturers = sum(
+            self.refresh_lecturers(ids) for ids in self._batches(Lecturer.objects)
+        )
+        return topics, lecturers
+
+    def verify(self):
+        """Yield ``(model, id, field, stored, expected)`` for every mismatch"""
+        checks = (
+            (Topic, self.TOPIC_FIELDS, self._compute_topics),
+            (Lecturer, self.LECTURER_FIELDS, self._compute_lecturers),
+        )
+        for model, fields, compute in checks:
+            for ids in self._batches(model.objects):
+                expected = compute(ids)
+                stored = model.objects.filter(id__in=ids).values("id", *fields)
+                for row in stored:
+                    for field in fields:
+                        if row[field] != expected[row["id"]][field]:
+                            yield (
+                                model.__name__,
+                                row["id"],
+                                field,
+                                row[field],
+                                expected[row["id"]][field],
+                            )
+
+    def _compute_topics(self, ids):
+        expected = {
+            pk: {
+                "lecture_count": 0,
+                "total_duration": 0,
+                "total_size": 0,
+                "language_codes": "",
+            }
+            for pk in ids
+        }
+
+        stats = (
+            Lecture.objects.filter(topic_id__in=ids)
+            .order_by()
+            .values("topic_id")
+            .annotate(
+                count=Count("id"), duration=Sum("duration"), size=Sum("file_size")
+            )
+        )
+        for row in stats:
+            expected[row["topic_id"]].update(
+                lecture_count=row["count"],
+                total_duration=row["duration"] or 0,
+                total_size=row["size"] or 0,
+            )
+
+        languages = {}
+        for topic_id, code in (
+            Topic.languages.through.objects.filter(topic_id__in=ids)
+            .order_by("language__code")
+            .values_list("topic_id", "language__code")
+        ):
+            languages.setdefault(topic_id, []).append(code)
+        for topic_id, codes in languages.items():
+            expected[topic_id]["language_codes"] = ",".join(codes)
+
+        return expected
+
+    def _compute_lecturers(self, ids):
+        expected = {pk: {"topic_count": 0, "lecture_count": 0} for pk in ids}
+
+        topics = (
+            Topic.objects.filter(lecturer_id__in=ids)
+            .order_by()
+            .values("lecturer_id")
+            .annotate(count=Count("id"))
+        )
+        for row in topics:
+            expected[row["lecturer_id"]]["topic_count"] = row["count"]
+
+        lectures = (
+            Lecture.objects.filter(topic__lecturer_id__in=ids)
+            .order_by()
+            .values("topic__lecturer_id")
+            .annotate(count=Count("id"))
+        )
+        for row in lectures:
+            expected[row["topic__lecturer_id"]]["lecture_count"] = row["count"]
+
+        return expected
+
+    def _batches(self, manager):
+        ids = list(manager.order_by("id").values_list("id", flat=True))
+        for start in range(0, len(ids), self.BATCH_SIZE):
+            yield ids[start : start + self.BATCH_SIZE]
+
+    @staticmethod
+    def _clean_ids(ids):
+        return sorted({pk for pk in ids if pk is not None})
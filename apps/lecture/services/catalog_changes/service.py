@@ -0,0 +1,108 @@
+import threading
+from contextlib import contextmanager
+
+from django.db import transaction
+
+from apps.lecture.services.catalog_aggregates.service import CatalogAggregates
+from apps.lecture.services.catalog_sampler.service import CatalogSampler
+from apps.lecture.services.catalog_version.service import CatalogVersion
+from apps.lecture.services.topic_index.service import TopicIndex
+
+
+class CatalogChangeBatch:
+    """Topics and lecturers changed by one or more catalog writes"""
+
+    def __init__(self):
+        self.topic_ids = set()
+        self.lecturer_ids = set()
+        self.index_topic_ids = set()
+        self.catalog = False
+
+    def __bool__(self):
+        return bool(
+            self.topic_ids or self.lecturer_ids or self.index_topic_ids or self.catalog
+        )
+
+    def add(self, topic_ids=(), lecturer_ids=(), index_topic_ids=(), catalog=False):
+        self.topic_ids.update(pk for pk in topic_ids if pk is not None)
+        self.lecturer_ids.update(pk for pk in lecturer_ids if pk is not None)
+        self.index_topic_ids.update(pk for pk in index_topic_ids if pk is not None)
+        self.catalog = self.catalog or catalog
+
+    def refresh_aggregates(self):
+        if self.topic_ids or self.lecturer_ids:
+            CatalogAggregates().refresh_for_topics(
+                self.topic_ids, lecturer_ids=self.lecturer_ids
+            )
+
+    def invalidate(self):
+        if self.index_topic_ids:
+            TopicIndex.invalidate(*self.index_topic_ids)
+        if self.catalog:
+            CatalogSampler.invalidate()
+            CatalogVersion.bump()
+
+
+class CatalogChanges:
+    """Keeps catalog aggregates and caches in step with catalog writes.
+
+    The aggregates are refreshed in the transaction that changed the rows,
+    with the topic and lecturer rows locked, so they commit or roll back
+    together with them. Topic indexes, carousel pools and the catalog
+    version are only dropped once the transaction commits, so a concurrent
+    read can't cache the old rows again. ``deferred()`` runs a block of
+    writes as one transaction and refreshes once at its end, for imports
+    and cascade deletes that would otherwise refresh once per lecture.
+    """
+
+    _local = threading.local()
+
+    @classmethod
+    def record(cls, topic_ids=(), lecturer_ids=(), index_topic_ids=(), catalog=False):
+        batch = getattr(cls._local, "deferred", None)
+        if batch is None:
+            batch = CatalogChangeBatch()
+            batch.add(topic_ids, lecturer_ids, index_topic_ids, catalog)
+            cls._apply(batch)
+        else:
+            batch.add(topic_ids, lecturer_ids, index_topic_ids, catalog)
+
+    @classmethod
+    @contextmanager
+    def deferred(cls):
+        """Refresh once for every change made inside the block"""
+        if getattr(cls._local, "deferred", None) is not None:
+            # The outermost block refreshes
+            yield
+            return
+
+        batch = cls._local.deferred = CatalogChangeBatch()
+        try:
+            with transaction.atomic():
+                yield
+                cls._apply(batch)
+        finally:
+            cls._local.deferred = None
+
+    @classmethod
+    def _apply(cls, batch):
+        batch.refresh_aggregates()
+
+        pending = getattr(cls._local, "pending", None)
+        if pending is None:
+            pending = cls._local.pending = CatalogChangeBatch()
+        pending.add(index_topic_ids=batch.index_topic_ids, catalog=batch.catalog)
+        transaction.on_commit(cls._invalidate)
+
+    @classmethod
+    def _invalidate(cls):
+        """Drop the caches of everything pending on this thread's connection.
+
+        The callbacks of one transaction share the pending changes, the
+        first one to run drops them and the rest find nothing left. Changes
+        of a rolled back transaction stay pending until the next commit,
+        which then drops a few caches too many, never too few.
+        """
+        pending, cls._local.pending = getattr(cls._local, "pending", None), None
+        if pending:
+            pending.invalidate()
@@ -0,0 +1,70 @@
+import random
+
+from django.conf import settings
+from django.db.models import Max
+
+from apps.lecture.models import Lecture, Lecturer, Topic
+from apps.system.services import StaleCache
+
+
+class CatalogSampler:
+    """Random picks from the catalog without ``ORDER BY RANDOM()``.
+
+    Each pool is a cached list of primary keys. A sample of ids is drawn
+    from the pool in Python, so the cost no longer grows with the table
+    size; ``HomeCards`` turns the ids into cached card rows. Pools are dropped by the catalog
+    signals and rebuilt lazily on the next draw.
+    """
+
+    POOL_KEY = "catalog:pool:{name}"
+
+    POOL_LECTURERS = "lecturers"
+    POOL_TOPICS = "topics"
+    POOL_RECENT_LECTURES = "recent_lectures"
+
+    POOLS = (POOL_LECTURERS, POOL_TOPICS, POOL_RECENT_LECTURES)
+
+    def sample_ids(self, name, count):
+        """Return up to ``count`` random primary keys from a pool"""
+        pool = self.get_pool(name)
+        return random.sample(pool, min(count, len(pool)))
+
+    def get_pool(self, name):
+        """Cached primary keys of a pool, built on a miss"""
+        return StaleCache().get_or_compute(
+            self.POOL_KEY.format(name=name),
+            lambda: self._build_pool(name),
+            settings.CATALOG_POOL_TIMEOUT,
+        )
+
+    @classmethod
+    def invalidate(cls):
+        """Drop every pool, the next draw rebuilds it"""
+        StaleCache().delete(*[cls.POOL_KEY.format(name=name) for name in cls.POOLS])
+
+    def _build_pool(self, name):
+        if name == self.POOL_LECTURERS:
+            # The lecturer with order=1 is always shown first on the home page
+            return list(
+                Lecturer.objects.exclude(order=1)
+                .order_by()
+                .values_list("id", flat=True)
+            )
+
+        if name == self.POOL_TOPICS:
+            return list(Topic.objects.order_by().values_list("id", flat=True))
+
+        if name == self.POOL_RECENT_LECTURES:
+            latest_topic_date = Topic.objects.aggregate(Max("created_at"))[
+                "created_at__max"
+            ]
+            if not latest_topic_date:
+                return []
+
+            return list(
+                Lecture.objects.filter(topic__created_at__date=latest_topic_date.date())
+                .order_by()
+                .values_list("id", flat=True)
+            )
+
+        raise ValueError(f"Unknown catalog pool: {name}")
@@ -0,0 +1,33 @@
+import time
+
+from django.core.cache import cache
+
+
+class CatalogVersion:
+    """Global version of the public catalog.
+
+    Bumped by the catalog signals whenever a lecturer, topic or lecture
+    changes. Page and fragment cache keys include it, so a bump retires
+    every cached copy at once without having to find and delete them. The
+    time of the bump doubles as ``Last-Modified`` of catalog pages.
+    """
+
+    CACHE_KEY = "catalog:version"
+
+    @classmethod
+    def get(cls):
+        """Return ``(version, changed_at)``, starting a version if none exists"""
+        state = cache.get(cls.CACHE_KEY)
+        if state is None:
+            cache.add(cls.CACHE_KEY, cls._new_state(), None)
+            state = cache.get(cls.CACHE_KEY) or cls._new_state()
+        return state
+
+    @classmethod
+    def bump(cls):
+        """Start a new version, retiring everything cached under the old one"""
+        cache.set(cls.CACHE_KEY, cls._new_state(), None)
+
+    @staticmethod
+    def _new_state():
+        return time.time_ns() // 1000, time.time()
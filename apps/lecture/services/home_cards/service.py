@@ -0,0 +1,136 @@
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from apps.lecture.models import Lecture, Lecturer, Topic
+
+# Bump when a card gains, loses or reorders a field. The version is part
+# of every cache key, so rows of an older layout are never decoded.
+CARD_SCHEMA_VERSION = 1
+
+
+class CompactCard:
+    """Flat card that travels through the cache as a plain tuple"""
+
+    __slots__ = ()
+
+    def to_row(self) -> Tuple:
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    @classmethod
+    def from_row(cls, row):
+        return cls(*row)
+
+
+@dataclass(slots=True, frozen=True)
+class LecturerCard(CompactCard):
+    id: int
+    name: str
+    photo_url: Optional[str]
+    topic_count: int
+    lecture_count: int
+
+
+@dataclass(slots=True, frozen=True)
+class TopicCard(CompactCard):
+    id: int
+    title: str
+    cover_url: Optional[str]
+    lecturer_name: str
+    group_name: str
+    lecture_count: int
+    language_codes: Tuple[str, ...]
+
+
+@dataclass(slots=True, frozen=True)
+class LectureCard(CompactCard):
+    id: int
+    title: str
+    topic_title: str
+    lecturer_name: str
+    lecturer_photo_url: Optional[str]
+    language_code: str
+
+
+class HomeCards:
+    """Projects catalog rows into the cards ``home.html`` renders.
+
+    Each builder takes primary keys and returns cards in the same order,
+    reading only the columns the cards need: no model instances, no
+    prefetched relations. Counts come from the CatalogAggregates columns.
+    """
+
+    def lecturers(self, ids) -> List[LecturerCard]:
+        rows = Lecturer.objects.filter(id__in=ids).values_list(
+            "id", "name", "photo", "topic_count", "lecture_count"
+        )
+        cards = {
+            row[0]: LecturerCard(
+                id=row[0],
+                name=row[1],
+                photo_url=self._file_url(Lecturer, "photo", row[2]),
+                topic_count=row[3],
+                lecture_count=row[4],
+            )
+            for row in rows
+        }
+        return self._in_order(cards, ids)
+
+    def topics(self, ids) -> List[TopicCard]:
+        rows = Topic.objects.filter(id__in=ids).values_list(
+            "id",
+            "title",
+            "cover",
+            "lecturer__name",
+            "group__name",
+            "lecture_count",
+            "language_codes",
+        )
+        cards = {
+            row[0]: TopicCard(
+                id=row[0],
+                title=row[1],
+                cover_url=self._file_url(Topic, "cover", row[2]),
+                lecturer_name=row[3],
+                group_name=row[4],
+                lecture_count=row[5],
+                language_codes=tuple(row[6].split(",")) if row[6] else (),
+            )
+            for row in rows
+        }
+        return self._in_order(cards, ids)
+
+    def lectures(self, ids) -> List[LectureCard]:
+        rows = (
+            Lecture.objects.filter(id__in=ids)
+            .order_by()
+            .values_list(
+                "id",
+                "title",
+                "topic__title",
+                "topic__lecturer__name",
+                "topic__lecturer__photo",
+                "language__code",
+            )
+        )
+        cards = {
+            row[0]: LectureCard(
+                id=row[0],
+                title=row[1],
+                topic_title=row[2],
+                lecturer_name=row[3],
+                lecturer_photo_url=self._file_url(Lecturer, "photo", row[4]),
+                language_code=row[5],
+            )
+            for row in rows
+        }
+        return self._in_order(cards, ids)
+
+    @staticmethod
+    def _file_url(model, field_name, name):
+        if not name:
+            return None
+        return model._meta.get_field(field_name).storage.url(name)
+
+    @staticmethod
+    def _in_order(cards, ids):
+        return [cards[pk] for pk in ids if pk in cards]
@@ -1,28 +1,40 @@
 from django.utils import timezone
-from django.core.cache import cache
 from django.conf import settings
 from datetime import timedelta
 
-from django.db.models import Max, Prefetch
 from apps.lecture.models import (
     Lecturer,
-    Topic,
     Lecture,
     LectureProgress,
 )
+from apps.lecture.services.catalog_sampler.service import CatalogSampler
+from apps.lecture.services.home_cards.service import (
+    CARD_SCHEMA_VERSION,
+    HomeCards,
+    LectureCard,
+    LecturerCard,
+    TopicCard,
+)
+from apps.lecture.services.listener_presence.service import ListenerPresence
+from apps.system.services import Logger, StaleCache
+
+logger = Logger(app_name="home_page_manager")
 
 
 class HomePageManager:
     """Manager class for home page data logic"""
 
-    # Cache keys
-    CACHE_KEY_FIRST_LECTURER = "home:first_lecturer"
-    CACHE_KEY_RANDOM_LECTURERS = "home:random_lecturers"
-    CACHE_KEY_RANDOM_TOPICS = "home:random_topics"
-    CACHE_KEY_RECENT_LECTURES = "home:recent_lectures"
+    # Cache keys, versioned with the card layout stored under them
+    CACHE_KEY_FIRST_LECTURER = f"home:first_lecturer:v{CARD_SCHEMA_VERSION}"
+    CACHE_KEY_RANDOM_LECTURERS = f"home:random_lecturers:v{CARD_SCHEMA_VERSION}"
+    CACHE_KEY_RANDOM_TOPICS = f"home:random_topics:v{CARD_SCHEMA_VERSION}"
+    CACHE_KEY_RECENT_LECTURES = f"home:recent_lectures:v{CARD_SCHEMA_VERSION}"
 
     def __init__(self, user):
         self.user = user
+        self.sampler = CatalogSampler()
+        self.cards = HomeCards()
+        self.cache = StaleCache()
 
     @property
     def is_authenticated(self):
@@ -30,80 +42,55 @@ class HomePageManager:
 
     def get_lecturers_data(self):
         """Get lecturers with order=1 first, then 4 random others"""
-        # Get the first lecturer from cache or DB
-        first_lecturer = cache.get(self.CACHE_KEY_FIRST_LECTURER)
-        if first_lecturer is None:
-            first_lecturer = (
-                Lecturer.objects.prefetch_related("topics").filter(order=1).first()
-            )
-            cache.set(
-                self.CACHE_KEY_FIRST_LECTURER,
-                first_lecturer,
-                settings.CACHE_TIMEOUT_LONG,
-            )
+        first_lecturer = self._cached_cards(
+            self.CACHE_KEY_FIRST_LECTURER,
+            LecturerCard,
+            lambda: self.cards.lecturers(
+                list(Lecturer.objects.filter(order=1).values_list("id", flat=True)[:1])
+            ),
+            settings.CACHE_TIMEOUT_LONG,
+        )
 
         # Random lecturers - shorter cache (they change each load)
-        other_lecturers = cache.get(self.CACHE_KEY_RANDOM_LECTURERS)
-        if other_lecturers is None:
-            other_lecturers = list(
-                Lecturer.objects.prefetch_related("topics")
-                .exclude(id=first_lecturer.id if first_lecturer else None)
-                .order_by("?")[:4]
-            )
-            cache.set(
-                self.CACHE_KEY_RANDOM_LECTURERS,
-                other_lecturers,
-                settings.CACHE_TIMEOUT_SHORT,
-            )
-
-        # Combine them
-        lecturers = []
-        if first_lecturer:
-            lecturers.append(first_lecturer)
-        lecturers.extend(other_lecturers)
+        other_lecturers = self._cached_cards(
+            self.CACHE_KEY_RANDOM_LECTURERS,
+            LecturerCard,
+            lambda: self.cards.lecturers(
+                self.sampler.sample_ids(CatalogSampler.POOL_LECTURERS, 4)
+            ),
+            settings.CACHE_TIMEOUT_SHORT,
+        )
 
-        return lecturers
+        return first_lecturer + other_lecturers
 
     def get_random_topics(self):
         """Get 5 random topics with their lecturers"""
-        topics = cache.get(self.CACHE_KEY_RANDOM_TOPICS)
-        if topics is None:
-            topics = list(
-                Topic.objects.select_related("lecturer")
-                .prefetch_related("lectures")
-                .order_by("?")[:5]
-            )
-            cache.set(self.CACHE_KEY_RANDOM_TOPICS, topics, settings.CACHE_TIMEOUT_SHORT)
-        return topics
+        return self._cached_cards(
+            self.CACHE_KEY_RANDOM_TOPICS,
+            TopicCard,
+            lambda: self.cards.topics(
+                self.sampler.sample_ids(CatalogSampler.POOL_TOPICS, 5)
+            ),
+            settings.CACHE_TIMEOUT_SHORT,
+        )
 
     def get_recent_lectures_from_latest_topics(self):
         """Get random lectures from the most recently created topics"""
-        recent_lectures = cache.get(self.CACHE_KEY_RECENT_LECTURES)
-        if recent_lectures is None:
-            # Get the latest topic creation date
-            latest_topic_date = Topic.objects.aggregate(Max("created_at"))[
-                "created_at__max"
-            ]
-
-            if not latest_topic_date:
-                return Lecture.objects.none()
-
-            # Get topics created in the last period (same day as the latest)
-            latest_topics = Topic.objects.filter(created_at__date=latest_topic_date.date())
-
-            # Get random lectures from these latest topics
-            recent_lectures = list(
-                Lecture.objects.select_related("topic", "topic__lecturer")
-                .filter(topic__in=latest_topics)
-                .order_by("?")[:5]
-            )
-            cache.set(
-                self.CACHE_KEY_RECENT_LECTURES,
-                recent_lectures,
-                settings.CACHE_TIMEOUT_SHORT,
-            )
+        return self._cached_cards(
+            self.CACHE_KEY_RECENT_LECTURES,
+            LectureCard,
+            lambda: self.cards.lectures(
+                self.sampler.sample_ids(CatalogSampler.POOL_RECENT_LECTURES, 5)
+            ),
+            settings.CACHE_TIMEOUT_SHORT,
+        )
 
-        return recent_lectures
+    def _cached_cards(self, key, card_class, build, timeout):
+        """Cache cards as plain tuples and rebuild the dataclasses on read"""
+        rows = self.cache.get_or_compute(
+            key, lambda: [card.to_row() for card in build()], timeout
+        )
+        return [card_class.from_row(row) for row in rows]
 
     def get_favorite_lectures(self):
         """Get user's favorite lectures"""
@@ -133,6 +120,11 @@ class HomePageManager:
         if not self.is_authenticated:
             return LectureProgress.objects.none()
 
+        try:
+            return ListenerPresence().get_recent(5, exclude_user_id=self.user.id)
+        except Exception as e:
+            logger.error(f"Listener presence unavailable, using DB: {str(e)}")
+
         one_minute_ago = timezone.now() - timedelta(minutes=1)
 
         return (
@@ -1,10 +1,18 @@
 import os
 import re
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
 import mutagen
 
+from django.conf import settings
 from django.db import transaction
 from django.core.files.storage import default_storage
 from apps.lecture.models import Lecture, Language
+from apps.lecture.services.catalog_changes.service import CatalogChanges
+from apps.lecture.services.mp3_frames.service import MP3FrameError
+from apps.lecture.services.seek_index.service import SeekIndex
+from apps.lecture.services.waveform.service import Waveform, WaveformError
 from apps.system.services import Logger
 
 logger = Logger(app_name="lecture_import")
@@ -16,6 +24,7 @@ class LectureImport:
         self.topic = topic
         # Get or create Russian language as default
         self.default_language = self._get_default_language()
+        self.waveform = Waveform()
 
     def _get_default_language(self):
         """Get or create Russian language as default"""
@@ -60,23 +69,35 @@ class LectureImport:
 
         logger.info(f"Starting order number: {next_order}")
 
+        audio_files = []
+        file_hashes = set()
         for idx, file in enumerate(files_list, 1):
             logger.info(
                 f"[{idx}/{len(files_list)}] Processing file: {file.name}",
                 f"Size: {file.size} bytes",
-                f"Current order: {next_order}",
             )
 
-            if self._is_audio_file(file.name):
-                # Check for duplicate hash
-                if self._check_duplicate_by_hash(file.name):
-                    skipped_count += 1
-                    logger.warning(
-                        f"Duplicate file found by hash, skipping: {file.name}"
-                    )
-                    continue
+            if not self._is_audio_file(file.name):
+                skipped_count += 1
+                logger.warning(f"Skipped non-audio file: {file.name}")
+                continue
 
-                if self._create_lecture(file, next_order):
+            # Check for duplicate hash, also within this upload
+            file_hash = Lecture.generate_file_hash(file.name)
+            if file_hash in file_hashes or self._check_duplicate_by_hash(file.name):
+                skipped_count += 1
+                logger.warning(f"Duplicate file found by hash, skipping: {file.name}")
+                continue
+
+            file_hashes.add(file_hash)
+            audio_files.append(file)
+
+        # One transaction for the upload, the catalog is refreshed once at its end
+        with CatalogChanges.deferred():
+            for file, metadata in self._with_metadata(audio_files):
+                if metadata is not None and self._create_lecture(
+                    file, next_order, metadata
+                ):
                     imported_count += 1
                     logger.success(
                         f"[{imported_count}] Successfully imported: {file.name} (order: {next_order})"
@@ -85,9 +106,6 @@ class LectureImport:
                 else:
                     failed_count += 1
                     logger.error(f"Failed to import: {file.name}")
-            else:
-                skipped_count += 1
-                logger.warning(f"Skipped non-audio file: {file.name}")
 
         logger.success(
             "Import completed",
@@ -150,8 +168,48 @@ class LectureImport:
 
         return exists
 
-    def _create_lecture(self, uploaded_file, order):
-        """Create lecture from uploaded file"""
+    def _with_metadata(self, uploaded_files):
+        """Yield ``(file, metadata)`` in upload order.
+
+        Metadata is read in a bounded thread pool, up to twice the worker
+        count of files ahead, while the caller writes the current file to
+        storage. Each file is only touched by one worker until its result
+        is yielded. Metadata is ``None`` for a file whose worker failed.
+        """
+        workers = settings.LECTURE_IMPORT_WORKERS
+        with ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="lecture-import"
+        ) as executor:
+            pending = deque()
+            for uploaded_file in uploaded_files:
+                future = executor.submit(self._extract_metadata, uploaded_file)
+                pending.append((uploaded_file, future))
+                if len(pending) > 2 * workers:
+                    yield self._metadata_result(*pending.popleft())
+
+            while pending:
+                yield self._metadata_result(*pending.popleft())
+
+    def _metadata_result(self, uploaded_file, future):
+        """``(file, metadata)`` of a finished worker, one failure must not
+        end the whole import"""
+        try:
+            return uploaded_file, future.result()
+        except Exception as e:
+            logger.error(f"Error reading metadata of {uploaded_file.name}: {str(e)}")
+            return uploaded_file, None
+
+    def _extract_metadata(self, uploaded_file):
+        """Duration, seek table and waveform peaks of an uploaded file"""
+        duration = self._get_duration_from_file(uploaded_file)
+        logger.debug(f"Duration extracted: '{duration}'")
+
+        seek_index = self._build_seek_index(uploaded_file)
+        peaks = self._compute_waveform(uploaded_file)
+        return duration, seek_index, peaks
+
+    def _create_lecture(self, uploaded_file, order, metadata):
+        """Create lecture from uploaded file and its extracted metadata"""
         try:
             with transaction.atomic():
                 logger.debug(f"Creating lecture from file: {uploaded_file.name}")
@@ -162,10 +220,7 @@ class LectureImport:
                 title = self._extract_title(uploaded_file.name)
                 file_size = uploaded_file.size
                 file_hash = Lecture.generate_file_hash(uploaded_file.name)
-
-                # Get duration before any file operations
-                duration = self._get_duration_from_file(uploaded_file)
-                logger.debug(f"Duration extracted: '{duration}'")
+                duration, seek_index, peaks = metadata
 
                 # Double-check for duplicates before creating
                 if self.topic.lectures.filter(file_hash=file_hash).exists():
@@ -187,6 +242,14 @@ class LectureImport:
                     file_hash=file_hash,
                 )
 
+                if seek_index is not None:
+                    seek_index.save(lecture)
+                if peaks is not None:
+                    self.waveform.save(lecture, peaks)
+
+                if settings.AUDIO_SEGMENTING:
+                    self._schedule_packaging(lecture)
+
                 # Verify the file was saved correctly
                 logger.debug(f"File saved to storage: {lecture.audio_file.name}")
                 logger.debug(f"File URL: {lecture.audio_file.url}")
@@ -250,18 +313,18 @@ class LectureImport:
         return cleaned_title
 
     def _get_duration_from_file(self, uploaded_file):
-        """Get audio duration from uploaded file in seconds"""
+        """Get audio duration from uploaded file in seconds.
+
+        mutagen gets the temporary upload path or the open file, so only
+        the tags and the first frames are read, not the whole file.
+        """
         try:
             logger.debug(f"Extracting duration from: {uploaded_file.name}")
 
-            # Create temporary file-like object
-            file_data = uploaded_file.read()
-            uploaded_file.seek(0)  # Reset file pointer
-
-            # Try to get duration with mutagen
-            from io import BytesIO
-
-            audio_file = mutagen.File(BytesIO(file_data))
+            if hasattr(uploaded_file, "temporary_file_path"):
+                audio_file = mutagen.File(uploaded_file.temporary_file_path())
+            else:
+                audio_file = mutagen.File(uploaded_file.file)
 
             if audio_file and hasattr(audio_file.info, "length"):
                 seconds = int(audio_file.info.length)
@@ -274,5 +337,47 @@ class LectureImport:
             logger.error(
                 f"Error extracting duration from {uploaded_file.name}: {str(e)}"
             )
+        finally:
+            uploaded_file.seek(0)
 
         return None
+
+    def _build_seek_index(self, uploaded_file):
+        """Build the time to byte table of an MP3, None for other formats"""
+        try:
+            seek_index = SeekIndex.build(uploaded_file)
+            logger.debug(f"Seek index built: {len(seek_index)} entries")
+            return seek_index
+        except MP3FrameError as e:
+            logger.warning(f"No seek index for {uploaded_file.name}: {str(e)}")
+        except Exception as e:
+            logger.error(
+                f"Error building seek index for {uploaded_file.name}: {str(e)}"
+            )
+        finally:
+            uploaded_file.seek(0)
+
+        return None
+
+    def _compute_waveform(self, uploaded_file):
+        """Peaks for the player scrubber, None if the file can't be read"""
+        try:
+            peaks = self.waveform.compute(uploaded_file)
+            logger.debug(f"Waveform computed: {len(peaks)} buckets")
+            return peaks
+        except (MP3FrameError, WaveformError) as e:
+            logger.warning(f"No waveform for {uploaded_file.name}: {str(e)}")
+        except Exception as e:
+            logger.error(f"Error computing waveform for {uploaded_file.name}: {str(e)}")
+        finally:
+            uploaded_file.seek(0)
+
+        return None
+
+    def _schedule_packaging(self, lecture):
+        """Segment the lecture in a worker once the import is committed"""
+        # Imported here, the tasks module imports the services package
+        from apps.lecture.tasks import package_lecture_audio
+
+        lecture_id = lecture.id
+        transaction.on_commit(lambda: package_lecture_audio.delay(lecture_id))
@@ -0,0 +1,171 @@
+import os
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+
+from apps.lecture.models import Lecture
+from apps.lecture.services.seek_index.service import SeekIndex
+from apps.system.services import Logger
+
+logger = Logger(app_name="lecture_packager")
+
+
+class PackagingError(ValueError):
+    """Raised for a lecture that can't be cut into segments"""
+
+
+class LecturePackager:
+    """Cut a lecture MP3 into fixed-duration segments with an HLS playlist.
+
+    Segments are plain byte slices of the file at frame boundaries, no
+    re-encoding, cut at the entries of the lecture's ``SeekIndex`` built at
+    import. Each starts with the ID3 timestamp tag HLS packed audio
+    requires; MSE parsers skip it. The package is stored next to the
+    original under ``<name>.hls/<content hash>/``, so a new upload gets new
+    segment URLs and copies cached by a CDN never go stale.
+    """
+
+    MANIFEST_NAME = "index.m3u8"
+    SEGMENT_NAME = "segment{number:05d}.mp3"
+    HASH_LENGTH = 16
+
+    TIMESTAMP_OWNER = b"com.apple.streaming.transportStreamTimestamp"
+    TIMESTAMP_CLOCK = 90000
+
+    def __init__(self, segment_duration=None, storage=None):
+        self.segment_duration = segment_duration or settings.AUDIO_SEGMENT_DURATION
+        self.storage = storage or default_storage
+
+    def directory(self, lecture):
+        stem = os.path.splitext(lecture.audio_file.name)[0]
+        version = lecture.content_hash[: self.HASH_LENGTH]
+        return f"{stem}.hls/{version}/"
+
+    def package(self, lecture, force=False):
+        """Write the segments and playlist, return the playlist name.
+
+        Raises ``PackagingError``, or ``MP3FrameError`` for other formats.
+        """
+        if not lecture.audio_file:
+            raise PackagingError("Lecture has no audio file")
+        if not lecture.content_hash:
+            raise PackagingError("Content hash missing, run lecture_content_hash")
+
+        directory = self.directory(lecture)
+        manifest_name = directory + self.MANIFEST_NAME
+
+        if not force and self.storage.exists(manifest_name):
+            self._save_manifest_name(lecture, manifest_name)
+            return manifest_name
+
+        # Segments of a forced or interrupted earlier run
+        self._remove(directory)
+
+        segments = self._segments(self._seek_index(lecture))
+        with lecture.audio_file.open("rb") as audio:
+            entries = []
+            for number, (start, end, start_time, duration) in enumerate(segments):
+                audio.seek(start)
+                content = self._timestamp_tag(start_time) + audio.read(end - start)
+                name = self.storage.save(
+                    directory + self.SEGMENT_NAME.format(number=number),
+                    ContentFile(content),
+                )
+                entries.append((os.path.basename(name), duration))
+
+        manifest_name = self.storage.save(
+            manifest_name, ContentFile(self._manifest(entries).encode())
+        )
+        self._save_manifest_name(lecture, manifest_name)
+        self._remove_other_versions(directory)
+
+        logger.info(
+            f"Lecture {lecture.id} packaged:",
+            f"Segments: {len(entries)}",
+            f"Playlist: {manifest_name}",
+        )
+        return manifest_name
+
+    @staticmethod
+    def _seek_index(lecture):
+        """Stored seek table, built and stored first if missing or stale"""
+        seek_index = SeekIndex.for_lecture(lecture)
+        if seek_index is None or not seek_index.frame_duration:
+            with lecture.audio_file.open("rb") as audio:
+                seek_index = SeekIndex.build(audio)
+            seek_index.save(lecture)
+        return seek_index
+
+    def _segments(self, seek_index):
+        """``(start, end, start_time, duration)`` of each segment"""
+        if not len(seek_index):
+            raise PackagingError("No audio frames")
+
+        step = max(round(self.segment_duration / seek_index.interval), 1)
+        entries = range(0, len(seek_index), step)
+        segments = []
+        for number, entry in enumerate(entries):
+            start_time = seek_index.time(entry)
+            if number + 1 < len(entries):
+                end = seek_index.offsets[entries[number + 1]]
+                end_time = seek_index.time(entries[number + 1])
+            else:
+                end, end_time = seek_index.data_end, seek_index.duration
+            segments.append(
+                (seek_index.offsets[entry], end, start_time, end_time - start_time)
+            )
+        return segments
+
+    def _manifest(self, entries):
+        # HLS compares the rounded segment durations with the target
+        target = max(round(max(duration for _, duration in entries)), 1)
+        lines = [
+            "#EXTM3U",
+            "#EXT-X-VERSION:3",
+            f"#EXT-X-TARGETDURATION:{target}",
+            "#EXT-X-MEDIA-SEQUENCE:0",
+            "#EXT-X-PLAYLIST-TYPE:VOD",
+        ]
+        for name, duration in entries:
+            lines += [f"#EXTINF:{duration:.5f},", name]
+        lines.append("#EXT-X-ENDLIST")
+        return "\n".join(lines) + "\n"
+
+    def _timestamp_tag(self, seconds):
+        """ID3v2.4 tag with the PRIV frame carrying the 33-bit MPEG-2 timestamp"""
+        timestamp = round(seconds * self.TIMESTAMP_CLOCK) % (1 << 33)
+        data = self.TIMESTAMP_OWNER + b"\0" + timestamp.to_bytes(8, "big")
+        frame = b"PRIV" + self._syncsafe(len(data)) + b"\0\0" + data
+        return b"ID3\x04\x00\x00" + self._syncsafe(len(frame)) + frame
+
+    @staticmethod
+    def _syncsafe(value):
+        return bytes((value >> shift) & 0x7F for shift in (21, 14, 7, 0))
+
+    def _save_manifest_name(self, lecture, manifest_name):
+        # Only if the audio did not change while the package was written
+        Lecture.objects.filter(id=lecture.id, content_hash=lecture.content_hash).update(
+            audio_manifest=manifest_name
+        )
+        lecture.audio_manifest = manifest_name
+
+    def _remove(self, directory):
+        try:
+            _, files = self.storage.listdir(directory)
+        except FileNotFoundError:
+            return
+        for name in files:
+            self.storage.delete(directory + name)
+
+    def _remove_other_versions(self, directory):
+        """Drop the packages of earlier uploads of this lecture"""
+        parent = os.path.dirname(directory.rstrip("/")) + "/"
+        current = os.path.basename(directory.rstrip("/"))
+        try:
+            versions, _ = self.storage.listdir(parent)
+        except FileNotFoundError:
+            return
+        for version in versions:
+            if version != current:
+                self._remove(f"{parent}{version}/")
@@ -0,0 +1,212 @@
+import json
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+from django.conf import settings
+
+from apps.lecture.models import Lecture
+from apps.system.services import Logger, RedisClient
+
+logger = Logger(app_name="listener_presence")
+
+
+@dataclass(slots=True)
+class PresenceUser:
+    id: int
+    email: str
+
+
+@dataclass(slots=True)
+class ListenerSession:
+    """What one user is listening to right now"""
+
+    user: PresenceUser
+    lecture: Lecture
+    updated_at: datetime
+
+
+class ListenerPresence:
+    """Live "now listening" index fed by progress heartbeats.
+
+    Redis layout:
+        presence:listeners            - zset user_id -> last seen (unix time)
+        presence:sessions             - hash user_id -> json session info
+        presence:lecture:<lecture_id> - zset user_id -> last seen
+        presence:topic:<topic_id>     - zset user_id -> last seen
+
+    Entries older than ``PRESENCE_TTL`` seconds are ignored on read and
+    removed by ``sweep``. Reads are range queries over the sorted sets,
+    so they never scan LectureProgress.
+    """
+
+    LISTENERS_KEY = "presence:listeners"
+    SESSIONS_KEY = "presence:sessions"
+    LECTURE_KEY = "presence:lecture:{lecture_id}"
+    TOPIC_KEY = "presence:topic:{topic_id}"
+
+    # Atomic so a heartbeat racing the sweep can't lose its fresh session
+    SWEEP_SCRIPT = """
+    local expired = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, ARGV[2])
+    local result = {}
+    for _, user_id in ipairs(expired) do
+        local session = redis.call('HGET', KEYS[2], user_id)
+        redis.call('ZREM', KEYS[1], user_id)
+        redis.call('HDEL', KEYS[2], user_id)
+        if session then
+            local data = cjson.decode(session)
+            redis.call('ZREM', 'presence:lecture:' .. data.lecture_id, user_id)
+            redis.call('ZREM', 'presence:topic:' .. data.topic_id, user_id)
+            table.insert(result, user_id)
+            table.insert(result, session)
+        end
+    end
+    return result
+    """
+
+    def __init__(self, client=None):
+        self.client = client or RedisClient.get()
+        self.ttl = settings.PRESENCE_TTL
+
+    def _cutoff(self, now=None):
+        return (now or time.time()) - self.ttl
+
+    def touch(self, user, lecture):
+        """Register a heartbeat of ``user`` playing ``lecture``.
+
+        Returns the resulting presence change (``joined`` or ``moved``) or
+        None when the user just keeps listening to the same lecture.
+        """
+        now = time.time()
+        pipe = self.client.pipeline(transaction=False)
+        pipe.hget(self.SESSIONS_KEY, user.id)
+        pipe.zscore(self.LISTENERS_KEY, user.id)
+        stored, last_seen = pipe.execute()
+
+        stored = json.loads(stored) if stored else None
+        is_live = last_seen is not None and last_seen > self._cutoff(now)
+        previous = stored if is_live else None
+
+        change = {
+            "user_id": user.id,
+            "email": user.email,
+            "lecture_id": lecture.id,
+            "topic_id": lecture.topic_id,
+        }
+        if previous is None:
+            change["event"] = "joined"
+        elif previous["lecture_id"] != lecture.id:
+            change.update(
+                event="moved",
+                from_lecture_id=previous["lecture_id"],
+                from_topic_id=previous["topic_id"],
+            )
+        else:
+            change = None
+
+        pipe = self.client.pipeline(transaction=True)
+        if stored:
+            if stored["lecture_id"] != lecture.id:
+                pipe.zrem(
+                    self.LECTURE_KEY.format(lecture_id=stored["lecture_id"]), user.id
+                )
+            if stored["topic_id"] != lecture.topic_id:
+                pipe.zrem(self.TOPIC_KEY.format(topic_id=stored["topic_id"]), user.id)
+
+        pipe.zadd(self.LISTENERS_KEY, {user.id: now})
+        pipe.hset(
+            self.SESSIONS_KEY,
+            user.id,
+            json.dumps(
+                {
+                    "lecture_id": lecture.id,
+                    "topic_id": lecture.topic_id,
+                    "email": user.email,
+                }
+            ),
+        )
+        for key in (
+            self.LECTURE_KEY.format(lecture_id=lecture.id),
+            self.TOPIC_KEY.format(topic_id=lecture.topic_id),
+        ):
+            pipe.zadd(key, {user.id: now})
+            # Idle per-lecture/topic sets disappear on their own
+            pipe.expire(key, self.ttl * 2)
+        pipe.execute()
+
+        return change
+
+    def get_recent(self, limit, exclude_user_id=None):
+        """Most recently active listeners, newest first"""
+        raw = self.client.zrevrangebyscore(
+            self.LISTENERS_KEY,
+            "+inf",
+            self._cutoff(),
+            start=0,
+            num=limit + 1,
+            withscores=True,
+        )
+        raw = [
+            (int(user_id), score)
+            for user_id, score in raw
+            if int(user_id) != exclude_user_id
+        ][:limit]
+        if not raw:
+            return []
+
+        sessions = self.client.hmget(self.SESSIONS_KEY, [user_id for user_id, _ in raw])
+        entries = [
+            (user_id, score, json.loads(session))
+            for (user_id, score), session in zip(raw, sessions)
+            if session
+        ]
+
+        lectures = Lecture.objects.select_related(
+            "topic__lecturer", "language"
+        ).in_bulk({session["lecture_id"] for _, _, session in entries})
+
+        result = []
+        for user_id, score, session in entries:
+            lecture = lectures.get(session["lecture_id"])
+            if lecture is None:
+                continue
+            result.append(
+                ListenerSession(
+                    user=PresenceUser(id=user_id, email=session["email"]),
+                    lecture=lecture,
+                    updated_at=datetime.fromtimestamp(score, timezone.utc),
+                )
+            )
+        return result
+
+    def count_for_lecture(self, lecture_id):
+        """Number of users listening to a lecture right now"""
+        return self.client.zcount(
+            self.LECTURE_KEY.format(lecture_id=lecture_id), self._cutoff(), "+inf"
+        )
+
+    def count_for_topic(self, topic_id):
+        """Number of users listening to any lecture of a topic right now"""
+        return self.client.zcount(
+            self.TOPIC_KEY.format(topic_id=topic_id), self._cutoff(), "+inf"
+        )
+
+    def count_for_lectures(self, lecture_ids):
+        """Listener counts for several lectures keyed by lecture id"""
+        lecture_ids = list(lecture_ids)
+        cutoff = self._cutoff()
+        pipe = self.client.pipeline(transaction=False)
+        for lecture_id in lecture_ids:
+            pipe.zcount(self.LECTURE_KEY.format(lecture_id=lecture_id), cutoff, "+inf")
+        return dict(zip(lecture_ids, pipe.execute()))
+
+    def sweep(self, batch_size=1000):
+        """Drop expired listeners, returns their sessions keyed by user id"""
+        result = self.client.register_script(self.SWEEP_SCRIPT)(
+            keys=[self.LISTENERS_KEY, self.SESSIONS_KEY],
+            args=[self._cutoff(), batch_size],
+        )
+        return {
+            int(user_id): json.loads(session)
+            for user_id, session in zip(result[::2], result[1::2])
+        }
@@ -0,0 +1,228 @@
+import os
+
+import mutagen
+import mutagen.mp3
+
+# Bitrates in kbit/s by (MPEG version, layer), MPEG 2.5 uses the version 2 rows
+BITRATES = {
+    (1, 1): (0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+    (1, 2): (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+    (1, 3): (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    (2, 1): (0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+    (2, 2): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    (2, 3): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+SAMPLE_RATES = {
+    1: (44100, 48000, 32000),
+    2: (22050, 24000, 16000),
+    25: (11025, 12000, 8000),
+}
+VERSIONS = {3: 1, 2: 2, 0: 25}
+LAYERS = {3: 1, 2: 2, 1: 3}
+
+# Sync, version, layer and sample rate stay the same in every frame of a file
+STREAM_MASK = 0xFFFE0C00
+
+
+class MP3FrameError(ValueError):
+    """Raised for a file without MPEG audio frames"""
+
+
+class MP3Frames:
+    """Walk the MPEG audio frames of an MP3 file without decoding it.
+
+    Each frame header gives the byte length and the number of samples of
+    the frame, so the playback time of every frame boundary is exact, also
+    in VBR files. mutagen validates the file first. The ID3v2 tag and a
+    leading Xing/Info/VBRI frame are skipped, junk between frames is
+    resynced over, and trailing ID3v1/APE tags end the walk.
+
+    Iterating yields ``(offset, length)`` of each frame. Afterwards
+    ``data_start``, ``data_end`` and ``frame_count`` describe the audio.
+    """
+
+    HEADER_SIZE = 4
+    # Give up resyncing after this much junk between frames
+    MAX_JUNK = 64 * 1024
+    SCAN_BLOCK = 8 * 1024
+
+    def __init__(self, file):
+        self.file = file
+        self.size = self._file_size()
+
+        self.sample_rate = None
+        self.samples_per_frame = None
+        self.data_start = None
+        self.data_end = None
+        self.frame_count = 0
+
+        self._validate()
+        self._first = self._find_first_frame()
+
+    @property
+    def frame_duration(self):
+        """Seconds of audio in one frame"""
+        return self.samples_per_frame / self.sample_rate
+
+    @property
+    def duration(self):
+        return self.frame_count * self.frame_duration
+
+    def __iter__(self):
+        offset, header = self._first
+        stream = header & STREAM_MASK
+        self.data_start = offset
+        self.data_end = offset
+        self.frame_count = 0
+
+        while offset + self.HEADER_SIZE <= self.size:
+            header = self._header_at(offset)
+            frame = self._parse(header) if header is not None else None
+            if frame is None or header & STREAM_MASK != stream:
+                offset = self._resync(offset + 1, stream)
+                if offset is None:
+                    break
+                continue
+
+            length = frame[0]
+            if offset + length > self.size:
+                # Truncated last frame
+                break
+
+            yield offset, length
+            self.frame_count += 1
+            offset += length
+            self.data_end = offset
+
+    def _validate(self):
+        try:
+            mutagen.mp3.MP3(self.file)
+        except mutagen.MutagenError as e:
+            raise MP3FrameError(f"Not an MP3 file: {e}") from e
+        finally:
+            self.file.seek(0)
+
+    def _find_first_frame(self):
+        offset = self._resync(self._id3v2_size(), None, limit=self.size)
+        if offset is None:
+            raise MP3FrameError("No MPEG audio frame found")
+
+        header = self._header_at(offset)
+        length, samples, sample_rate = self._parse(header)
+        self.sample_rate = sample_rate
+        self.samples_per_frame = samples
+
+        if self._is_info_frame(offset, header):
+            # Xing/Info/VBRI frame: encoder metadata, not audio
+            offset += length
+            header = self._header_at(offset)
+            if header is None or self._parse(header) is None:
+                raise MP3FrameError("No MPEG audio frame after the Xing header")
+
+        return offset, header
+
+    def _id3v2_size(self):
+        self.file.seek(0)
+        tag = self.file.read(10)
+        if len(tag) < 10 or tag[:3] != b"ID3":
+            return 0
+
+        size = 0
+        for byte in tag[6:10]:
+            size = (size << 7) | (byte & 0x7F)
+        footer = 10 if tag[5] & 0x10 else 0
+        return 10 + size + footer
+
+    def _is_info_frame(self, offset, header):
+        version = VERSIONS[(header >> 19) & 3]
+        mono = (header >> 6) & 3 == 3
+        if version == 1:
+            side_info = 17 if mono else 32
+        else:
+            side_info = 9 if mono else 17
+
+        self.file.seek(offset + self.HEADER_SIZE)
+        head = self.file.read(36)
+        xing = head[side_info : side_info + 4]
+        return xing in (b"Xing", b"Info") or head[32:36] == b"VBRI"
+
+    def _resync(self, offset, stream, limit=None):
+        """Next offset holding two consecutive valid frames, or ``None``"""
+        end = min(self.size, offset + (limit or self.MAX_JUNK))
+        while offset < end:
+            self.file.seek(offset)
+            block = self.file.read(self.SCAN_BLOCK + self.HEADER_SIZE)
+            if len(block) < self.HEADER_SIZE:
+                return None
+
+            position = block.find(b"\xff")
+            while 0 <= position < len(block) - self.HEADER_SIZE + 1:
+                candidate = offset + position
+                if self._is_frame_start(candidate, stream):
+                    return candidate
+                position = block.find(b"\xff", position + 1)
+
+            offset += self.SCAN_BLOCK
+        return None
+
+    def _is_frame_start(self, offset, stream):
+        header = self._header_at(offset)
+        if header is None:
+            return False
+        frame = self._parse(header)
+        if frame is None or (stream is not None and header & STREAM_MASK != stream):
+            return False
+
+        following = offset + frame[0]
+        if following + self.HEADER_SIZE > self.size:
+            # The last frame of the file has nothing after it to confirm it
+            return following <= self.size
+
+        next_header = self._header_at(following)
+        return (
+            next_header is not None
+            and self._parse(next_header) is not None
+            and next_header & STREAM_MASK == header & STREAM_MASK
+        )
+
+    def _header_at(self, offset):
+        self.file.seek(offset)
+        data = self.file.read(self.HEADER_SIZE)
+        if len(data) < self.HEADER_SIZE:
+            return None
+        return int.from_bytes(data, "big")
+
+    @staticmethod
+    def _parse(header):
+        """Return ``(length, samples, sample_rate)`` or ``None`` if invalid"""
+        if header >> 21 != 0x7FF:
+            return None
+
+        version = VERSIONS.get((header >> 19) & 3)
+        layer = LAYERS.get((header >> 17) & 3)
+        bitrate_index = (header >> 12) & 0xF
+        rate_index = (header >> 10) & 3
+        if version is None or layer is None or rate_index == 3:
+            return None
+        if bitrate_index in (0, 15):
+            # Free format or invalid, frame length unknown
+            return None
+
+        bitrate = BITRATES[(1 if version == 1 else 2, layer)][bitrate_index] * 1000
+        sample_rate = SAMPLE_RATES[version][rate_index]
+        padding = (header >> 9) & 1
+
+        if layer == 1:
+            return (12 * bitrate // sample_rate + padding) * 4, 384, sample_rate
+        if layer == 3 and version != 1:
+            return 72 * bitrate // sample_rate + padding, 576, sample_rate
+        return 144 * bitrate // sample_rate + padding, 1152, sample_rate
+
+    def _file_size(self):
+        size = getattr(self.file, "size", None)
+        if size is not None:
+            return size
+        self.file.seek(0, os.SEEK_END)
+        size = self.file.tell()
+        self.file.seek(0)
+        return size
@@ -0,0 +1,342 @@
+from datetime import datetime, timezone as dt_timezone
+
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+from rest_framework.fields import BooleanField
+
+from apps.lecture.models import FavoriteLecture, Lecture, LectureMarker
+from apps.lecture.services.progress_manager.service import ProgressManager
+from apps.system.services import Logger
+
+logger = Logger(app_name="offline_sync")
+
+
+class SyncEventError(ValueError):
+    """Raised for a client event that can't be applied"""
+
+
+class OfflineSync:
+    """Apply an ordered batch of queued client events in one transaction.
+
+    Supported event types: ``progress``, ``favorite``, ``marker_create``,
+    ``marker_update`` and ``marker_delete``. Every event carries a client
+    ``timestamp`` (unix ms). Conflicts resolve as last-writer-wins per
+    (user, lecture, field): within the batch the latest event wins, and it
+    is only applied when it is newer than what the server already holds.
+    Superseded events are still acknowledged so the client can drop them.
+    """
+
+    EVENT_TYPES = {
+        "progress",
+        "favorite",
+        "marker_create",
+        "marker_update",
+        "marker_delete",
+    }
+
+    def __init__(self, user):
+        self.user = user
+        self.acked = []
+        self.rejected = {}
+        self.created_markers = {}
+
+    def apply(self, events):
+        """Apply events and return a compact acknowledgement"""
+        parsed = []
+        for event in events:
+            try:
+                parsed.append(self._parse_event(event))
+            except SyncEventError as e:
+                self._reject(event, str(e))
+
+        lecture_ids = {e["lecture_id"] for e in parsed if e["lecture_id"] is not None}
+        lectures = Lecture.objects.only("id", "duration").in_bulk(lecture_ids)
+
+        valid = []
+        for event in parsed:
+            if event["lecture_id"] is not None and event["lecture_id"] not in lectures:
+                self._reject(event, "Lecture not found")
+            else:
+                valid.append(event)
+
+        with transaction.atomic():
+            self._apply_progress(
+                [e for e in valid if e["type"] == "progress"], lectures
+            )
+            self._apply_favorites([e for e in valid if e["type"] == "favorite"])
+            self._apply_markers([e for e in valid if e["type"].startswith("marker_")])
+
+        return {
+            "ack": self.acked,
+            "rejected": self.rejected,
+            "markers": self.created_markers,
+            "server_time": int(timezone.now().timestamp() * 1000),
+        }
+
+    def _parse_event(self, event):
+        if not isinstance(event, dict):
+            raise SyncEventError("Event must be an object")
+
+        event_type = event.get("type")
+        if event_type not in self.EVENT_TYPES:
+            raise SyncEventError(f"Unknown event type: {event_type}")
+
+        try:
+            client_time = datetime.fromtimestamp(
+                float(event["timestamp"]) / 1000, dt_timezone.utc
+            )
+        except (KeyError, TypeError, ValueError, OverflowError, OSError):
+            raise SyncEventError("Field 'timestamp' is required")
+
+        lecture_id = event.get("lecture_id")
+        if event_type not in ("marker_update", "marker_delete"):
+            try:
+                lecture_id = int(lecture_id)
+            except (TypeError, ValueError):
+                raise SyncEventError("Field 'lecture_id' is required")
+        else:
+            lecture_id = None
+
+        data = event.get("data")
+        if data is None:
+            data = {}
+        elif not isinstance(data, dict):
+            raise SyncEventError("Field 'data' must be an object")
+
+        for name, value in (
+            ("id", event.get("id")),
+            ("create_id", data.get("create_id")),
+            ("marker_id", data.get("marker_id")),
+        ):
+            if not self._is_id(value):
+                raise SyncEventError(f"Field '{name}' must be a string or an integer")
+        if not isinstance(data.get("text", ""), (str, type(None))):
+            raise SyncEventError("Field 'text' must be a string")
+        if event_type == "marker_create" and event.get("id") is None:
+            # Later events of the batch refer to the new marker by it
+            raise SyncEventError("Field 'id' is required")
+
+        return {
+            "id": event.get("id"),
+            "type": event_type,
+            "lecture_id": lecture_id,
+            "time": client_time,
+            "data": data,
+        }
+
+    @staticmethod
+    def _is_id(value):
+        """Client ids key dicts and acks, only plain scalars qualify"""
+        return value is None or (
+            isinstance(value, (str, int)) and not isinstance(value, bool)
+        )
+
+    def _reject(self, event, reason):
+        event_id = event.get("id") if isinstance(event, dict) else None
+        if event_id is not None:
+            self.rejected[str(event_id)] = reason
+
+    def _ack(self, event):
+        if event["id"] is not None:
+            self.acked.append(event["id"])
+
+    @staticmethod
+    def _latest(events, key):
+        """Keep the newest event per key, later batch entries win ties"""
+        latest = {}
+        for event in events:
+            current = latest.get(key(event))
+            if current is None or event["time"] >= current["time"]:
+                latest[key(event)] = event
+        return latest
+
+    def _apply_progress(self, events, lectures):
+        if not events:
+            return
+
+        valid = []
+        for event in events:
+            data = event["data"]
+            try:
+                event["current_time"] = max(0.0, float(data.get("current_time", 0)))
+            except (TypeError, ValueError):
+                self._reject(event, "Field 'current_time' must be a number")
+                continue
+            try:
+                # "false" or "0" from a client must not count as a listen
+                event["completed"] = BooleanField().to_internal_value(
+                    data.get("completed", False)
+                )
+            except ValidationError:
+                self._reject(event, "Field 'completed' must be a boolean")
+                continue
+            valid.append(event)
+        if not valid:
+            return
+        events = valid
+
+        manager = ProgressManager(self.user)
+        latest = self._latest(events, lambda e: e["lecture_id"])
+        stored = manager.get_many([lectures[lecture_id] for lecture_id in latest])
+
+        items = []
+        for lecture_id, event in latest.items():
+            # Every completed playback counts, even if its position lost
+            listens = sum(
+                1 for e in events if e["lecture_id"] == lecture_id and e["completed"]
+            )
+            progress = stored.get(lecture_id)
+            if progress is not None and progress.updated_at > event["time"]:
+                if not listens:
+                    continue
+                items.append(
+                    (
+                        lectures[lecture_id],
+                        progress.current_time,
+                        progress.completed,
+                        listens,
+                    )
+                )
+                continue
+
+            items.append(
+                (
+                    lectures[lecture_id],
+                    event["current_time"],
+                    event["completed"],
+                    listens,
+                )
+            )
+
+        manager.save_many(items)
+        for event in events:
+            self._ack(event)
+
+    def _apply_favorites(self, events):
+        if not events:
+            return
+
+        latest = self._latest(events, lambda e: e["lecture_id"])
+        existing = {
+            favorite.lecture_id: favorite
+            for favorite in FavoriteLecture.objects.filter(
+                user=self.user, lecture_id__in=latest.keys()
+            )
+        }
+
+        to_create = []
+        to_delete = []
+        for lecture_id, event in latest.items():
+            favorite = existing.get(lecture_id)
+            if event["data"].get("is_favorite", True):
+                if favorite is None:
+                    to_create.append(
+                        FavoriteLecture(user=self.user, lecture_id=lecture_id)
+                    )
+            elif favorite is not None and favorite.created_at <= event["time"]:
+                to_delete.append(favorite.id)
+
+        if to_create:
+            FavoriteLecture.objects.bulk_create(to_create, ignore_conflicts=True)
+        if to_delete:
+            FavoriteLecture.objects.filter(id__in=to_delete).delete()
+
+        for event in events:
+            self._ack(event)
+
+    def _apply_markers(self, events):
+        if not events:
+            return
+
+        creates = {}
+        changes = []
+        for event in events:
+            data = event["data"]
+            if event["type"] == "marker_create":
+                try:
+                    timestamp = float(data.get("timestamp"))
+                except (TypeError, ValueError):
+                    self._reject(event, "Timestamp required")
+                    continue
+                text = (data.get("text") or "").strip()
+                if timestamp < 0:
+                    self._reject(event, "Timestamp required")
+                elif not text:
+                    self._reject(event, "Text required")
+                else:
+                    creates[event["id"]] = (event, timestamp, text)
+            elif data.get("create_id") is not None and data["create_id"] in creates:
+                # Edits of a marker created in this same batch
+                create_event, timestamp, text = creates[data["create_id"]]
+                if event["type"] == "marker_delete":
+                    del creates[data["create_id"]]
+                    self._ack(create_event)
+                elif (data.get("text") or "").strip():
+                    creates[data["create_id"]] = (
+                        create_event,
+                        timestamp,
+                        data["text"].strip(),
+                    )
+                self._ack(event)
+            elif data.get("marker_id") is None:
+                self._reject(event, "Field 'marker_id' is required")
+            elif (
+                event["type"] == "marker_update"
+                and not (data.get("text") or "").strip()
+            ):
+                self._reject(event, "Text required")
+            else:
+                changes.append(event)
+
+        if creates:
+            markers = LectureMarker.objects.bulk_create(
+                [
+                    LectureMarker(
+                        user=self.user,
+                        lecture_id=event["lecture_id"],
+                        timestamp=timestamp,
+                        text=text,
+                    )
+                    for event, timestamp, text in creates.values()
+                ]
+            )
+            for (event, _, _), marker in zip(creates.values(), markers):
+                if event["id"] is not None and marker.id is not None:
+                    self.created_markers[str(event["id"])] = marker.id
+                self._ack(event)
+
+        self._apply_marker_changes(changes)
+
+    def _apply_marker_changes(self, events):
+        if not events:
+            return
+
+        latest = self._latest(events, lambda e: str(e["data"]["marker_id"]))
+        markers = {
+            str(marker.id): marker
+            for marker in LectureMarker.objects.filter(
+                user=self.user, id__in=[int(k) for k in latest if k.isdigit()]
+            )
+        }
+
+        to_update = []
+        to_delete = []
+        for marker_id, event in latest.items():
+            marker = markers.get(marker_id)
+            if marker is None or marker.updated_at > event["time"]:
+                continue
+            if event["type"] == "marker_delete":
+                to_delete.append(marker.id)
+            else:
+                marker.text = event["data"]["text"].strip()
+                marker.updated_at = timezone.now()
+                to_update.append(marker)
+
+        if to_update:
+            LectureMarker.objects.bulk_update(to_update, ["text", "updated_at"])
+        if to_delete:
+            LectureMarker.objects.filter(id__in=to_delete).delete()
+
+        for event in events:
+            self._ack(event)
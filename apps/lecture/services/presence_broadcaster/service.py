@@ -0,0 +1,178 @@
+import json
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+
+from apps.lecture.models import Lecture
+from apps.lecture.services.listener_presence.service import ListenerPresence
+from apps.system.services import Logger, RedisClient
+from apps.websocket.services.base import BaseEventHandler
+
+logger = Logger(app_name="presence_broadcaster")
+
+
+class PresenceBroadcaster:
+    """Fan out listener presence diffs to subscribed WebSocket groups.
+
+    Changes (``joined``, ``left``, ``moved``) are queued per channel group
+    in Redis. A group is sent at most once per
+    ``PRESENCE_BROADCAST_THROTTLE_MS``: the first change after a quiet
+    period goes out immediately, later ones wait for the next publish or
+    for the periodic ``flush_pending`` run. Queued changes are coalesced per
+    user, so a burst of heartbeats becomes a handful of messages.
+    """
+
+    GROUPS_KEY = "presence:outbox:groups"
+    OUTBOX_KEY = "presence:outbox:{group}"
+    GATE_KEY = "presence:gate:{group}"
+
+    GLOBAL_GROUP = "presence.global"
+    TOPIC_GROUP = "presence.topic.{id}"
+    LECTURE_GROUP = "presence.lecture.{id}"
+
+    EVENT_TYPE = "presence"
+
+    def __init__(self, client=None):
+        self.client = client or RedisClient.get()
+
+    @classmethod
+    def group_name(cls, scope, object_id=None):
+        """Channel group for a subscription scope or None if unknown"""
+        if scope == "global":
+            return cls.GLOBAL_GROUP
+        if scope == "topic":
+            return cls.TOPIC_GROUP.format(id=int(object_id))
+        if scope == "lecture":
+            return cls.LECTURE_GROUP.format(id=int(object_id))
+        return None
+
+    def publish(self, changes):
+        """Queue changes for every affected group and send open ones"""
+        queued = {}
+        for change in changes:
+            for group, group_change in self._split_by_group(change):
+                queued.setdefault(group, []).append(json.dumps(group_change))
+
+        if not queued:
+            return
+
+        pipe = self.client.pipeline(transaction=True)
+        for group, items in queued.items():
+            pipe.rpush(self.OUTBOX_KEY.format(group=group), *items)
+            pipe.sadd(self.GROUPS_KEY, group)
+        pipe.execute()
+
+        for group in queued:
+            self._send_if_open(group)
+
+    def flush_pending(self):
+        """Send queued changes of every group whose throttle window passed"""
+        sent = 0
+        for group in self.client.smembers(self.GROUPS_KEY):
+            sent += self._send_if_open(group)
+        return sent
+
+    def _split_by_group(self, change):
+        """Yield (group, change) pairs with the change as that group sees it"""
+        yield self.GLOBAL_GROUP, change
+
+        if change["event"] != "moved":
+            yield self.TOPIC_GROUP.format(id=change["topic_id"]), change
+            yield self.LECTURE_GROUP.format(id=change["lecture_id"]), change
+            return
+
+        # A move is a leave for the old scope and a join for the new one
+        left = dict(
+            change,
+            event="left",
+            lecture_id=change["from_lecture_id"],
+            topic_id=change["from_topic_id"],
+        )
+        joined = dict(change, event="joined")
+
+        if change["from_topic_id"] == change["topic_id"]:
+            yield self.TOPIC_GROUP.format(id=change["topic_id"]), change
+        else:
+            yield self.TOPIC_GROUP.format(id=change["from_topic_id"]), left
+            yield self.TOPIC_GROUP.format(id=change["topic_id"]), joined
+
+        yield self.LECTURE_GROUP.format(id=change["from_lecture_id"]), left
+        yield self.LECTURE_GROUP.format(id=change["lecture_id"]), joined
+
+    def _send_if_open(self, group):
+        gate = self.client.set(
+            self.GATE_KEY.format(group=group),
+            1,
+            nx=True,
+            px=settings.PRESENCE_BROADCAST_THROTTLE_MS,
+        )
+        if not gate:
+            return 0
+
+        pipe = self.client.pipeline(transaction=True)
+        pipe.lrange(self.OUTBOX_KEY.format(group=group), 0, -1)
+        pipe.delete(self.OUTBOX_KEY.format(group=group))
+        pipe.srem(self.GROUPS_KEY, group)
+        items = pipe.execute()[0]
+
+        changes = self._coalesce(json.loads(item) for item in items)
+        if not changes:
+            return 0
+
+        try:
+            self._send(group, changes)
+        except Exception as e:
+            logger.error(f"Presence broadcast to {group} failed: {str(e)}")
+            return 0
+        return 1
+
+    @staticmethod
+    def _coalesce(changes):
+        """Keep the net change per user"""
+        result = {}
+        for change in changes:
+            user_id = change["user_id"]
+            previous = result.pop(user_id, None)
+
+            if previous is not None and previous["event"] == "joined":
+                if change["event"] == "left":
+                    continue
+                if change["event"] == "moved":
+                    change = dict(change, event="joined")
+
+            if change["event"] != "moved":
+                change.pop("from_lecture_id", None)
+                change.pop("from_topic_id", None)
+            result[user_id] = change
+        return list(result.values())
+
+    def _send(self, group, changes):
+        lecture_ids = {c["lecture_id"] for c in changes if c["event"] != "left"}
+        lectures = Lecture.objects.select_related("topic__lecturer").in_bulk(
+            lecture_ids
+        )
+
+        for change in changes:
+            lecture = lectures.get(change["lecture_id"])
+            if change["event"] != "left" and lecture is not None:
+                lecturer = lecture.topic.lecturer
+                change["lecture"] = {
+                    "title": lecture.title,
+                    "topic_title": lecture.topic.title,
+                    "lecturer_name": lecturer.name,
+                    "lecturer_photo": lecturer.photo.url if lecturer.photo else None,
+                }
+
+        data = {"changes": changes}
+
+        presence = ListenerPresence(self.client)
+        scope, _, object_id = group.rpartition(".")
+        if scope == "presence.lecture":
+            data["listeners"] = presence.count_for_lecture(int(object_id))
+        elif scope == "presence.topic":
+            data["listeners"] = presence.count_for_topic(int(object_id))
+
+        async_to_sync(get_channel_layer().group_send)(
+            group, BaseEventHandler.build_room_message(self.EVENT_TYPE, data)
+        )
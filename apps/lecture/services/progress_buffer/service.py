@@ -0,0 +1,201 @@
+import time
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.db import transaction
+
+from apps.lecture.models import Lecture, LectureProgress
+from apps.system.services import Logger, RedisClient
+from apps.users.models import User
+
+logger = Logger(app_name="progress_buffer")
+
+
+class ProgressBuffer:
+    """Write-behind buffer for lecture progress heartbeats.
+
+    Every (user, lecture) pair gets its own Redis hash holding the latest
+    position. Changed pairs are tracked in a dirty set which the periodic
+    flush drains into ``LectureProgress`` with a bulk upsert, dated
+    by the last heartbeat rather than by the flush.
+
+    Entry fields:
+        t - current playback position in seconds
+        c - completed flag ("1" / "0")
+        l - absolute listen count (seeded from the DB on first write)
+        u - unix time of the last heartbeat
+    """
+
+    ENTRY_KEY = "progress:entry:{user_id}:{lecture_id}"
+    DIRTY_KEY = "progress:dirty"
+
+    def __init__(self, client=None):
+        self.client = client or RedisClient.get()
+
+    @classmethod
+    def entry_key(cls, user_id, lecture_id):
+        return cls.ENTRY_KEY.format(user_id=user_id, lecture_id=lecture_id)
+
+    @staticmethod
+    def _member(user_id, lecture_id):
+        return f"{user_id}:{lecture_id}"
+
+    @staticmethod
+    def _parse(entry):
+        """Convert raw hash values into python types"""
+        if not entry:
+            return None
+        return {
+            "current_time": float(entry.get("t", 0)),
+            "completed": entry.get("c") == "1",
+            "listen_count": int(entry.get("l", 0)),
+            "updated_at": float(entry.get("u", 0)),
+        }
+
+    def get(self, user_id, lecture_id):
+        """Get buffered progress for a single lecture or None"""
+        return self._parse(self.client.hgetall(self.entry_key(user_id, lecture_id)))
+
+    def get_many(self, user_id, lecture_ids):
+        """Get buffered progress for several lectures of one user"""
+        lecture_ids = list(lecture_ids)
+        if not lecture_ids:
+            return {}
+
+        pipe = self.client.pipeline(transaction=False)
+        for lecture_id in lecture_ids:
+            pipe.hgetall(self.entry_key(user_id, lecture_id))
+
+        result = {}
+        for lecture_id, entry in zip(lecture_ids, pipe.execute()):
+            parsed = self._parse(entry)
+            if parsed is not None:
+                result[lecture_id] = parsed
+        return result
+
+    def record(
+        self,
+        user_id,
+        lecture_id,
+        current_time,
+        completed,
+        base_listen_count=0,
+        listen_increment=None,
+    ):
+        """Store a heartbeat and mark the entry dirty.
+
+        ``base_listen_count`` seeds the listen counter when the entry is new,
+        so the buffer always carries the absolute value the DB should hold.
+        ``listen_increment`` defaults to one listen per completed heartbeat.
+        """
+        key = self.entry_key(user_id, lecture_id)
+        if listen_increment is None:
+            listen_increment = 1 if completed else 0
+
+        pipe = self.client.pipeline(transaction=True)
+        pipe.hsetnx(key, "l", base_listen_count)
+        pipe.hset(
+            key,
+            mapping={
+                "t": float(current_time),
+                "c": "1" if completed else "0",
+                "u": time.time(),
+            },
+        )
+        if listen_increment:
+            pipe.hincrby(key, "l", listen_increment)
+        pipe.expire(key, settings.PROGRESS_BUFFER_TTL)
+        pipe.sadd(self.DIRTY_KEY, self._member(user_id, lecture_id))
+        pipe.hgetall(key)
+
+        return self._parse(pipe.execute()[-1])
+
+    def flush(self, batch_size=None):
+        """Write dirty entries into LectureProgress, returns number of rows"""
+        batch_size = batch_size or settings.PROGRESS_FLUSH_BATCH_SIZE
+        flushed = 0
+
+        while True:
+            members = self.client.spop(self.DIRTY_KEY, batch_size)
+            if not members:
+                break
+
+            try:
+                flushed += self._flush_members(members)
+            except Exception as e:
+                # Put entries back so the next run retries them
+                self.client.sadd(self.DIRTY_KEY, *members)
+                logger.error(f"Progress buffer flush failed: {str(e)}")
+                raise
+
+            if len(members) < batch_size:
+                break
+
+        return flushed
+
+    def _flush_members(self, members):
+        pairs = []
+        pipe = self.client.pipeline(transaction=False)
+        for member in members:
+            user_id, lecture_id = (int(part) for part in member.split(":"))
+            pairs.append((user_id, lecture_id))
+            pipe.hgetall(self.entry_key(user_id, lecture_id))
+        entries = pipe.execute()
+
+        # Skip rows whose user or lecture has been deleted meanwhile
+        lecture_ids = set(
+            Lecture.objects.filter(
+                id__in={lecture_id for _, lecture_id in pairs}
+            ).values_list("id", flat=True)
+        )
+        user_ids = set(
+            User.objects.filter(id__in={user_id for user_id, _ in pairs}).values_list(
+                "id", flat=True
+            )
+        )
+
+        objects = []
+        listened = []
+        for (user_id, lecture_id), entry in zip(pairs, entries):
+            parsed = self._parse(entry)
+            if (
+                parsed is None
+                or lecture_id not in lecture_ids
+                or user_id not in user_ids
+            ):
+                continue
+            objects.append(
+                LectureProgress(
+                    user_id=user_id,
+                    lecture_id=lecture_id,
+                    current_time=parsed["current_time"],
+                    completed=parsed["completed"],
+                    listen_count=parsed["listen_count"],
+                )
+            )
+            listened.append(datetime.fromtimestamp(parsed["updated_at"], timezone.utc))
+
+        if objects:
+            with transaction.atomic():
+                LectureProgress.objects.bulk_create(
+                    objects,
+                    update_conflicts=True,
+                    unique_fields=["user", "lecture"],
+                    update_fields=[
+                        "current_time",
+                        "completed",
+                        "listen_count",
+                        "last_listened",
+                        "updated_at",
+                    ],
+                )
+                # auto_now stamps the flush time, set the heartbeat time after
+                for progress, listened_at in zip(objects, listened):
+                    progress.last_listened = listened_at
+                    progress.updated_at = listened_at
+                LectureProgress.objects.bulk_update(
+                    objects, ["last_listened", "updated_at"]
+                )
+
+        logger.debug(f"Flushed {len(objects)} buffered progress entries")
+        return len(objects)
@@ -0,0 +1,167 @@
+from datetime import datetime, timezone
+
+from django.conf import settings
+
+from apps.lecture.models import LectureProgress
+from apps.lecture.services.listener_presence.service import ListenerPresence
+from apps.lecture.services.presence_broadcaster.service import PresenceBroadcaster
+from apps.lecture.services.progress_buffer.service import ProgressBuffer
+from apps.lecture.services.progress_repository.service import ProgressRepository
+from apps.system.services import Logger
+
+logger = Logger(app_name="progress_manager")
+
+
+class ProgressManager:
+    """Manager class for reading and saving user lecture progress.
+
+    With ``PROGRESS_WRITE_BEHIND`` enabled heartbeats go to the Redis buffer
+    and reads are overlaid with buffered values, so callers never see a
+    position older than the last heartbeat. Any Redis failure falls back to
+    the database.
+    """
+
+    def __init__(self, user):
+        self.user = user
+        self.buffer = ProgressBuffer() if settings.PROGRESS_WRITE_BEHIND else None
+
+    def save(self, lecture, current_time, completed=False):
+        """Save a progress heartbeat and return the resulting progress"""
+        progress = None
+        if self.buffer is not None:
+            try:
+                progress = self._save_buffered(lecture, current_time, completed)
+            except Exception as e:
+                logger.error(f"Buffered progress save failed, using DB: {str(e)}")
+
+        if progress is None:
+            progress = self._save_to_db(lecture, current_time, completed)
+
+        if float(current_time) > 0:
+            self._touch_presence(lecture)
+
+        return progress
+
+    def _touch_presence(self, lecture):
+        try:
+            change = ListenerPresence().touch(self.user, lecture)
+            if change is not None:
+                PresenceBroadcaster().publish([change])
+        except Exception as e:
+            logger.error(f"Listener presence update failed: {str(e)}")
+
+    def save_many(self, items):
+        """Save several lectures at once.
+
+        ``items`` is an iterable of
+        ``(lecture, current_time, completed, listen_increment)`` tuples with
+        unique lectures. The DB path writes them in a single upsert.
+        """
+        items = list(items)
+
+        if self.buffer is not None:
+            try:
+                for lecture, current_time, completed, listen_increment in items:
+                    self._save_buffered(
+                        lecture, current_time, completed, listen_increment
+                    )
+                return
+            except Exception as e:
+                logger.error(f"Buffered progress save failed, using DB: {str(e)}")
+
+        ProgressRepository().bulk_upsert(
+            self.user.id,
+            [
+                (lecture.id, current_time, completed, listen_increment)
+                for lecture, current_time, completed, listen_increment in items
+            ],
+        )
+
+    def get(self, lecture):
+        """Get progress for a lecture or None if never listened"""
+        progress = LectureProgress.objects.filter(
+            user=self.user, lecture=lecture
+        ).first()
+
+        if self.buffer is not None:
+            try:
+                entry = self.buffer.get(self.user.id, lecture.id)
+            except Exception as e:
+                logger.error(f"Progress buffer read failed: {str(e)}")
+                entry = None
+
+            if entry is not None:
+                progress = self._overlay(progress, lecture, entry)
+
+        return progress
+
+    def get_many(self, lectures):
+        """Get progress records for several lectures keyed by lecture id"""
+        lectures = list(lectures)
+        progress_dict = {
+            record.lecture_id: record
+            for record in LectureProgress.objects.filter(
+                user=self.user, lecture__in=lectures
+            )
+        }
+
+        if self.buffer is not None:
+            try:
+                entries = self.buffer.get_many(
+                    self.user.id, [lecture.id for lecture in lectures]
+                )
+            except Exception as e:
+                logger.error(f"Progress buffer read failed: {str(e)}")
+                entries = {}
+
+            for lecture in lectures:
+                entry = entries.get(lecture.id)
+                if entry is not None:
+                    progress_dict[lecture.id] = self._overlay(
+                        progress_dict.get(lecture.id), lecture, entry
+                    )
+
+        # Reuse lecture instances so progress_percentage needs no extra query
+        lectures_by_id = {lecture.id: lecture for lecture in lectures}
+        for lecture_id, record in progress_dict.items():
+            record.lecture = lectures_by_id[lecture_id]
+
+        return progress_dict
+
+    def _overlay(self, progress, lecture, entry):
+        """Apply buffered values on top of a DB record (or a new instance)"""
+        if progress is None:
+            progress = LectureProgress(user=self.user, lecture=lecture)
+
+        progress.current_time = entry["current_time"]
+        progress.completed = entry["completed"]
+        progress.listen_count = entry["listen_count"]
+        progress.updated_at = datetime.fromtimestamp(entry["updated_at"], timezone.utc)
+        return progress
+
+    def _save_buffered(self, lecture, current_time, completed, listen_increment=None):
+        base_listen_count = 0
+        if self.buffer.get(self.user.id, lecture.id) is None:
+            base_listen_count = (
+                LectureProgress.objects.filter(user=self.user, lecture=lecture)
+                .values_list("listen_count", flat=True)
+                .first()
+                or 0
+            )
+
+        entry = self.buffer.record(
+            self.user.id,
+            lecture.id,
+            current_time,
+            completed,
+            base_listen_count,
+            listen_increment,
+        )
+        return self._overlay(None, lecture, entry)
+
+    def _save_to_db(self, lecture, current_time, completed):
+        progress = ProgressRepository().upsert(
+            self.user.id, lecture.id, current_time, completed
+        )
+        progress.lecture = lecture
+        return progress
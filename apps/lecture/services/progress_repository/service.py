@@ -0,0 +1,156 @@
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from apps.lecture.models import LectureProgress
+
+
+class ProgressRepository:
+    """Single-statement persistence for LectureProgress heartbeats.
+
+    The whole heartbeat is one ``INSERT ... ON CONFLICT (user_id, lecture_id)
+    DO UPDATE ... RETURNING`` round trip. ``listen_count`` is incremented in
+    SQL, so concurrent completions can't overwrite each other. Backends
+    without upsert/RETURNING support use a locked ORM fallback.
+    """
+
+    RETURNING_COLUMNS = ["id", "current_time", "completed", "listen_count"]
+
+    def upsert(self, user_id, lecture_id, current_time, completed):
+        """Insert or update progress and return the stored row"""
+        if self.supports_native_upsert():
+            return self._upsert_native(user_id, lecture_id, current_time, completed)
+        return self._upsert_fallback(user_id, lecture_id, current_time, completed)
+
+    def bulk_upsert(self, user_id, rows):
+        """Upsert several lectures of one user in a single statement.
+
+        ``rows`` is an iterable of
+        ``(lecture_id, current_time, completed, listen_increment)`` tuples
+        with unique lecture ids.
+        """
+        rows = list(rows)
+        if not rows:
+            return
+
+        if not self.supports_native_upsert():
+            for lecture_id, current_time, completed, listen_increment in rows:
+                self._upsert_fallback(
+                    user_id, lecture_id, current_time, completed, listen_increment
+                )
+            return
+
+        now = connection.ops.adapt_datetimefield_value(timezone.now())
+        params = []
+        for lecture_id, current_time, completed, listen_increment in rows:
+            params.extend(
+                [
+                    user_id,
+                    lecture_id,
+                    float(current_time),
+                    bool(completed),
+                    listen_increment,
+                    now,
+                    now,
+                    now,
+                ]
+            )
+
+        with connection.cursor() as cursor:
+            cursor.execute(self._build_sql(len(rows), returning=False), params)
+
+    @staticmethod
+    def supports_native_upsert():
+        features = connection.features
+        return (
+            features.supports_update_conflicts_with_target
+            and features.can_return_columns_from_insert
+        )
+
+    def _build_sql(self, row_count=1, returning=True):
+        qn = connection.ops.quote_name
+        table = qn(LectureProgress._meta.db_table)
+        columns = [
+            "user_id",
+            "lecture_id",
+            "current_time",
+            "completed",
+            "listen_count",
+            "last_listened",
+            "updated_at",
+            "created_at",
+        ]
+        updates = [
+            f"{qn('current_time')} = EXCLUDED.{qn('current_time')}",
+            f"{qn('completed')} = EXCLUDED.{qn('completed')}",
+            f"{qn('listen_count')} = {table}.{qn('listen_count')}"
+            f" + EXCLUDED.{qn('listen_count')}",
+            f"{qn('last_listened')} = EXCLUDED.{qn('last_listened')}",
+            f"{qn('updated_at')} = EXCLUDED.{qn('updated_at')}",
+        ]
+        values = ", ".join([f"({', '.join(['%s'] * len(columns))})"] * row_count)
+        sql = (
+            f"INSERT INTO {table} ({', '.join(qn(c) for c in columns)}) "
+            f"VALUES {values} "
+            f"ON CONFLICT ({qn('user_id')}, {qn('lecture_id')}) "
+            f"DO UPDATE SET {', '.join(updates)}"
+        )
+        if returning:
+            sql += f" RETURNING {', '.join(qn(c) for c in self.RETURNING_COLUMNS)}"
+        return sql
+
+    def _upsert_native(self, user_id, lecture_id, current_time, completed):
+        now = connection.ops.adapt_datetimefield_value(timezone.now())
+        params = [
+            user_id,
+            lecture_id,
+            float(current_time),
+            bool(completed),
+            1 if completed else 0,
+            now,
+            now,
+            now,
+        ]
+
+        with connection.cursor() as cursor:
+            cursor.execute(self._build_sql(), params)
+            row = cursor.fetchone()
+
+        return self._from_row(user_id, lecture_id, row)
+
+    def _upsert_fallback(
+        self, user_id, lecture_id, current_time, completed, listen_increment=None
+    ):
+        if listen_increment is None:
+            listen_increment = 1 if completed else 0
+
+        with transaction.atomic():
+            (
+                progress,
+                created,
+            ) = LectureProgress.objects.select_for_update().get_or_create(
+                user_id=user_id, lecture_id=lecture_id
+            )
+            LectureProgress.objects.filter(pk=progress.pk).update(
+                current_time=current_time,
+                completed=completed,
+                listen_count=F("listen_count") + listen_increment,
+                last_listened=timezone.now(),
+                updated_at=timezone.now(),
+            )
+            progress.refresh_from_db(fields=self.RETURNING_COLUMNS[1:])
+
+        return progress
+
+    @staticmethod
+    def _from_row(user_id, lecture_id, row):
+        progress = LectureProgress(
+            id=row[0],
+            user_id=user_id,
+            lecture_id=lecture_id,
+            current_time=row[1],
+            completed=bool(row[2]),
+            listen_count=row[3],
+        )
+        progress._state.adding = False
+        return progress
@@ -0,0 +1,134 @@
+import hashlib
+import os
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.utils import timezone
+
+from apps.lecture.models import Lecture
+from apps.system.services import ZipEntry, ZipStream
+
+
+class TopicArchive:
+    """All lectures of a topic as one stored ZIP, see ``ZipStream``.
+
+    Files are read from storage in chunks while the response streams, so
+    memory stays flat and no temporary file is written. Sizes come from
+    ``Lecture.file_size``, kept in step with the file on every upload (or
+    from storage where unknown), which gives the ``Content-Length`` up front.
+    CRCs are cached by content hash once a download computed them, so a
+    resumed download only reads the files its range covers.
+    """
+
+    CRC_KEY = "topic:archive:crc32:{content_hash}"
+    CHUNK_SIZE = 256 * 1024
+
+    def __init__(self, topic):
+        self.topic = topic
+        self.lectures = list(
+            Lecture.objects.filter(topic_id=topic.id)
+            .exclude(audio_file="")
+            .order_by("language__name", "order", "id")
+            .only(
+                "id",
+                "title",
+                "order",
+                "audio_file",
+                "file_size",
+                "content_hash",
+                "created_at",
+            )
+        )
+
+    @property
+    def filename(self):
+        return f"{self._clean(self.topic.title)}.zip"
+
+    def response(self, request):
+        entries = self._entries()
+        return ZipStream(entries).response(request, self.filename, self._etag(entries))
+
+    def _entries(self):
+        keys = {
+            lecture.id: self.CRC_KEY.format(content_hash=lecture.content_hash)
+            for lecture in self.lectures
+            if lecture.content_hash
+        }
+        known = cache.get_many(keys.values())
+
+        folder = self._clean(self.topic.title)
+        names = set()
+        entries = []
+        for lecture in self.lectures:
+            name = self._unique(folder, lecture, names)
+            key = keys.get(lecture.id)
+            entries.append(
+                ZipEntry(
+                    name,
+                    self._size(lecture),
+                    self._reader(lecture.audio_file.name),
+                    timezone.localtime(lecture.created_at),
+                    crc32=known.get(key),
+                    on_crc32=self._remember(key) if key else None,
+                )
+            )
+        return entries
+
+    def _etag(self, entries):
+        """Changes with any name, size or content of the archive"""
+        digest = hashlib.sha256()
+        for entry, lecture in zip(entries, self.lectures):
+            version = lecture.content_hash or lecture.audio_file.name
+            digest.update(entry.name + f"\0{entry.size}\0{version}\0".encode())
+        return digest.hexdigest()[:32]
+
+    def _unique(self, folder, lecture, names):
+        stem = f"{lecture.order:02d}. {self._clean(lecture.title)}"
+        extension = os.path.splitext(lecture.audio_file.name)[1]
+        name = f"{folder}/{stem}{extension}"
+        number = 1
+        while name.lower() in names:
+            number += 1
+            name = f"{folder}/{stem} ({number}){extension}"
+        names.add(name.lower())
+        return name
+
+    @staticmethod
+    def _clean(name):
+        """A name usable as a path component on every platform"""
+        name = "".join(
+            "_" if char in '<>:"/\\|?*' or char < " " else char for char in name
+        )
+        return name.strip(" .") or "lecture"
+
+    @staticmethod
+    def _size(lecture):
+        if lecture.file_size is not None:
+            return lecture.file_size
+        return default_storage.size(lecture.audio_file.name)
+
+    @staticmethod
+    def _remember(key):
+        def remember(crc32):
+            cache.set(key, crc32, settings.TOPIC_ARCHIVE_CRC_TIMEOUT)
+
+        return remember
+
+    def _reader(self, name):
+        """``reader(offset)`` of a stored file, chunks from offset to the end"""
+
+        def read(offset):
+            with default_storage.open(name, "rb") as file:
+                s3_object = getattr(file, "obj", None)
+                if s3_object is not None:
+                    # S3File downloads the whole object first, stream it instead
+                    body = s3_object.get(Range=f"bytes={offset}-")["Body"]
+                    yield from body.iter_chunks(self.CHUNK_SIZE)
+                    return
+
+                file.seek(offset)
+                while chunk := file.read(self.CHUNK_SIZE):
+                    yield chunk
+
+        return read
@@ -0,0 +1,102 @@
+from array import array
+
+from django.conf import settings
+
+from apps.lecture.models import Lecture
+from apps.system.services import StaleCache
+
+
+class TopicIndex:
+    """Ordered navigation index of one topic.
+
+    Lectures are kept in the topic page order (language, order, id) as four
+    parallel unsigned arrays: ids, orders, language ids and durations. The
+    arrays are cached together and dropped by the lecture signals, so
+    neighbours, the position in the topic and the remaining listening time
+    are answered in memory. Missing durations are stored as ``0``.
+    """
+
+    INDEX_VERSION = 1
+    INDEX_KEY = "topic:index:v{version}:{topic_id}"
+
+    TYPECODE = "L"
+
+    def __init__(self, topic_id):
+        self.topic_id = topic_id
+        (
+            self.ids,
+            self.orders,
+            self.languages,
+            self.durations,
+        ) = StaleCache().get_or_compute(
+            self.cache_key(topic_id), self._build, settings.TOPIC_INDEX_TIMEOUT
+        )
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def cache_key(cls, topic_id):
+        return cls.INDEX_KEY.format(version=cls.INDEX_VERSION, topic_id=topic_id)
+
+    @classmethod
+    def invalidate(cls, *topic_ids):
+        """Drop the index of each topic, the next read rebuilds it"""
+        keys = [cls.cache_key(topic_id) for topic_id in topic_ids if topic_id]
+        if keys:
+            StaleCache().delete(*keys)
+
+    def index_of(self, lecture_id):
+        """Zero-based place of a lecture in the topic, ``None`` if absent"""
+        try:
+            return self.ids.index(lecture_id)
+        except ValueError:
+            return None
+
+    def position(self, lecture_id):
+        """One-based position of a lecture, as in "12 of 87" """
+        index = self.index_of(lecture_id)
+        return None if index is None else index + 1
+
+    def neighbors(self, lecture_id):
+        """Return ``(previous_id, next_id)``, either may be ``None``"""
+        index = self.index_of(lecture_id)
+        if index is None:
+            return None, None
+
+        prev_id = self.ids[index - 1] if index > 0 else None
+        next_id = self.ids[index + 1] if index + 1 < len(self.ids) else None
+        return prev_id, next_id
+
+    def next_id(self, lecture_id):
+        """Lecture to autoplay after ``lecture_id``"""
+        return self.neighbors(lecture_id)[1]
+
+    @property
+    def total_duration(self):
+        return sum(self.durations)
+
+    def remaining_duration(self, lecture_id, current_time=0):
+        """Seconds left in the topic from ``current_time`` of a lecture"""
+        index = self.index_of(lecture_id)
+        if index is None:
+            return 0
+
+        current_left = max(self.durations[index] - int(current_time or 0), 0)
+        return current_left + sum(self.durations[index + 1 :])
+
+    def _build(self):
+        rows = (
+            Lecture.objects.filter(topic_id=self.topic_id)
+            .order_by("language__name", "order", "id")
+            .values_list("id", "order", "language_id", "duration")
+        )
+
+        ids, orders, languages, durations = (array(self.TYPECODE) for _ in range(4))
+        for lecture_id, order, language_id, duration in rows:
+            ids.append(lecture_id)
+            orders.append(order)
+            languages.append(language_id)
+            durations.append(max(duration or 0, 0))
+
+        return ids, orders, languages, durations
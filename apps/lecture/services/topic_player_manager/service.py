@@ -1,4 +1,6 @@
-from apps.lecture.models import FavoriteLecture, CurrentLecture, LectureProgress
+from apps.lecture.models import FavoriteLecture, CurrentLecture
+from apps.lecture.services.progress_manager.service import ProgressManager
+from apps.lecture.services.topic_index.service import TopicIndex
 
 
 class TopicPlayerManager:
@@ -26,9 +28,7 @@ class TopicPlayerManager:
             return None, None
 
         current_lecture = current_lecture_obj.lecture
-        current_lecture_progress = LectureProgress.objects.filter(
-            user=self.user, lecture=current_lecture
-        ).first()
+        current_lecture_progress = ProgressManager(self.user).get(current_lecture)
 
         return current_lecture, current_lecture_progress
 
@@ -50,11 +50,7 @@ class TopicPlayerManager:
         if not self.is_authenticated:
             return {}, set()
 
-        progress_records = LectureProgress.objects.filter(
-            user=self.user, lecture__in=self.lectures
-        ).select_related("lecture")
-
-        progress_dict = {record.lecture.id: record for record in progress_records}
+        progress_dict = ProgressManager(self.user).get_many(self.lectures)
 
         favorite_lectures = set(
             FavoriteLecture.objects.filter(
@@ -82,7 +78,7 @@ class TopicPlayerManager:
         return {
             "topic": self.topic,
             "lectures": self.lectures,
-            "lecture_count": self.lectures.count(),
+            "lecture_count": len(TopicIndex(self.topic.id)),
             "current_lecture": current_lecture,
             "current_lecture_progress": current_lecture_progress,
         }
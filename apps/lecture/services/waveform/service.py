@@ -0,0 +1,205 @@
+import shutil
+import subprocess
+import threading
+from abc import ABC, abstractmethod
+
+import numpy as np
+from django.conf import settings
+from django.db.models import F
+from django.utils.module_loading import import_string
+
+from apps.lecture.models import LectureWaveform
+from apps.lecture.services.mp3_frames.service import MP3Frames
+
+
+class WaveformError(ValueError):
+    """Raised when no waveform can be computed from a file"""
+
+
+class WaveformDecoder(ABC):
+    """Backend turning an audio file into an amplitude envelope"""
+
+    @abstractmethod
+    def envelope(self, file):
+        """Non-negative amplitudes spread evenly over the audio, a 1-D array"""
+        pass
+
+
+class MP3GainDecoder(WaveformDecoder):
+    """Loudness estimate read from MP3 side info, without decoding.
+
+    Every granule of an MP3 frame carries a ``global_gain``, the quantizer
+    step the encoder picked for it. One step is 1.5 dB and the encoder
+    raises it with the signal level, so it traces the loudness of speech
+    well enough for a scrubber. Granules without coded data count as
+    silence.
+    """
+
+    def envelope(self, file):
+        frames = MP3Frames(file)
+        gains = [self._frame_gain(file, offset) for offset, _ in frames]
+        if not gains:
+            raise WaveformError("No audio frames")
+
+        gains = np.asarray(gains, dtype=np.float32)
+        return np.where(gains > 0, np.exp2((gains - 210) / 4), 0)
+
+    def _frame_gain(self, file, offset):
+        file.seek(offset)
+        data = file.read(4 + 2 + 32)
+        header = int.from_bytes(data[:4], "big")
+        if (header >> 17) & 3 != 1:
+            raise WaveformError("Not MPEG layer III audio")
+
+        version1 = (header >> 19) & 3 == 3
+        mono = (header >> 6) & 3 == 3
+        crc = 2 if not header & 0x10000 else 0
+        if version1:
+            side_size, granules, per_channel = (17 if mono else 32), 2, 59
+            position = 9 + (5 if mono else 3) + (4 if mono else 8)
+        else:
+            side_size, granules, per_channel = (9 if mono else 17), 1, 63
+            position = 8 + (1 if mono else 2)
+
+        side = data[4 + crc : 4 + crc + side_size]
+        if len(side) < side_size:
+            return 0
+        bits = int.from_bytes(side, "big")
+        size = side_size * 8
+
+        gain = 0
+        for _ in range(granules * (1 if mono else 2)):
+            part2_3_length = (bits >> (size - position - 12)) & 0xFFF
+            global_gain = (bits >> (size - position - 29)) & 0xFF
+            if part2_3_length:
+                gain = max(gain, global_gain)
+            position += per_channel
+        return gain
+
+
+class FFmpegDecoder(WaveformDecoder):
+    """Exact peaks from PCM decoded by ``ffmpeg``, any format it reads.
+
+    The file is piped through ffmpeg as mono 16-bit samples and reduced to
+    the peak of each 10 ms window as it arrives, so memory stays small for
+    long lectures.
+    """
+
+    BINARY = "ffmpeg"
+    SAMPLE_RATE = 8000
+    WINDOW = 80
+    CHUNK_SIZE = 256 * 1024
+
+    def envelope(self, file):
+        if shutil.which(self.BINARY) is None:
+            raise WaveformError(f"{self.BINARY} not found")
+
+        process = subprocess.Popen(
+            [
+                self.BINARY,
+                "-v",
+                "error",
+                "-i",
+                "pipe:0",
+                "-ac",
+                "1",
+                "-ar",
+                str(self.SAMPLE_RATE),
+                "-f",
+                "s16le",
+                "pipe:1",
+            ],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+        feeder = threading.Thread(target=self._feed, args=(file, process.stdin))
+        feeder.start()
+
+        windows = []
+        pending = b""
+        while chunk := process.stdout.read(self.CHUNK_SIZE):
+            pending += chunk
+            usable = len(pending) - len(pending) % (2 * self.WINDOW)
+            samples = np.frombuffer(pending[:usable], dtype="<i2").astype(np.int32)
+            windows.append(np.abs(samples).reshape(-1, self.WINDOW).max(axis=1))
+            pending = pending[usable:]
+
+        feeder.join()
+        errors = process.stderr.read().decode(errors="replace").strip()
+        if process.wait() != 0:
+            raise WaveformError(f"ffmpeg failed: {errors}")
+        if not windows:
+            raise WaveformError("No audio decoded")
+
+        return np.concatenate(windows).astype(np.float32) / 32768
+
+    def _feed(self, file, stdin):
+        try:
+            while chunk := file.read(self.CHUNK_SIZE):
+                stdin.write(chunk)
+        except (BrokenPipeError, ValueError):
+            pass
+        finally:
+            try:
+                stdin.close()
+            except BrokenPipeError:
+                pass
+
+
+class Waveform:
+    """Downsampled peaks of a lecture for the waveform scrubber.
+
+    The decoder backend (``WAVEFORM_DECODER``) gives an amplitude envelope.
+    It is reduced to ``WAVEFORM_BUCKETS`` peaks with NumPy and mapped to a
+    ``DB_RANGE`` decibel scale below the loudest peak, one unsigned byte
+    each, about 1 KB per lecture.
+    """
+
+    DB_RANGE = 48
+
+    def __init__(self, decoder=None, buckets=None):
+        self.decoder = decoder or import_string(settings.WAVEFORM_DECODER)()
+        self.buckets = buckets or settings.WAVEFORM_BUCKETS
+
+    def compute(self, file):
+        """Peaks of an audio file as bytes, raises ``WaveformError`` or
+        ``MP3FrameError``"""
+        envelope = self.decoder.envelope(file)
+        if not envelope.size:
+            raise WaveformError("No audio decoded")
+
+        starts = np.linspace(0, envelope.size, self.buckets, endpoint=False)
+        peaks = np.maximum.reduceat(envelope, starts.astype(np.intp))
+
+        loudest = peaks.max()
+        if loudest <= 0:
+            return bytes(self.buckets)
+
+        with np.errstate(divide="ignore"):
+            decibels = 20 * np.log10(peaks / loudest)
+        levels = np.clip((decibels + self.DB_RANGE) / self.DB_RANGE, 0, 1)
+        return np.round(levels * 255).astype(np.uint8).tobytes()
+
+    @staticmethod
+    def current(lecture_id):
+        """Stored waveform row, ``None`` if missing or computed from another
+        file. The peaks load on first access."""
+        return (
+            LectureWaveform.objects.filter(
+                lecture_id=lecture_id, lecture__content_hash=F("content_hash")
+            )
+            .exclude(content_hash="")
+            .defer("peaks")
+            .first()
+        )
+
+    def save(self, lecture, peaks):
+        LectureWaveform.objects.update_or_create(
+            lecture_id=lecture.id,
+            defaults={
+                "content_hash": lecture.content_hash,
+                "peaks": peaks,
+                "decoder": type(self.decoder).__name__,
+            },
+        )
@@ -0,0 +1,130 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from apps.lecture.models import Language, Lecture, Lecturer, Topic, TopicGroup
+from apps.lecture.services.catalog_changes.service import CatalogChanges
+
+CATALOG_MODELS = (Lecturer, Topic, Lecture, TopicGroup, Language)
+
+
+def catalog_changed(sender, **kwargs):
+    """Retire cached catalog data when a catalog model changes"""
+    CatalogChanges.record(catalog=True)
+
+
+for model in CATALOG_MODELS:
+    post_save.connect(catalog_changed, sender=model)
+    post_delete.connect(catalog_changed, sender=model)
+
+
+@receiver(m2m_changed, sender=Topic.languages.through)
+def topic_languages_changed(sender, instance, action, reverse, pk_set=None, **kwargs):
+    """Topic language codes are stored on Topic and shown on catalog cards"""
+    if reverse and action == "pre_clear":
+        # Changed from the language side, remember which topics lose it
+        instance._cleared_topic_ids = list(instance.topics.values_list("id", flat=True))
+        return
+
+    if action == "post_clear" or (action in ("post_add", "post_remove") and pk_set):
+        if reverse:
+            topic_ids = pk_set or getattr(instance, "_cleared_topic_ids", [])
+        else:
+            topic_ids = [instance.id]
+
+        CatalogChanges.record(topic_ids=topic_ids, catalog=True)
+
+
+@receiver(pre_save, sender=Lecture)
+def remember_lecture_topic(sender, instance, raw=False, **kwargs):
+    """Keep the previous topic so a moved lecture updates both topics"""
+    instance._previous_topic_id = None
+    instance._previous_audio_name = None
+    if not raw and not instance._state.adding and instance.pk:
+        instance._previous_topic_id, instance._previous_audio_name = (
+            Lecture.objects.filter(pk=instance.pk)
+            .values_list("topic_id", "audio_file")
+            .first()
+        ) or (None, None)
+
+
+@receiver(pre_save, sender=Lecture)
+def hash_lecture_audio(sender, instance, raw=False, **kwargs):
+    """Devices key their cached audio by this hash and segments are stored
+    under it, a new file changes the hash and drops the old segments. The
+    size follows the file too, topic archives lay out their entries by it."""
+    if raw:
+        return
+
+    audio = instance.audio_file
+    if not audio:
+        instance.content_hash = ""
+        instance.audio_manifest = ""
+    elif not audio._committed:
+        # A new upload, still readable before the storage saves it
+        instance.content_hash = Lecture.generate_content_hash(audio)
+        instance.file_size = audio.size
+        instance.audio_manifest = ""
+    elif (
+        instance._previous_audio_name is not None
+        and audio.name != instance._previous_audio_name
+    ):
+        # Pointed at another stored file, lecture_content_hash fills them in
+        instance.content_hash = ""
+        instance.file_size = None
+        instance.audio_manifest = ""
+
+
+@receiver(post_save, sender=Lecture)
+@receiver(post_delete, sender=Lecture)
+def lecture_changed(sender, instance, raw=False, **kwargs):
+    """Any lecture change may move, add or drop an entry of the topic index"""
+    topic_ids = [instance.topic_id, getattr(instance, "_previous_topic_id", None)]
+    CatalogChanges.record(topic_ids=[] if raw else topic_ids, index_topic_ids=topic_ids)
+
+
+@receiver(post_save, sender=Language)
+def language_saved(sender, instance, created=False, raw=False, **kwargs):
+    """Topic indexes are ordered by language name"""
+    if created or raw:
+        return
+    CatalogChanges.record(
+        index_topic_ids=instance.lectures.order_by()
+        .values_list("topic_id", flat=True)
+        .distinct()
+    )
+
+
+@receiver(pre_save, sender=Topic)
+def remember_topic_lecturer(sender, instance, raw=False, **kwargs):
+    """Keep the previous lecturer so a moved topic updates both lecturers"""
+    instance._previous_lecturer_id = None
+    if not raw and not instance._state.adding and instance.pk:
+        instance._previous_lecturer_id = (
+            Topic.objects.filter(pk=instance.pk)
+            .values_list("lecturer_id", flat=True)
+            .first()
+        )
+
+
+@receiver(post_save, sender=Topic)
+def topic_saved(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    # Recompute the topic too: a save from a stale instance writes old values
+    CatalogChanges.record(
+        topic_ids=[instance.id], lecturer_ids=[instance._previous_lecturer_id]
+    )
+
+
+@receiver(post_delete, sender=Topic)
+def topic_deleted(sender, instance, **kwargs):
+    CatalogChanges.record(
+        lecturer_ids=[instance.lecturer_id], index_topic_ids=[instance.id]
+    )
+
+
+@receiver(post_save, sender=Lecturer)
+def lecturer_saved(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    CatalogChanges.record(lecturer_ids=[instance.id])
@@ -0,0 +1,67 @@
+from celery import shared_task
+from django.conf import settings
+
+from apps.lecture.models import Lecture
+from apps.lecture.services import (
+    LecturePackager,
+    ListenerPresence,
+    MP3FrameError,
+    PackagingError,
+    PresenceBroadcaster,
+    ProgressBuffer,
+)
+from apps.system.services import Logger
+
+logger = Logger(app_name="lecture_tasks")
+
+
+@shared_task(ignore_result=True)
+def flush_progress_buffer():
+    """Flush buffered progress heartbeats into LectureProgress"""
+    if not settings.PROGRESS_WRITE_BEHIND:
+        return 0
+
+    flushed = ProgressBuffer().flush()
+    if flushed:
+        logger.debug(f"Progress buffer flushed: {flushed} entries")
+    return flushed
+
+
+@shared_task(ignore_result=True)
+def sweep_listener_presence():
+    """Remove listeners whose heartbeats stopped"""
+    removed = ListenerPresence().sweep()
+    if removed:
+        PresenceBroadcaster().publish(
+            [
+                {
+                    "event": "left",
+                    "user_id": user_id,
+                    "email": session["email"],
+                    "lecture_id": session["lecture_id"],
+                    "topic_id": session["topic_id"],
+                }
+                for user_id, session in removed.items()
+            ]
+        )
+    return len(removed)
+
+
+@shared_task(ignore_result=True)
+def flush_presence_broadcasts():
+    """Send presence changes still waiting for their throttle window"""
+    return PresenceBroadcaster().flush_pending()
+
+
+@shared_task(ignore_result=True)
+def package_lecture_audio(lecture_id):
+    """Cut an imported lecture into streaming segments"""
+    lecture = Lecture.objects.filter(id=lecture_id).first()
+    if lecture is None:
+        return None
+
+    try:
+        return LecturePackager().package(lecture)
+    except (MP3FrameError, PackagingError) as e:
+        logger.warning(f"Lecture {lecture_id} not packaged: {str(e)}")
+        return None
@@ -0,0 +1,112 @@
+import shutil
+import tempfile
+import threading
+import time
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+
+from apps.lecture.models import Language, Lecturer, Topic, TopicGroup
+from apps.lecture.services import LectureImport
+
+WORKERS = 2
+
+
+@override_settings(LECTURE_IMPORT_WORKERS=WORKERS, AUDIO_SEGMENTING=False)
+class LectureImportTest(TestCase):
+    """Metadata read in the thread pool of ``LectureImport``"""
+
+    @classmethod
+    def setUpClass(cls):
+        media_root = tempfile.mkdtemp()
+        cls.addClassCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        cls.enterClassContext(
+            override_settings(
+                MEDIA_ROOT=media_root,
+                STORAGES={
+                    "default": {
+                        "BACKEND": "django.core.files.storage.FileSystemStorage",
+                        "OPTIONS": {"location": media_root},
+                    },
+                    "staticfiles": {
+                        "BACKEND": (
+                            "django.contrib.staticfiles.storage.StaticFilesStorage"
+                        )
+                    },
+                },
+            )
+        )
+        super().setUpClass()
+
+    @classmethod
+    def setUpTestData(cls):
+        Language.objects.get_or_create(
+            code="ru", defaults={"name": "Russian", "native_name": "Русский"}
+        )
+        lecturer = Lecturer.objects.create(code="import", name="Import", order=1)
+        group = TopicGroup.objects.create(name="Import", code="import")
+        cls.topic = Topic.objects.create(
+            lecturer=lecturer, group=group, code="import", title="Import", order=1
+        )
+
+    def _uploads(self, count):
+        return [
+            SimpleUploadedFile(f"{number:02d}.mp3", b"\0" * 1024)
+            for number in range(1, count + 1)
+        ]
+
+    def test_metadata_in_upload_order(self):
+        importer = LectureImport(self.topic)
+        uploads = self._uploads(12)
+
+        def extract(uploaded_file):
+            # Earlier files finish last
+            time.sleep(0.002 * (len(uploads) - uploads.index(uploaded_file)))
+            return uploaded_file.name
+
+        with mock.patch.object(importer, "_extract_metadata", side_effect=extract):
+            results = list(importer._with_metadata(uploads))
+
+        self.assertEqual(results, [(upload, upload.name) for upload in uploads])
+
+    def test_lookahead_is_bounded(self):
+        importer = LectureImport(self.topic)
+        uploads = self._uploads(20)
+        lock = threading.Lock()
+        started = []
+
+        def extract(uploaded_file):
+            with lock:
+                started.append(uploaded_file)
+            return None
+
+        ahead = []
+        with mock.patch.object(importer, "_extract_metadata", side_effect=extract):
+            for consumed, _ in enumerate(importer._with_metadata(uploads), 1):
+                # Let the workers run ahead as far as they are allowed to
+                time.sleep(0.005)
+                with lock:
+                    ahead.append(len(started) - consumed)
+
+        self.assertLessEqual(max(ahead), 2 * WORKERS)
+        self.assertEqual(len(started), len(uploads))
+
+    def test_failing_file_counts_as_failed(self):
+        importer = LectureImport(self.topic)
+        uploads = self._uploads(5)
+        extract = importer._extract_metadata
+
+        def failing(uploaded_file):
+            if uploaded_file.name == "03.mp3":
+                raise RuntimeError("Unreadable")
+            return extract(uploaded_file)
+
+        with mock.patch.object(importer, "_extract_metadata", side_effect=failing):
+            imported = importer.import_files(uploads)
+
+        self.assertEqual(imported, 4)
+        self.assertEqual(
+            list(self.topic.lectures.order_by("order").values_list("title", "order")),
+            [("01", 1), ("02", 2), ("04", 3), ("05", 4)],
+        )
@@ -0,0 +1,158 @@
+import os
+import re
+import shutil
+import tempfile
+from urllib.parse import unquote
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from apps.lecture.models import Language, Lecture, Lecturer, Topic, TopicGroup
+from apps.system.services import FileOffload
+
+RANGE_RE = re.compile(r"^bytes=(\d+)-(\d*)$")
+
+
+class StubProxy:
+    """Forwards to Django in-process and, like nginx, replaces an internal
+    redirect with the file itself, honouring ``Range``"""
+
+    # Headers of the Django response a proxy keeps when it serves the file
+    PASSED_HEADERS = ("Content-Type", "Content-Disposition", "Cache-Control")
+
+    def __init__(self):
+        self.client = Client()
+        self.upstream_bytes = 0
+
+    def get(self, path, headers=None):
+        """``(status, headers, body)`` as the proxy would answer"""
+        headers = headers or {}
+        upstream = self.client.get(path, headers=headers)
+        # An offloaded response must not carry the file itself
+        body = (
+            b"".join(upstream.streaming_content)
+            if upstream.streaming
+            else upstream.content
+        )
+        self.upstream_bytes = len(body)
+
+        path = self._resolve(upstream)
+        if path is None:
+            return upstream.status_code, dict(upstream.items()), body
+        return self._send_file(path, upstream, headers.get("Range", ""))
+
+    def _resolve(self, response):
+        if "X-Accel-Redirect" in response:
+            location = settings.MEDIA_OFFLOAD_LOCATION.rstrip("/") + "/"
+            uri = unquote(response["X-Accel-Redirect"])
+            if not uri.startswith(location):
+                return ""
+            return os.path.join(settings.MEDIA_ROOT, uri[len(location) :])
+        if "X-Sendfile" in response:
+            return response["X-Sendfile"]
+        return None
+
+    def _send_file(self, path, upstream, range_header):
+        if not os.path.isfile(path):
+            return 404, {}, b""
+
+        size = os.path.getsize(path)
+        start, end, status = 0, size - 1, 200
+        match = RANGE_RE.match(range_header)
+        if match:
+            start = int(match.group(1))
+            end = min(int(match.group(2) or size - 1), size - 1)
+            status = 206
+
+        headers = {
+            name: upstream[name] for name in self.PASSED_HEADERS if name in upstream
+        }
+        if status == 206:
+            headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+
+        with open(path, "rb") as f:
+            f.seek(start)
+            return status, headers, f.read(end - start + 1)
+
+
+@override_settings(ALLOWED_HOSTS=["testserver"], USE_S3_MEDIA=False)
+class MediaOffloadTest(TestCase):
+    """The audio endpoint behind a proxy that honours ``X-Accel-Redirect``
+    and ``X-Sendfile``: the proxy, not Django, sends the bytes"""
+
+    CONTENT = bytes(range(256)) * 16
+
+    @classmethod
+    def setUpClass(cls):
+        # Before setUpTestData, which writes the file
+        media_root = tempfile.mkdtemp()
+        cls.addClassCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        cls.enterClassContext(
+            override_settings(
+                MEDIA_ROOT=media_root,
+                STORAGES={
+                    "default": {
+                        "BACKEND": "django.core.files.storage.FileSystemStorage",
+                        "OPTIONS": {"location": media_root},
+                    },
+                    "staticfiles": {
+                        "BACKEND": (
+                            "django.contrib.staticfiles.storage.StaticFilesStorage"
+                        )
+                    },
+                },
+            )
+        )
+        super().setUpClass()
+
+    @classmethod
+    def setUpTestData(cls):
+        language, _ = Language.objects.get_or_create(
+            code="ru", defaults={"name": "Russian", "native_name": "Русский"}
+        )
+        lecturer = Lecturer.objects.create(code="offload", name="Offload", order=1)
+        group = TopicGroup.objects.create(name="Offload", code="offload")
+        topic = Topic.objects.create(
+            lecturer=lecturer, group=group, code="offload", title="Offload", order=1
+        )
+        cls.lecture = Lecture(
+            topic=topic, language=language, title="Offload", order=1, duration=1
+        )
+        cls.lecture.audio_file.save("offload.mp3", ContentFile(cls.CONTENT))
+
+    def setUp(self):
+        self.proxy = StubProxy()
+        self.url = reverse("lecture_audio", args=[self.lecture.id])
+
+    def test_full_file(self):
+        for mode in FileOffload.MODES:
+            with self.subTest(mode=mode), override_settings(MEDIA_OFFLOAD=mode):
+                status, headers, body = self.proxy.get(self.url)
+                self.assertEqual(status, 200)
+                self.assertEqual(body, self.CONTENT)
+                self.assertEqual(headers["Content-Type"], "audio/mpeg")
+                self.assertEqual(self.proxy.upstream_bytes, 0)
+
+    def test_byte_range(self):
+        for mode in FileOffload.MODES:
+            with self.subTest(mode=mode), override_settings(MEDIA_OFFLOAD=mode):
+                status, headers, body = self.proxy.get(
+                    self.url, {"Range": "bytes=100-199"}
+                )
+                self.assertEqual(status, 206)
+                self.assertEqual(body, self.CONTENT[100:200])
+                self.assertEqual(
+                    headers["Content-Range"], f"bytes 100-199/{len(self.CONTENT)}"
+                )
+                self.assertEqual(self.proxy.upstream_bytes, 0)
+
+    def test_download(self):
+        for mode in FileOffload.MODES:
+            with self.subTest(mode=mode), override_settings(MEDIA_OFFLOAD=mode):
+                status, headers, body = self.proxy.get(self.url + "?download=1")
+                self.assertEqual(status, 200)
+                self.assertEqual(body, self.CONTENT)
+                self.assertTrue(headers["Content-Disposition"].startswith("attachment"))
+                self.assertEqual(self.proxy.upstream_bytes, 0)
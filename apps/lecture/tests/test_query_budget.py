@@ -0,0 +1,504 @@
+import json
+import shutil
+import tempfile
+import time
+from contextlib import contextmanager
+from unittest import mock
+
+from django.contrib import admin
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import get_resolver, reverse
+
+from apps.lecture.models import (
+    CurrentLecture,
+    FavoriteLecture,
+    Language,
+    Lecture,
+    LectureHistory,
+    LectureMarker,
+    LectureProgress,
+    LectureSeekIndex,
+    LectureWaveform,
+    Lecturer,
+    Topic,
+    TopicGroup,
+)
+from apps.lecture.services import CatalogAggregates, ListenerPresence
+from apps.system.models import ActivityLog, UserActivity
+from apps.system.services import RedisClient
+from apps.users.models import User
+
+# Most queries an endpoint may run, whatever the size of the data.
+# (url name, method, client) -> budget. "anon", "user" or "admin" client.
+BUDGETS = {
+    ("lecture:home", "GET", "anon"): 20,
+    ("lecture:home", "GET", "user"): 26,
+    ("lecture:lecturers_list", "GET", "anon"): 8,
+    ("lecture:lecturers_list", "GET", "user"): 10,
+    ("lecture:lecturer_detail", "GET", "anon"): 12,
+    ("lecture:lecturer_detail", "GET", "user"): 14,
+    ("lecture:topic_detail", "GET", "anon"): 13,
+    ("lecture:topic_detail", "GET", "user"): 18,
+    ("lecture:lecture_player", "GET", "anon"): 8,
+    ("lecture:lecture_player", "GET", "user"): 14,
+    ("lecture:lecture_player_with_time", "GET", "user"): 14,
+    ("lecture:topics_list", "GET", "anon"): 8,
+    ("lecture:topics_list", "GET", "user"): 10,
+    ("lecture:recent_lectures", "GET", "anon"): 9,
+    ("lecture:recent_lectures", "GET", "user"): 11,
+    ("lecture:favorites_list", "GET", "user"): 10,
+    ("lecture:history_list", "GET", "user"): 10,
+    ("lecture:now_listening_list", "GET", "user"): 10,
+    ("lecture_progress", "GET", "user"): 8,
+    ("lecture_progress", "POST", "user"): 8,
+    ("lecture_player_state", "GET", "anon"): 7,
+    ("lecture_player_state", "GET", "user"): 12,
+    ("topic_playlist", "GET", "anon"): 5,
+    ("lecture_audio", "GET", "anon"): 3,
+    ("lecture_seek", "GET", "anon"): 4,
+    ("lecture_waveform", "GET", "anon"): 4,
+    ("lecture:topic_download", "GET", "anon"): 8,
+    ("topic_playlist", "GET", "user"): 8,
+    ("set_current_lecture", "POST", "user"): 20,
+    ("toggle_favorite", "POST", "user"): 10,
+    ("toggle_favorite", "DELETE", "user"): 8,
+    ("lecture_markers", "GET", "user"): 6,
+    ("lecture_markers", "POST", "user"): 8,
+    ("marker_detail", "PUT", "user"): 8,
+    ("marker_detail", "DELETE", "user"): 8,
+    ("sync_events", "POST", "user"): 16,
+}
+
+ADMIN_CHANGELIST_BUDGET = 12
+
+# URL names that must have at least one budget entry
+COVERED_URLCONFS = (
+    "apps.lecture.urls",
+    "api.v1.lectures.urls",
+    "api.v1.sync.urls",
+    "api.v1.topics.urls",
+)
+
+
+@override_settings(
+    ALLOWED_HOSTS=["testserver"],
+    USE_S3_MEDIA=False,
+    PROGRESS_WRITE_BEHIND=False,
+    CACHES={
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "query-budget",
+        }
+    },
+    CHANNEL_LAYERS={"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}},
+)
+class QueryBudgetTest(TestCase):
+    """Every view, API endpoint and admin changelist stays within its query
+    budget, and the count does not grow with the size of the catalog.
+
+    Each endpoint is requested with a cold cache against a small catalog
+    and one ``SCALE`` times larger. Media goes to a temporary storage and
+    the Redis presence index is stubbed, so nothing outside the test
+    database is touched.
+    """
+
+    SCALE = 10
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        media_root = tempfile.mkdtemp()
+        cls.addClassCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        cls.enterClassContext(
+            override_settings(
+                MEDIA_ROOT=media_root,
+                STORAGES={
+                    "default": {
+                        "BACKEND": "django.core.files.storage.FileSystemStorage",
+                        "OPTIONS": {"location": media_root},
+                    },
+                    "staticfiles": {
+                        "BACKEND": (
+                            "django.contrib.staticfiles.storage.StaticFilesStorage"
+                        )
+                    },
+                },
+            )
+        )
+        cls.enterClassContext(
+            mock.patch.object(RedisClient, "get", return_value=mock.MagicMock())
+        )
+        cls.enterClassContext(
+            mock.patch.multiple(
+                ListenerPresence,
+                touch=mock.Mock(return_value=None),
+                get_recent=mock.Mock(return_value=[]),
+                count_for_lecture=mock.Mock(return_value=0),
+                count_for_topic=mock.Mock(return_value=0),
+                count_for_lectures=mock.Mock(
+                    side_effect=lambda ids: dict.fromkeys(ids, 0)
+                ),
+            )
+        )
+
+    def test_every_url_has_a_budget(self):
+        budgeted = {name.split(":")[-1] for name, _, _ in BUDGETS}
+        for urlconf in COVERED_URLCONFS:
+            for pattern in get_resolver(urlconf).url_patterns:
+                if pattern.name:
+                    with self.subTest(url=pattern.name):
+                        self.assertIn(pattern.name, budgeted)
+
+    def test_endpoints_within_budget(self):
+        with self._catalog(1) as requests:
+            small = {key: self._count(*request) for key, request in requests.items()}
+
+        with self._catalog(self.SCALE) as requests:
+            for key, request in requests.items():
+                with self.subTest(endpoint=key):
+                    budget = BUDGETS.get(key, ADMIN_CHANGELIST_BUDGET)
+                    self.assertLessEqual(small[key], budget)
+                    # Same count with SCALE times the data
+                    with self.assertNumQueries(small[key]):
+                        self._request(*request)
+
+    @contextmanager
+    def _catalog(self, scale):
+        """Requests of every endpoint against a catalog rolled back after"""
+        with transaction.atomic():
+            fixture = self._seed(scale)
+            self._write_audio(fixture["lecture"])
+            yield self._requests(fixture)
+            transaction.set_rollback(True)
+
+    def _write_audio(self, lecture):
+        """The audio endpoint serves a real file from the temporary storage"""
+        default_storage.delete(lecture.audio_file.name)
+        default_storage.save(lecture.audio_file.name, ContentFile(b"\0" * 4096))
+
+    def _count(self, client, method, url, payload):
+        with CaptureQueriesContext(connection) as context:
+            self._request(client, method, url, payload)
+        return len(context.captured_queries)
+
+    def _request(self, client, method, url, payload):
+        # Every request runs cold: no page, fragment or card caches
+        cache.clear()
+        kwargs = {}
+        if payload is not None:
+            kwargs = {"data": json.dumps(payload), "content_type": "application/json"}
+
+        response = getattr(client, method.lower())(url, **kwargs)
+        self.assertLess(response.status_code, 400, f"{method} {url}")
+        return response
+
+    def _requests(self, fixture):
+        """``(url name, method, client) -> (client, method, url, payload)``"""
+        clients = self._clients(fixture)
+        lecture = fixture["lecture"]
+        topic = lecture.topic
+        marker = fixture["marker"]
+        now_ms = int(time.time() * 1000)
+
+        requests = {
+            ("lecture:home", "GET", "anon"): (reverse("lecture:home"), None),
+            ("lecture:home", "GET", "user"): (reverse("lecture:home"), None),
+            ("lecture:lecturers_list", "GET", "anon"): (
+                reverse("lecture:lecturers_list"),
+                None,
+            ),
+            ("lecture:lecturers_list", "GET", "user"): (
+                reverse("lecture:lecturers_list"),
+                None,
+            ),
+            ("lecture:lecturer_detail", "GET", "anon"): (
+                reverse("lecture:lecturer_detail", args=[topic.lecturer_id]),
+                None,
+            ),
+            ("lecture:lecturer_detail", "GET", "user"): (
+                reverse("lecture:lecturer_detail", args=[topic.lecturer_id]),
+                None,
+            ),
+            ("lecture:topic_detail", "GET", "anon"): (
+                reverse("lecture:topic_detail", args=[topic.id]),
+                None,
+            ),
+            ("lecture:topic_detail", "GET", "user"): (
+                reverse("lecture:topic_detail", args=[topic.id]),
+                None,
+            ),
+            ("lecture:lecture_player", "GET", "anon"): (
+                reverse("lecture:lecture_player", args=[lecture.id]),
+                None,
+            ),
+            ("lecture:lecture_player", "GET", "user"): (
+                reverse("lecture:lecture_player", args=[lecture.id]),
+                None,
+            ),
+            ("lecture:lecture_player_with_time", "GET", "user"): (
+                reverse("lecture:lecture_player_with_time", args=[lecture.id, 30]),
+                None,
+            ),
+            ("lecture:topics_list", "GET", "anon"): (
+                reverse("lecture:topics_list"),
+                None,
+            ),
+            ("lecture:topics_list", "GET", "user"): (
+                reverse("lecture:topics_list"),
+                None,
+            ),
+            ("lecture:recent_lectures", "GET", "anon"): (
+                reverse("lecture:recent_lectures"),
+                None,
+            ),
+            ("lecture:recent_lectures", "GET", "user"): (
+                reverse("lecture:recent_lectures"),
+                None,
+            ),
+            ("lecture:favorites_list", "GET", "user"): (
+                reverse("lecture:favorites_list"),
+                None,
+            ),
+            ("lecture:history_list", "GET", "user"): (
+                reverse("lecture:history_list"),
+                None,
+            ),
+            ("lecture:now_listening_list", "GET", "user"): (
+                reverse("lecture:now_listening_list"),
+                None,
+            ),
+            ("lecture_progress", "GET", "user"): (
+                reverse("lecture_progress", args=[lecture.id]),
+                None,
+            ),
+            ("lecture_progress", "POST", "user"): (
+                reverse("lecture_progress", args=[lecture.id]),
+                {"current_time": 42, "completed": False},
+            ),
+            ("lecture_player_state", "GET", "anon"): (
+                reverse("lecture_player_state", args=[lecture.id]),
+                None,
+            ),
+            ("lecture_player_state", "GET", "user"): (
+                reverse("lecture_player_state", args=[lecture.id]),
+                None,
+            ),
+            ("lecture_audio", "GET", "anon"): (
+                reverse("lecture_audio", args=[lecture.id]),
+                None,
+            ),
+            ("lecture_seek", "GET", "anon"): (
+                reverse("lecture_seek", args=[lecture.id]) + "?t=90",
+                None,
+            ),
+            ("lecture:topic_download", "GET", "anon"): (
+                reverse("lecture:topic_download", args=[lecture.topic_id]),
+                None,
+            ),
+            ("lecture_waveform", "GET", "anon"): (
+                lecture.waveform_url,
+                None,
+            ),
+            ("topic_playlist", "GET", "anon"): (
+                reverse("topic_playlist", args=[lecture.topic_id]),
+                None,
+            ),
+            ("topic_playlist", "GET", "user"): (
+                reverse("topic_playlist", args=[lecture.topic_id]),
+                None,
+            ),
+            ("set_current_lecture", "POST", "user"): (
+                reverse("set_current_lecture", args=[lecture.id]),
+                {},
+            ),
+            ("toggle_favorite", "POST", "user"): (
+                reverse("toggle_favorite", args=[lecture.id]),
+                {},
+            ),
+            ("toggle_favorite", "DELETE", "user"): (
+                reverse("toggle_favorite", args=[lecture.id]),
+                {},
+            ),
+            ("lecture_markers", "GET", "user"): (
+                reverse("lecture_markers", args=[lecture.id]),
+                None,
+            ),
+            ("lecture_markers", "POST", "user"): (
+                reverse("lecture_markers", args=[lecture.id]),
+                {"timestamp": 10, "text": "Budget"},
+            ),
+            ("marker_detail", "PUT", "user"): (
+                reverse("marker_detail", args=[marker.id]),
+                {"timestamp": 20, "text": "Budget"},
+            ),
+            ("marker_detail", "DELETE", "user"): (
+                reverse("marker_detail", args=[marker.id]),
+                None,
+            ),
+            ("sync_events", "POST", "user"): (
+                reverse("sync_events"),
+                {
+                    "events": [
+                        {
+                            "id": "budget-1",
+                            "type": "progress",
+                            "timestamp": now_ms,
+                            "lecture_id": lecture.id,
+                            "data": {"current_time": 5},
+                        },
+                        {
+                            "id": "budget-2",
+                            "type": "favorite",
+                            "timestamp": now_ms,
+                            "lecture_id": lecture.id,
+                            "data": {"is_favorite": True},
+                        },
+                    ]
+                },
+            ),
+        }
+        requests = {
+            (name, method, client): (clients[client], method, url, payload)
+            for (name, method, client), (url, payload) in requests.items()
+        }
+
+        for model in admin.site._registry:
+            opts = model._meta
+            url = reverse(f"admin:{opts.app_label}_{opts.model_name}_changelist")
+            key = (f"admin:{opts.app_label}_{opts.model_name}", "GET", "admin")
+            requests[key] = (clients["admin"], "GET", url, None)
+        return requests
+
+    def _clients(self, fixture):
+        user_client = Client()
+        user_client.force_login(fixture["user"])
+        admin_client = Client()
+        admin_client.force_login(fixture["admin"])
+        return {"anon": Client(), "user": user_client, "admin": admin_client}
+
+    def _seed(self, scale):
+        """A synthetic catalog with 3*scale lecturers and the user's activity"""
+        language, _ = Language.objects.get_or_create(
+            code="ru", defaults={"name": "Russian", "native_name": "Русский"}
+        )
+        group = TopicGroup.objects.create(name="Budget", code="budget")
+
+        max_order = max(Lecturer.objects.values_list("order", flat=True), default=0)
+        lecturers = Lecturer.objects.bulk_create(
+            Lecturer(
+                code=f"budget-{i}",
+                name=f"Lecturer {i}",
+                order=max_order + i + 1,
+            )
+            for i in range(3 * scale)
+        )
+        topics = Topic.objects.bulk_create(
+            Topic(
+                lecturer=lecturer,
+                group=group,
+                code=f"topic-{i}",
+                title=f"Topic {i}",
+                order=i,
+            )
+            for lecturer in lecturers
+            for i in range(3)
+        )
+        Topic.languages.through.objects.bulk_create(
+            Topic.languages.through(topic_id=topic.id, language_id=language.id)
+            for topic in topics
+        )
+        lectures = Lecture.objects.bulk_create(
+            Lecture(
+                topic=topic,
+                language=language,
+                title=f"Lecture {i}",
+                audio_file=f"budget/{topic.id}/{i}.mp3",
+                content_hash=f"{topic.id:032x}{i:032x}",
+                duration=600,
+                file_size=1024 * 1024,
+                order=i + 1,
+            )
+            for topic in topics
+            for i in range(5)
+        )
+        CatalogAggregates().refresh_all()
+        LectureSeekIndex.objects.create(
+            lecture=lectures[0],
+            content_hash=lectures[0].content_hash,
+            interval=1.0,
+            offsets=bytes(4 * 600),
+            duration=600,
+            data_start=0,
+            data_end=1024 * 1024,
+        )
+        LectureWaveform.objects.create(
+            lecture=lectures[0],
+            content_hash=lectures[0].content_hash,
+            peaks=bytes(1000),
+            decoder="MP3GainDecoder",
+        )
+
+        user = User.objects.create_user(email="budget@example.com")
+        admin_user = User.objects.create_superuser(
+            email="budget-admin@example.com", password=None
+        )
+        User.objects.filter(id__in=[user.id, admin_user.id]).update(is_active=True)
+        user.refresh_from_db()
+        admin_user.refresh_from_db()
+
+        listeners = [
+            User.objects.create_user(email=f"budget-{i}@example.com")
+            for i in range(scale)
+        ]
+
+        LectureProgress.objects.bulk_create(
+            LectureProgress(user=user, lecture=lecture, current_time=60)
+            for lecture in lectures
+        )
+        FavoriteLecture.objects.bulk_create(
+            FavoriteLecture(user=user, lecture=lecture) for lecture in lectures[1:]
+        )
+        LectureHistory.objects.bulk_create(
+            LectureHistory(user=user, lecture=lecture) for lecture in lectures
+        )
+        LectureMarker.objects.bulk_create(
+            LectureMarker(user=user, lecture=lectures[0], timestamp=i, text=f"{i}")
+            for i in range(5 * scale)
+        )
+        CurrentLecture.objects.bulk_create(
+            CurrentLecture(user=listener, topic=lecture.topic, lecture=lecture)
+            for listener, lecture in zip(listeners, lectures)
+        )
+
+        activities = UserActivity.objects.bulk_create(
+            UserActivity(
+                user=listener,
+                session_hash=f"budget-{i}",
+                ip_address="127.0.0.1",
+                user_agent="query-budget",
+            )
+            for i, listener in enumerate(listeners)
+        )
+        ActivityLog.objects.bulk_create(
+            ActivityLog(
+                activity=activity,
+                url="/",
+                full_path="/",
+                view_name="home",
+                http_method="GET",
+            )
+            for activity in activities
+            for _ in range(3)
+        )
+
+        return {
+            "user": user,
+            "admin": admin_user,
+            "lecture": lectures[0],
+            "marker": LectureMarker.objects.filter(user=user).first(),
+        }
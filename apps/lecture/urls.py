@@ -8,6 +8,11 @@ urlpatterns = [
     path("lecturers/", views.lecturers_list, name="lecturers_list"),
     path("lecturer/<int:lecturer_id>/", views.lecturer_detail, name="lecturer_detail"),
     path("topic/<int:topic_id>/", views.topic_detail, name="topic_detail"),
+    path(
+        "topic/<int:topic_id>/download.zip",
+        views.topic_download,
+        name="topic_download",
+    ),
     path("lecture/<int:lecture_id>/", views.lecture_player, name="lecture_player"),
     path(
         "lecture/<int:lecture_id>/<int:start_time>/",
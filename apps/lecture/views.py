@@ -1,19 +1,98 @@
+from django.conf import settings
 from django.shortcuts import render, get_object_or_404
+from django.templatetags.static import static
 from django.contrib.auth.decorators import login_required
 from django.db.models import Max
-
-from apps.lecture.services import HomePageManager, TopicPlayerManager
+from django.http import Http404, HttpResponseBadRequest, JsonResponse
+from django.template.loader import render_to_string
+from django.views.decorators.http import require_safe
+
+from apps.lecture.services import (
+    CatalogVersion,
+    HomePageManager,
+    ListenerPresence,
+    ProgressManager,
+    TopicArchive,
+    TopicIndex,
+    TopicPlayerManager,
+)
 from apps.system.decorators import track_activity
+from apps.system.services import InvalidCursor, KeysetPaginator, Logger
+from apps.system.templatetags.static_hash import static_hash
 
+from .decorators import catalog_page
 from .models import (
     Lecturer,
     Topic,
     Lecture,
-    LectureProgress,
     FavoriteLecture,
+    LectureHistory,
     LectureMarker,
+    CurrentLecture,
+)
+
+logger = Logger(app_name="lecture_views")
+
+# Module graph loaded by app.js on the player page
+PLAYER_MODULES = (
+    "js/modules/lecture-player/player-module.js",
+    "js/modules/lecture-player/player-controls.js",
+    "js/modules/lecture-player/progress-bar.js",
+    "js/modules/lecture-player/player-header.js",
+    "js/modules/lecture-player/audio-loader.js",
+    "js/modules/lecture-player/audio-cache.js",
+    "js/modules/lecture-player/segment-loader.js",
+    "js/modules/lecture-player/favorite-handler.js",
+    "js/modules/lecture-player/share-handler.js",
+    "js/modules/lecture-player/download-handler.js",
+    "js/modules/lecture-player/markers-handler.js",
+    "js/modules/lecture-player/player-socket.js",
 )
 
+# Topic.Meta.ordering spelled out with a unique tail, for keyset pagination
+TOPIC_LIST_ORDERING = (
+    "lecturer__level",
+    "lecturer__order",
+    "lecturer_id",
+    "group__order",
+    "group_id",
+    "order",
+    "id",
+)
+
+
+def render_list_page(
+    request,
+    template_name,
+    cards_template,
+    paginator,
+    items_name,
+    context,
+    transform=None,
+):
+    """Render one keyset page of a list.
+
+    The first request renders the whole page. With ``?format=json`` only the
+    cards of the page after ``?cursor=`` are rendered, for infinite scroll.
+    """
+    try:
+        page = paginator.get_page(request.GET.get("cursor"))
+    except InvalidCursor:
+        return HttpResponseBadRequest("Invalid cursor")
+
+    items = [transform(item) for item in page.items] if transform else page.items
+    context = {**context, items_name: items, "next_cursor": page.next_cursor}
+
+    if request.GET.get("format") == "json":
+        return JsonResponse(
+            {
+                "html": render_to_string(cards_template, context, request),
+                "next_cursor": page.next_cursor,
+            }
+        )
+
+    return render(request, template_name, context)
+
 
 @track_activity
 def home(request):
@@ -23,31 +102,32 @@ def home(request):
 
 
 @track_activity
+@catalog_page
 def lecturers_list(request):
-    lecturers = Lecturer.objects.prefetch_related("topics").all()
+    lecturers = Lecturer.objects.all()
     context = {
         "lecturers": lecturers,
+        "catalog_version": CatalogVersion.get()[0],
     }
     return render(request, "lecturers_list.html", context)
 
 
 @track_activity
+@catalog_page
 def lecturer_detail(request, lecturer_id):
     lecturer = get_object_or_404(Lecturer, id=lecturer_id)
-    topics = (
-        lecturer.topics.select_related("group")
-        .prefetch_related("lectures", "languages")
-        .all()
-    )
+    topics = lecturer.topics.select_related("group").all()
 
     context = {
         "lecturer": lecturer,
         "topics": topics,
+        "catalog_version": CatalogVersion.get()[0],
     }
     return render(request, "lecturer_detail.html", context)
 
 
 @track_activity
+@catalog_page
 def topic_detail(request, topic_id):
     topic = get_object_or_404(
         Topic.objects.select_related("lecturer", "group").prefetch_related("languages"),
@@ -59,14 +139,30 @@ def topic_detail(request, topic_id):
 
     context.pop("current_lecture", None)
     context.pop("current_lecture_progress", None)
+    context["catalog_version"] = CatalogVersion.get()[0]
 
     return render(request, "topic_detail.html", context)
 
 
+@require_safe
+def topic_download(request, topic_id):
+    """All lectures of a topic as one ZIP, streamed and resumable by range"""
+    topic = get_object_or_404(Topic.objects.only("id", "title"), id=topic_id)
+
+    archive = TopicArchive(topic)
+    if not archive.lectures:
+        raise Http404("Topic has no lectures")
+
+    return archive.response(request)
+
+
 @track_activity
 def lecture_player(request, lecture_id, start_time=None):
     lecture = get_object_or_404(
-        Lecture.objects.select_related("topic__lecturer", "language"), id=lecture_id
+        Lecture.objects.select_related("topic__lecturer", "language", "waveform").defer(
+            "waveform__peaks"
+        ),
+        id=lecture_id,
     )
     topic = lecture.topic
 
@@ -75,9 +171,7 @@ def lecture_player(request, lecture_id, start_time=None):
     markers = []
 
     if request.user.is_authenticated:
-        lecture_progress = LectureProgress.objects.filter(
-            user=request.user, lecture=lecture
-        ).first()
+        lecture_progress = ProgressManager(request.user).get(lecture)
 
         is_favorite = FavoriteLecture.objects.filter(
             user=request.user, lecture=lecture
@@ -87,14 +181,14 @@ def lecture_player(request, lecture_id, start_time=None):
             user=request.user, lecture=lecture
         ).order_by("timestamp")
 
-    prev_lecture = (
-        topic.lectures.filter(order__lt=lecture.order).order_by("-order").first()
-    )
-    next_lecture = (
-        topic.lectures.filter(order__gt=lecture.order).order_by("order").first()
-    )
+    index = TopicIndex(topic.id)
+    prev_lecture_id, next_lecture_id = index.neighbors(lecture.id)
 
-    total_lectures = topic.lectures.count()
+    try:
+        listeners_count = ListenerPresence().count_for_lecture(lecture.id)
+    except Exception as e:
+        logger.error(f"Listener presence unavailable: {str(e)}")
+        listeners_count = 0
 
     context = {
         "lecture": lecture,
@@ -102,27 +196,50 @@ def lecture_player(request, lecture_id, start_time=None):
         "lecture_progress": lecture_progress,
         "is_favorite": is_favorite,
         "markers": markers,
-        "prev_lecture": prev_lecture,
-        "next_lecture": next_lecture,
-        "total_lectures": total_lectures,
+        "prev_lecture_id": prev_lecture_id,
+        "next_lecture_id": next_lecture_id,
+        "lecture_position": index.position(lecture.id),
+        "total_lectures": len(index),
+        "remaining_duration": index.remaining_duration(
+            lecture.id, lecture_progress.current_time if lecture_progress else 0
+        ),
+        "listeners_count": listeners_count,
         "target_start_time": start_time or 0,
+        "audio_cache_budget": settings.PLAYER_AUDIO_CACHE_BYTES,
     }
 
-    return render(request, "lecture_player.html", context)
+    response = render(request, "lecture_player.html", context)
+    response["Link"] = player_preload_links()
+    return response
+
+
+def player_preload_links():
+    """``Link`` header that starts the player assets before parsing.
+
+    The audio is not preloaded: the media element streams it with range
+    requests, which would not reuse a preloaded response.
+    """
+    links = [f"<{static_hash('css/player.css')}>; rel=preload; as=style"]
+    links += [f"<{static(path)}>; rel=modulepreload" for path in PLAYER_MODULES]
+    return ", ".join(links)
 
 
 @track_activity
+@catalog_page
 def topics_list(request):
-    topics = (
-        Topic.objects.select_related("lecturer", "group")
-        .prefetch_related("lectures", "languages")
-        .all()
-    )
+    topics = Topic.objects.select_related("lecturer", "group")
     context = {
-        "topics": topics,
         "page_title": "Все темы",
+        "catalog_version": CatalogVersion.get()[0],
     }
-    return render(request, "topics_list.html", context)
+    return render_list_page(
+        request,
+        "topics_list.html",
+        "partials/topic_cards.html",
+        KeysetPaginator(topics, TOPIC_LIST_ORDERING, settings.LIST_PAGE_SIZE),
+        "topics",
+        context,
+    )
 
 
 @track_activity
@@ -131,66 +248,83 @@ def recent_lectures(request):
 
     if latest_topic_date:
         latest_topics = Topic.objects.filter(created_at__date=latest_topic_date.date())
-        lectures = (
-            Lecture.objects.select_related("topic__lecturer", "language")
-            .filter(topic__in=latest_topics)
-            .order_by("-created_at")
+        lectures = Lecture.objects.select_related("topic__lecturer", "language").filter(
+            topic__in=latest_topics
         )
     else:
         lectures = Lecture.objects.none()
 
     context = {
-        "lectures": lectures,
         "page_title": "Новые лекции",
     }
-    return render(request, "lectures_list.html", context)
+    return render_list_page(
+        request,
+        "lectures_list.html",
+        "partials/lecture_cards.html",
+        KeysetPaginator(lectures, ("-created_at", "-id"), settings.LIST_PAGE_SIZE),
+        "lectures",
+        context,
+    )
 
 
 @login_required
 @track_activity
 def favorites_list(request):
-    lectures = (
-        Lecture.objects.select_related("topic__lecturer", "language")
-        .filter(favorited_by__user=request.user)
-        .order_by("-favorited_by__created_at")
-    )
+    favorites = FavoriteLecture.objects.select_related(
+        "lecture__topic__lecturer", "lecture__language"
+    ).filter(user=request.user)
 
     context = {
-        "lectures": lectures,
         "page_title": "Избранные лекции",
     }
-    return render(request, "lectures_list.html", context)
+    return render_list_page(
+        request,
+        "lectures_list.html",
+        "partials/lecture_cards.html",
+        KeysetPaginator(favorites, ("-created_at", "-id"), settings.LIST_PAGE_SIZE),
+        "lectures",
+        context,
+        transform=lambda favorite: favorite.lecture,
+    )
 
 
 @login_required
 @track_activity
 def history_list(request):
-    lectures = (
-        Lecture.objects.select_related("topic__lecturer", "language")
-        .filter(history_records__user=request.user)
-        .distinct()
-        .order_by("-history_records__listened_at")
-    )
+    records = LectureHistory.objects.select_related(
+        "lecture__topic__lecturer", "lecture__language"
+    ).filter(user=request.user)
 
     context = {
-        "lectures": lectures,
         "page_title": "История прослушивания",
     }
-    return render(request, "lectures_list.html", context)
+    return render_list_page(
+        request,
+        "lectures_list.html",
+        "partials/lecture_cards.html",
+        KeysetPaginator(records, ("-listened_at", "-id"), settings.LIST_PAGE_SIZE),
+        "lectures",
+        context,
+        transform=lambda record: record.lecture,
+    )
 
 
 @login_required
 @track_activity
 def now_listening_list(request):
-    from .models import CurrentLecture
-
-    current_sessions = (
-        CurrentLecture.objects.select_related(
-            "lecture__topic__lecturer", "lecture__language", "user"
+    try:
+        current_sessions = ListenerPresence().get_recent(
+            settings.PRESENCE_LIST_LIMIT, exclude_user_id=request.user.id
+        )
+    except Exception as e:
+        logger.error(f"Listener presence unavailable, using DB: {str(e)}")
+        current_sessions = (
+            CurrentLecture.objects.select_related(
+                "lecture__topic__lecturer", "lecture__language", "user"
+            )
+            .exclude(user=request.user)
+            .order_by("-updated_at")[: settings.PRESENCE_LIST_LIMIT]
         )
-        .exclude(user=request.user)
-        .order_by("-updated_at")
-    )
 
     context = {
         "current_sessions": current_sessions,
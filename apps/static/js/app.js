@@ -4,4 +4,18 @@ document.addEventListener('DOMContentLoaded', function() {
             window.lecturePlayer = new module.LecturePlayer();
         });
     }
+
+    if (document.querySelector('[data-presence-feed]')) {
+        import('./modules/presence/presence-feed.js').then(module => {
+            window.presenceFeed = new module.PresenceFeed();
+            window.presenceFeed.init();
+        });
+    }
+
+    const infiniteLists = document.querySelectorAll('[data-infinite-list]');
+    if (infiniteLists.length) {
+        import('./modules/infinite-list/infinite-list.js').then(module => {
+            infiniteLists.forEach(container => new module.InfiniteList(container).init());
+        });
+    }
 });
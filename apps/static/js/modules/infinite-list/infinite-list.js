@@ -0,0 +1,53 @@
+export class InfiniteList {
+    constructor(container) {
+        this.container = container;
+        this.nextCursor = container.dataset.nextCursor || '';
+        this.isLoading = false;
+        this.sentinel = null;
+        this.observer = null;
+    }
+
+    init() {
+        if (!this.nextCursor) return;
+
+        this.sentinel = document.createElement('div');
+        this.sentinel.className = 'infinite-list-sentinel';
+        this.container.after(this.sentinel);
+
+        this.observer = new IntersectionObserver((entries) => {
+            if (entries.some((entry) => entry.isIntersecting)) {
+                this.loadMore();
+            }
+        }, { rootMargin: '400px' });
+        this.observer.observe(this.sentinel);
+    }
+
+    async loadMore() {
+        if (this.isLoading || !this.nextCursor) return;
+        this.isLoading = true;
+
+        const url = new URL(window.location.href);
+        url.searchParams.set('cursor', this.nextCursor);
+        url.searchParams.set('format', 'json');
+
+        try {
+            const response = await fetch(url, { credentials: 'same-origin' });
+            if (!response.ok) throw new Error(`HTTP ${response.status}`);
+
+            const data = await response.json();
+            this.container.insertAdjacentHTML('beforeend', data.html);
+            this.nextCursor = data.next_cursor || '';
+        } catch (error) {
+            console.error('Failed to load more items:', error);
+        } finally {
+            this.isLoading = false;
+        }
+
+        if (!this.nextCursor) this.destroy();
+    }
+
+    destroy() {
+        this.observer?.disconnect();
+        this.sentinel?.remove();
+    }
+}
@@ -0,0 +1,227 @@
+/**
+ * Lecture audio kept on the device between visits.
+ *
+ * Whole files live in Cache Storage under a URL built from the lecture ID
+ * and the content hash the server reports. A small index in localStorage
+ * holds the size and last use of each entry, so the cache stays under its
+ * byte budget by evicting the least recently used lectures. An entry whose
+ * hash no longer matches the server's is stale and dropped without being
+ * downloaded again first.
+ */
+export class AudioCache {
+    constructor({ budgetBytes = 0 } = {}) {
+        this.CACHE_NAME = 'lecture-audio-v1';
+        this.INDEX_KEY = 'lecture-audio-index-v1';
+        this.QUOTA_SHARE = 0.5; // Never take more than this share of the origin quota
+
+        this.budgetBytes = budgetBytes;
+        this.available = budgetBytes > 0 && 'caches' in window && this.storageWorks();
+        this.pending = new Map();
+    }
+
+    storageWorks() {
+        try {
+            localStorage.getItem(this.INDEX_KEY);
+            return true;
+        } catch (e) {
+            return false;
+        }
+    }
+
+    readIndex() {
+        try {
+            return JSON.parse(localStorage.getItem(this.INDEX_KEY)) || {};
+        } catch (e) {
+            return {};
+        }
+    }
+
+    writeIndex(index) {
+        try {
+            localStorage.setItem(this.INDEX_KEY, JSON.stringify(index));
+        } catch (e) {
+            console.warn('Audio cache index not saved:', e);
+        }
+    }
+
+    requestFor(lectureId, contentHash) {
+        return new Request(`/offline-audio/${lectureId}/${contentHash}`);
+    }
+
+    has(lectureId, contentHash) {
+        if (!this.available || !contentHash) return false;
+        return this.readIndex()[lectureId]?.hash === contentHash;
+    }
+
+    /**
+     * Cached audio of a lecture as a Blob, or null. Marks the entry as used.
+     */
+    async match(lectureId, contentHash) {
+        if (!this.available || !contentHash) return null;
+
+        const index = this.readIndex();
+        const entry = index[lectureId];
+        if (!entry) return null;
+
+        if (entry.hash !== contentHash) {
+            await this.delete(lectureId);
+            return null;
+        }
+
+        try {
+            const cache = await caches.open(this.CACHE_NAME);
+            const response = await cache.match(this.requestFor(lectureId, contentHash));
+            if (!response) {
+                // Evicted by the browser under storage pressure
+                delete index[lectureId];
+                this.writeIndex(index);
+                return null;
+            }
+
+            entry.usedAt = Date.now();
+            this.writeIndex(index);
+            return await response.blob();
+        } catch (error) {
+            console.warn('Audio cache read failed:', error);
+            return null;
+        }
+    }
+
+    async put(lectureId, contentHash, blob) {
+        if (!blob) return false;
+        const response = () => new Response(blob, {
+            headers: {
+                'Content-Type': blob.type || 'audio/mpeg',
+                'Content-Length': String(blob.size)
+            }
+        });
+        return this.store(lectureId, contentHash, blob.size, response);
+    }
+
+    /**
+     * Write a response of size bytes, made by makeResponse once there is room
+     */
+    async store(lectureId, contentHash, size, makeResponse) {
+        if (!this.available || !contentHash) return false;
+        if (this.has(lectureId, contentHash)) return true;
+
+        const limit = await this.limit();
+        if (size > limit) return false;
+
+        try {
+            // An older version of this lecture is stale, then room for the new one
+            await this.delete(lectureId);
+            await this.evict(limit - size);
+
+            const cache = await caches.open(this.CACHE_NAME);
+            await cache.put(this.requestFor(lectureId, contentHash), makeResponse());
+
+            const index = this.readIndex();
+            index[lectureId] = { hash: contentHash, size, usedAt: Date.now() };
+            this.writeIndex(index);
+            return true;
+        } catch (error) {
+            // QuotaExceededError included, the audio still plays from memory
+            console.warn('Audio cache write failed:', error);
+            return false;
+        }
+    }
+
+    /**
+     * Download a whole lecture into the cache in the background. Does not
+     * compete with playback and skips data saver connections. The response
+     * body streams straight into Cache Storage, never held in memory.
+     */
+    fetchAndPut(lectureId, contentHash, url) {
+        if (!this.available || !contentHash || !url) return null;
+        if (this.has(lectureId, contentHash) || this.pending.has(lectureId)) return null;
+        if (navigator.connection?.saveData) return null;
+
+        const promise = fetch(url, { priority: 'low' })
+            .then(response => {
+                if (response.status !== 200) {
+                    throw new Error(`HTTP ${response.status}: ${response.statusText}`);
+                }
+                // The budget needs the size before the body is read
+                const size = parseInt(response.headers.get('Content-Length') || '0');
+                if (!size) {
+                    response.body?.cancel();
+                    return false;
+                }
+                return this.store(lectureId, contentHash, size, () => response)
+                    .finally(() => {
+                        // Not stored: over the budget or cached meanwhile
+                        if (!response.bodyUsed) response.body?.cancel();
+                    });
+            })
+            .catch(error => {
+                console.warn('Audio cache fill failed:', error);
+                return false;
+            })
+            .finally(() => this.pending.delete(lectureId));
+
+        this.pending.set(lectureId, promise);
+        return promise;
+    }
+
+    async delete(lectureId) {
+        const index = this.readIndex();
+        const entry = index[lectureId];
+        if (!entry) return;
+
+        delete index[lectureId];
+        this.writeIndex(index);
+
+        try {
+            const cache = await caches.open(this.CACHE_NAME);
+            await cache.delete(this.requestFor(lectureId, entry.hash));
+        } catch (error) {
+            console.warn('Audio cache delete failed:', error);
+        }
+    }
+
+    /**
+     * Drop entries whose lecture now reports another content hash
+     */
+    async prune(lectures) {
+        if (!this.available) return;
+
+        const index = this.readIndex();
+        const stale = lectures.filter(lecture => {
+            const entry = index[lecture.id];
+            return entry && lecture.content_hash && entry.hash !== lecture.content_hash;
+        });
+
+        for (const lecture of stale) {
+            await this.delete(lecture.id);
+        }
+    }
+
+    /**
+     * Evict least recently used entries until at most maxBytes are cached
+     */
+    async evict(maxBytes) {
+        const entries = Object.entries(this.readIndex())
+            .sort(([, a], [, b]) => a.usedAt - b.usedAt);
+
+        let total = entries.reduce((sum, [, entry]) => sum + entry.size, 0);
+        for (const [lectureId, entry] of entries) {
+            if (total <= maxBytes) break;
+            await this.delete(lectureId);
+            total -= entry.size;
+        }
+    }
+
+    async limit() {
+        let limit = this.budgetBytes;
+        try {
+            const estimate = await navigator.storage?.estimate?.();
+            if (estimate?.quota) {
+                limit = Math.min(limit, estimate.quota * this.QUOTA_SHARE);
+            }
+        } catch (e) {
+            // Keep the configured budget
+        }
+        return limit;
+    }
+}
@@ -1,11 +1,24 @@
+/**
+ * Loads lecture audio for the player.
+ *
+ * In streaming mode (the default) the audio element reads the file itself
+ * with range requests: playback starts after the first range and the
+ * browser keeps memory bounded. Downloading whole files into blobs is the
+ * fallback for when streaming fails, and only then are blobs kept.
+ */
 export class AudioLoader {
     constructor() {
+        this.streaming = true;
         this.currentRequest = null;
         this.onProgress = null;
         this.onComplete = null;
         this.onError = null;
         this.loadedBlobs = new Map();
-        this.maxCacheSize = 3; // Maximum number of lectures to keep in memory
+        this.objectURLs = new Map();
+        this.prefetches = new Map();
+        this.currentPrefetch = null;
+        this.maxCacheSize = 2; // Current lecture and the prefetched next one
+        this.PREFETCH_BYTES = 1024 * 1024; // Head of the next lecture in streaming mode
     }
 
     /**
@@ -13,14 +26,36 @@ export class AudioLoader {
      */
     enforceCacheLimit() {
         while (this.loadedBlobs.size >= this.maxCacheSize) {
-            const oldestKey = this.loadedBlobs.keys().next().value;
-            const oldBlob = this.loadedBlobs.get(oldestKey);
-            // Revoke old object URL to free memory
-            if (oldBlob) {
-                URL.revokeObjectURL(URL.createObjectURL(oldBlob));
-            }
-            this.loadedBlobs.delete(oldestKey);
+            this.releaseBlob(this.loadedBlobs.keys().next().value);
+        }
+    }
+
+    /**
+     * One object URL per blob, created on first use and revoked with it
+     */
+    objectURLFor(lectureId) {
+        let objectURL = this.objectURLs.get(lectureId);
+        if (!objectURL) {
+            objectURL = URL.createObjectURL(this.loadedBlobs.get(lectureId));
+            this.objectURLs.set(lectureId, objectURL);
         }
+        return objectURL;
+    }
+
+    releaseBlob(lectureId) {
+        const objectURL = this.objectURLs.get(lectureId);
+        if (objectURL) {
+            URL.revokeObjectURL(objectURL);
+            this.objectURLs.delete(lectureId);
+        }
+        this.loadedBlobs.delete(lectureId);
+    }
+
+    /**
+     * Switch to whole-file downloads after the audio element failed to stream
+     */
+    fallbackToBlob() {
+        this.streaming = false;
     }
 
     async loadAudio(lectureId, directUrl) {
@@ -30,7 +65,30 @@ export class AudioLoader {
             // Move to end for LRU
             this.loadedBlobs.delete(lectureId);
             this.loadedBlobs.set(lectureId, blob);
-            return URL.createObjectURL(blob);
+            return this.objectURLFor(lectureId);
+        }
+
+        // A background prefetch of this lecture is running, take it over
+        const prefetch = this.prefetches.get(lectureId);
+        if (prefetch) {
+            this.currentPrefetch = prefetch;
+            prefetch.onProgress = (e) => this.reportProgress(e);
+
+            let blob = null;
+            try {
+                blob = await prefetch.promise;
+            } catch (error) {
+                // Prefetch failed, fall back to a regular request
+            }
+
+            if (this.currentPrefetch !== prefetch) {
+                throw new DOMException('Load aborted', 'AbortError');
+            }
+            this.currentPrefetch = null;
+
+            if (blob) {
+                return this.complete(lectureId, blob);
+            }
         }
 
         // Cancel previous request
@@ -49,41 +107,11 @@ export class AudioLoader {
             xhr.open('GET', directUrl, true);
             xhr.responseType = 'blob';
 
-            xhr.onprogress = (e) => {
-                if (e.lengthComputable && this.onProgress) {
-                    const percent = (e.loaded / e.total) * 100;
-                    const loadedMB = (e.loaded / 1024 / 1024).toFixed(2);
-                    const totalMB = (e.total / 1024 / 1024).toFixed(2);
-
-                    this.onProgress({
-                        percent,
-                        loaded: e.loaded,
-                        total: e.total,
-                        loadedMB,
-                        totalMB
-                    });
-                }
-            };
+            xhr.onprogress = (e) => this.reportProgress(e);
 
             xhr.onload = () => {
                 if (xhr.status === 200) {
-                    const blob = xhr.response;
-
-                    // Enforce cache limit before adding new entry
-                    this.enforceCacheLimit();
-                    this.loadedBlobs.set(lectureId, blob);
-
-                    const objectURL = URL.createObjectURL(blob);
-
-                    if (this.onComplete) {
-                        this.onComplete({
-                            url: objectURL,
-                            size: blob.size,
-                            sizeMB: (blob.size / 1024 / 1024).toFixed(2)
-                        });
-                    }
-
-                    resolve(objectURL);
+                    resolve(this.complete(lectureId, xhr.response));
                 } else {
                     const error = new Error(`HTTP ${xhr.status}: ${xhr.statusText}`);
                     if (this.onError) this.onError(error);
@@ -110,11 +138,124 @@ export class AudioLoader {
         });
     }
 
+    reportProgress(e) {
+        if (e.lengthComputable && this.onProgress) {
+            const percent = (e.loaded / e.total) * 100;
+            const loadedMB = (e.loaded / 1024 / 1024).toFixed(2);
+            const totalMB = (e.total / 1024 / 1024).toFixed(2);
+
+            this.onProgress({
+                percent,
+                loaded: e.loaded,
+                total: e.total,
+                loadedMB,
+                totalMB
+            });
+        }
+    }
+
+    /**
+     * Keep a blob obtained elsewhere (device cache, download) for playback
+     */
+    store(lectureId, blob) {
+        if (!this.loadedBlobs.has(lectureId)) {
+            // Enforce cache limit before adding new entry
+            this.enforceCacheLimit();
+            this.loadedBlobs.set(lectureId, blob);
+        }
+    }
+
+    complete(lectureId, blob) {
+        this.store(lectureId, blob);
+
+        const objectURL = this.objectURLFor(lectureId);
+
+        if (this.onComplete) {
+            this.onComplete({
+                lectureId,
+                blob,
+                url: objectURL,
+                size: blob.size,
+                sizeMB: (blob.size / 1024 / 1024).toFixed(2)
+            });
+        }
+
+        return objectURL;
+    }
+
+    /**
+     * Prepare the next lecture so the player can switch to it without
+     * waiting. Streaming fetches only the first range, which warms the
+     * connection and the HTTP cache the audio element reads from. The
+     * blob fallback downloads the whole file beside the current request
+     * and reports no progress until loadAudio() takes it over.
+     */
+    prefetch(lectureId, directUrl) {
+        if (!directUrl || this.loadedBlobs.has(lectureId) || this.prefetches.has(lectureId)) {
+            return;
+        }
+
+        if (this.streaming) {
+            this.prefetchHead(lectureId, directUrl);
+            return;
+        }
+
+        const xhr = new XMLHttpRequest();
+        const entry = { abort: () => xhr.abort(), onProgress: null, promise: null };
+
+        entry.promise = new Promise((resolve, reject) => {
+            xhr.open('GET', directUrl, true);
+            xhr.responseType = 'blob';
+
+            xhr.onprogress = (e) => entry.onProgress?.(e);
+            xhr.onload = () => {
+                if (xhr.status === 200) {
+                    this.enforceCacheLimit();
+                    this.loadedBlobs.set(lectureId, xhr.response);
+                    resolve(xhr.response);
+                } else {
+                    reject(new Error(`HTTP ${xhr.status}: ${xhr.statusText}`));
+                }
+            };
+            xhr.onerror = () => reject(new Error('Network error'));
+            xhr.onabort = () => reject(new Error('Prefetch aborted'));
+            xhr.onloadend = () => this.prefetches.delete(lectureId);
+
+            xhr.send();
+        });
+        // Only awaited if the lecture is opened
+        entry.promise.catch(() => {});
+
+        this.prefetches.set(lectureId, entry);
+    }
+
+    prefetchHead(lectureId, directUrl) {
+        const controller = new AbortController();
+        const entry = { abort: () => controller.abort(), onProgress: null, promise: null };
+
+        entry.promise = fetch(directUrl, {
+            headers: { 'Range': `bytes=0-${this.PREFETCH_BYTES - 1}` },
+            signal: controller.signal
+        })
+            .then(response => response.arrayBuffer())
+            .then(() => null)
+            .catch(() => null)
+            .finally(() => this.prefetches.delete(lectureId));
+
+        this.prefetches.set(lectureId, entry);
+    }
+
     isLoaded(lectureId) {
         return this.loadedBlobs.has(lectureId);
     }
 
     abort() {
+        if (this.currentPrefetch) {
+            // Leave the download running, only stop waiting for it
+            this.currentPrefetch.onProgress = null;
+            this.currentPrefetch = null;
+        }
+
         if (this.currentRequest) {
             this.currentRequest.abort();
             this.currentRequest = null;
@@ -122,10 +263,10 @@ export class AudioLoader {
     }
 
     clearCache() {
-        this.loadedBlobs.forEach((blob, lectureId) => {
-            URL.revokeObjectURL(URL.createObjectURL(blob));
-        });
-        this.loadedBlobs.clear();
+        this.prefetches.forEach(entry => entry.abort());
+        this.prefetches.clear();
+
+        Array.from(this.loadedBlobs.keys()).forEach(lectureId => this.releaseBlob(lectureId));
     }
 
     getCSRFToken() {
@@ -17,6 +17,8 @@ export class DownloadHandler {
     async handleDownload(button) {
         const lectureId = parseInt(button.dataset.lectureId);
         const downloadUrl = button.dataset.downloadUrl;
+        const contentHash = button.dataset.contentHash;
+        const audioCache = this.player.audioCache;
         
         if (!lectureId) {
             console.error('Missing lecture ID');
@@ -37,6 +39,9 @@ export class DownloadHandler {
                 blob = this.audioLoader.loadedBlobs.get(lectureId);
                 this.downloadBlob(blob, this.generateFileName(lectureId));
                 this.showDownloadFeedback(button, 'success');
+            } else if (audioCache && (blob = await audioCache.match(lectureId, contentHash))) {
+                this.downloadBlob(blob, this.generateFileName(lectureId));
+                this.showDownloadFeedback(button, 'success');
             } else {
                 if (downloadUrl) {
                     const response = await fetch(downloadUrl);
@@ -56,7 +61,11 @@ export class DownloadHandler {
                 }
                 
                 if (this.audioLoader) {
-                    this.audioLoader.loadedBlobs.set(lectureId, blob);
+                    this.audioLoader.store(lectureId, blob);
+                }
+                if (audioCache) {
+                    // Downloaded once, also available offline in the player
+                    audioCache.put(lectureId, contentHash, blob);
                 }
                 
                 this.downloadBlob(blob, this.generateFileName(lectureId));
@@ -14,6 +14,13 @@ export class FavoriteHandler {
         });
     }
 
+    setLecture(lectureId, isFavorite) {
+        document.querySelectorAll('.audio-player-section .favorite-btn').forEach((button) => {
+            button.dataset.lectureId = lectureId;
+            button.classList.toggle('active', isFavorite);
+        });
+    }
+
     async toggleFavorite(button) {
         const lectureId = button.dataset.lectureId;
         const isActive = button.classList.contains('active');
@@ -35,6 +35,17 @@ export class MarkersHandler {
         this.attachMarkerHandlers();
     }
 
+    setMarkers(lectureId, markers) {
+        this.lectureId = lectureId;
+        this.editingMarkerId = null;
+
+        if (!this.markersList) return;
+
+        this.markersList.replaceChildren(
+            ...markers.map(marker => this.createMarkerElement(marker, false))
+        );
+    }
+
     attachMarkerHandlers() {
         if (!this.markersList) return;
         
@@ -22,6 +22,17 @@ export class PlayerControls {
             });
         }
         
+        // Previous/next switch in place, the link stays as a fallback
+        document.querySelectorAll('[data-player-nav]').forEach((link) => {
+            link.addEventListener('click', (e) => {
+                const lectureId = parseInt(link.dataset.lectureId);
+                if (!lectureId || e.ctrlKey || e.metaKey || e.shiftKey) return;
+
+                e.preventDefault();
+                this.player.switchLecture(lectureId, { autoplay: !this.player.audio.paused });
+            });
+        });
+
         this.rewindBtn?.addEventListener('click', () => this.skip(-this.player.SKIP_SECONDS));
         this.forwardBtn?.addEventListener('click', () => this.skip(this.player.SKIP_SECONDS));
 
@@ -87,6 +98,24 @@ export class PlayerControls {
         }
     }
 
+    updateNavigation(navigation) {
+        const targets = { prev: navigation.prev_id, next: navigation.next_id };
+
+        document.querySelectorAll('[data-player-nav]').forEach((link) => {
+            const lectureId = targets[link.dataset.playerNav];
+
+            if (lectureId) {
+                link.href = `/lecture/${lectureId}/`;
+                link.dataset.lectureId = lectureId;
+                link.removeAttribute('aria-disabled');
+            } else {
+                link.removeAttribute('href');
+                delete link.dataset.lectureId;
+                link.setAttribute('aria-disabled', 'true');
+            }
+        });
+    }
+
     skip(seconds) {
         if (!this.player.audio.duration || this.playPauseBtn.disabled) return;
         this.player.audio.currentTime = Math.max(0, 
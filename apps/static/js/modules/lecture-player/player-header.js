@@ -32,6 +32,21 @@ export class PlayerHeader {
         });
     }
 
+    updateMeta(navigation) {
+        const position = document.querySelector('[data-player-position]');
+        const total = document.querySelector('[data-player-total]');
+        const remaining = document.querySelector('[data-player-remaining]');
+
+        if (position) position.textContent = navigation.position;
+        if (total) total.textContent = navigation.total;
+
+        if (remaining) {
+            const value = remaining.querySelector('[data-player-remaining-value]');
+            if (value) value.textContent = this.player.formatTime(navigation.remaining_duration);
+            remaining.hidden = !navigation.remaining_duration;
+        }
+    }
+
     checkAndStartScrolling() {
         if (!this.nowPlayingTitle || !this.nowPlayingContainer) return;
 
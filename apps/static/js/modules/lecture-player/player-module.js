@@ -2,10 +2,13 @@ import { PlayerControls } from './player-controls.js';
 import { ProgressBar } from './progress-bar.js';
 import { PlayerHeader } from './player-header.js';
 import { AudioLoader } from './audio-loader.js';
+import { AudioCache } from './audio-cache.js';
+import { SegmentLoader } from './segment-loader.js';
 import { FavoriteHandler } from './favorite-handler.js';
 import { ShareHandler } from './share-handler.js';
 import { DownloadHandler } from './download-handler.js';
 import { MarkersHandler } from './markers-handler.js';
+import { PlayerSocket } from './player-socket.js';
 // import { EqualizerVisualizer } from './equalizer-visualizer.js';
 
 export class LecturePlayer {
@@ -19,21 +22,42 @@ export class LecturePlayer {
         this.isAudioReady = false;
         this.isFullyLoaded = false;
         this.pendingPlay = false;
+        this.isSwitching = false;
+        this.isStreaming = false;
+        this.isSegmented = false;
+        this.useSegments = true;
         this.isIOS = /iPad|iPhone|iPod/.test(navigator.userAgent);
 
         this.SKIP_SECONDS = 15;
         this.PROGRESS_UPDATE_INTERVAL = 5000;
+        this.PREFETCH_LEAD_SECONDS = 120;
+        this.CACHE_AFTER_SECONDS = 60;
 
+        this.playlist = [];
+        this.prefetchRequested = false;
+        this.audioUrl = '';
+        this.contentHash = '';
+        this.cacheRequested = false;
+
+        const container = document.querySelector('.audio-player-section');
+        this.audioCache = new AudioCache({
+            budgetBytes: parseInt(container?.dataset.audioCacheBudget || '0')
+        });
         this.audioLoader = new AudioLoader();
         this.setupAudioLoader();
+        this.segmentLoader = SegmentLoader.isSupported() ? new SegmentLoader(this.audio) : null;
+        if (this.segmentLoader) {
+            this.segmentLoader.onError = (error) => this.onSegmentsFailed(error);
+        }
 
         this.controls = new PlayerControls(this);
         this.progressBar = new ProgressBar(this);
         this.header = new PlayerHeader(this);
         this.favoriteHandler = new FavoriteHandler(this);
         this.shareHandler = new ShareHandler(this);
-        this.downloadHandler = new DownloadHandler(this);
+        this.downloadHandler = new DownloadHandler(this, this.audioLoader);
         this.markersHandler = new MarkersHandler(this);
+        this.socket = new PlayerSocket();
         // this.equalizer = new EqualizerVisualizer(this);
 
         this.init();
@@ -47,6 +71,9 @@ export class LecturePlayer {
 
         this.audioLoader.onComplete = (data) => {
             this.onLoadComplete(data);
+            if (data.lectureId === this.lectureId) {
+                this.audioCache.put(data.lectureId, this.contentHash, data.blob);
+            }
         };
 
         this.audioLoader.onError = (error) => {
@@ -93,6 +120,14 @@ export class LecturePlayer {
         this.progressBar.hideLoading();
     }
 
+    updateListenersCount(count) {
+        const element = document.querySelector('[data-listeners-count]');
+        if (!element || typeof count !== 'number') return;
+
+        element.querySelector('[data-listeners-value]').textContent = count;
+        element.hidden = count === 0;
+    }
+
     init() {
         this.controls.init();
         this.progressBar.init();
@@ -103,6 +138,15 @@ export class LecturePlayer {
         this.markersHandler.init();
         // this.equalizer.init();
 
+        const container = document.querySelector('.audio-player-section');
+        if (container?.dataset.authenticated === 'true') {
+            this.socket.on('presence', (data) => this.updateListenersCount(data.listeners));
+            this.socket.onOpen(() => {
+                this.socket.send('presence_subscribe', { scope: 'lecture', id: this.lectureId });
+            });
+            this.socket.init();
+        }
+
         // Audio events
         this.audio.addEventListener('loadstart', () => this.onLoadStart());
         this.audio.addEventListener('loadedmetadata', () => this.onMetadataLoaded());
@@ -120,6 +164,197 @@ export class LecturePlayer {
             this.saveCurrentProgress();
             this.audioLoader.clearCache();
         });
+
+        this.setupHistory();
+        this.loadPlaylist();
+    }
+
+    async loadPlaylist() {
+        const container = document.querySelector('.audio-player-section');
+        const topicId = container?.dataset.topicId;
+        if (!topicId) return;
+
+        try {
+            const response = await fetch(`/api/v1/topics/${topicId}/playlist/`, {
+                headers: { 'Accept': 'application/json' }
+            });
+            if (response.ok) {
+                this.playlist = (await response.json()).lectures;
+                this.audioCache.prune(this.playlist);
+            }
+        } catch (error) {
+            console.error('Failed to load playlist:', error);
+        }
+    }
+
+    getNextEntry() {
+        const index = this.playlist.findIndex(entry => entry.id === this.lectureId);
+        return index >= 0 ? this.playlist[index + 1] || null : null;
+    }
+
+    /**
+     * Keep a streamed lecture on the device once the listener stays with it.
+     * Packaged lectures play from segments, a second whole-file download
+     * would only double their traffic
+     */
+    cacheIfListening() {
+        if (!this.isStreaming || this.isSegmented || this.cacheRequested) return;
+        if (this.audio.currentTime < this.CACHE_AFTER_SECONDS) return;
+
+        this.cacheRequested = true;
+        this.audioCache.fetchAndPut(this.lectureId, this.contentHash, this.audioUrl);
+    }
+
+    prefetchNextIfNearEnd() {
+        if (this.prefetchRequested || !this.isFullyLoaded || !this.audio.duration) return;
+        if (this.audio.duration - this.audio.currentTime > this.PREFETCH_LEAD_SECONDS) return;
+
+        this.prefetchRequested = true;
+        const next = this.getNextEntry();
+        // A packaged lecture starts from its first segment, not the file head
+        if (next && !(next.manifest_url && this.useSegments)) {
+            this.audioLoader.prefetch(next.id, next.audio_url);
+        }
+    }
+
+    setupHistory() {
+        const container = document.querySelector('.audio-player-section');
+        if (!container) return;
+
+        history.replaceState({ lectureId: parseInt(container.dataset.lectureId) }, '');
+
+        window.addEventListener('popstate', (e) => {
+            const lectureId = e.state?.lectureId;
+            if (lectureId && lectureId !== this.lectureId) {
+                this.switchLecture(lectureId, { pushHistory: false });
+            }
+        });
+    }
+
+    /**
+     * Switch to another lecture without reloading the page: fetch its
+     * player state, swap the page data and load the new audio
+     */
+    async switchLecture(lectureId, { pushHistory = true, autoplay = false } = {}) {
+        if (!lectureId || lectureId === this.lectureId || this.isSwitching) return;
+
+        const pageUrl = `/lecture/${lectureId}/`;
+        this.isSwitching = true;
+
+        try {
+            const response = await fetch(`/api/v1/lectures/${lectureId}/player-state/`, {
+                headers: { 'Accept': 'application/json' }
+            });
+            if (!response.ok) {
+                throw new Error(`HTTP ${response.status}: ${response.statusText}`);
+            }
+            const state = await response.json();
+
+            const previousLectureId = this.lectureId;
+            await this.unloadLecture();
+            this.applyState(state);
+
+            if (pushHistory) {
+                history.pushState({ lectureId: state.lecture.id }, '', pageUrl);
+            }
+
+            this.socket.send('presence_unsubscribe', { scope: 'lecture', id: previousLectureId });
+            this.socket.send('presence_subscribe', { scope: 'lecture', id: state.lecture.id });
+
+            this.pendingPlay = autoplay;
+            await this.loadLecture();
+        } catch (error) {
+            console.error('Lecture switch failed:', error);
+            window.location.href = pageUrl;
+        } finally {
+            this.isSwitching = false;
+        }
+    }
+
+    async unloadLecture() {
+        // The pause handler saves the progress of the lecture being left
+        if (!this.audio.paused) {
+            await new Promise((resolve) => {
+                this.audio.addEventListener('pause', resolve, { once: true });
+                this.audio.pause();
+            });
+        } else {
+            await this.saveCurrentProgress();
+        }
+
+        this.stopProgressUpdates();
+        this.audioLoader.abort();
+        this.segmentLoader?.detach();
+        this.audio.removeAttribute('src');
+        this.audio.load();
+
+        this.isLoading = false;
+        this.isStreaming = false;
+        this.isSegmented = false;
+        this.isAudioReady = false;
+        this.isFullyLoaded = false;
+        this.pendingPlay = false;
+        this.targetSeekTime = null;
+        this.controls.setLoadingState();
+    }
+
+    applyState(state) {
+        const container = document.querySelector('.audio-player-section');
+        const { lecture, navigation, progress } = state;
+
+        container.dataset.lectureId = lecture.id;
+        container.dataset.lectureTitle = lecture.title;
+        container.dataset.audioUrl = lecture.audio_url;
+        container.dataset.contentHash = lecture.content_hash;
+        container.dataset.manifestUrl = lecture.manifest_url || '';
+        container.dataset.waveformUrl = lecture.waveform_url || '';
+        container.dataset.duration = lecture.duration;
+        delete container.dataset.targetStartTime;
+
+        if (progress) {
+            container.dataset.currentTime = Number(progress.current_time).toFixed(2);
+            container.dataset.completed = progress.completed ? 'true' : 'false';
+            container.dataset.progress = Number(progress.progress_percentage).toFixed(1);
+        } else {
+            delete container.dataset.currentTime;
+            delete container.dataset.completed;
+            delete container.dataset.progress;
+        }
+
+        document.title = lecture.title;
+        this.header.updateNowPlaying(lecture.title);
+        this.header.updateMeta(navigation);
+        this.controls.updateNavigation(navigation);
+        this.progressBar.reset();
+        this.markersHandler.setMarkers(lecture.id, state.markers);
+        this.favoriteHandler.setLecture(lecture.id, state.is_favorite);
+        this.updateListenersCount(state.listeners_count);
+        this.updateActions(lecture, progress, container.dataset.authenticated === 'true');
+    }
+
+    updateActions(lecture, progress, isAuthenticated) {
+        document.querySelectorAll('.download-btn').forEach((button) => {
+            button.dataset.lectureId = lecture.id;
+            button.dataset.downloadUrl = lecture.audio_url;
+            button.dataset.contentHash = lecture.content_hash;
+        });
+        document.querySelectorAll('.share-btn').forEach((button) => {
+            button.dataset.lectureId = lecture.id;
+        });
+
+        const fileInfo = document.querySelector('[data-player-file-info]');
+        if (!fileInfo) return;
+
+        let html = `<i class="fas fa-file-audio"></i><span>${lecture.file_size_mb} MB</span>`;
+        if (isAuthenticated && progress) {
+            html += `
+                <i class="fas fa-chart-line" style="margin-left: 0.25rem;"></i>
+                <span>${Math.round(progress.progress_percentage || 0)}%</span>
+                <i class="fas fa-repeat" style="margin-left: 0.25rem;"></i>
+                <span>${progress.listen_count || 0}x</span>
+            `;
+        }
+        fileInfo.innerHTML = html;
     }
 
     onLoadStart() {
@@ -148,7 +383,11 @@ export class LecturePlayer {
     }
 
     onCanPlay() {
-        console.log("Audio can start playing");
+        // The first range has arrived, streaming playback can start
+        if (this.isStreaming && !this.isAudioReady) {
+            this.isLoading = false;
+            this.onLoadComplete({ url: this.audio.currentSrc });
+        }
     }
 
     onCanPlayThrough() {
@@ -191,7 +430,12 @@ export class LecturePlayer {
         if (!container) return;
         
         this.lectureId = parseInt(container.dataset.lectureId);
+        this.prefetchRequested = false;
+        this.cacheRequested = false;
+        this.contentHash = container.dataset.contentHash || '';
         const audioUrl = container.dataset.audioUrl;
+        const manifestUrl = container.dataset.manifestUrl;
+        this.audioUrl = audioUrl;
         const duration = parseFloat(container.dataset.duration || '0');
         
         // Set target time from saved progress or URL parameter
@@ -202,12 +446,43 @@ export class LecturePlayer {
         if (duration > 0) {
             this.progressBar.updateTotalTime(duration);
         }
+        this.progressBar.loadWaveform(container.dataset.waveformUrl);
 
         if (!audioUrl) {
             this.onLoadError(new Error('No audio URL found'));
             return;
         }
         
+        // A copy kept on the device plays without the network
+        if (!this.audioLoader.isLoaded(this.lectureId)) {
+            const lectureId = this.lectureId;
+            const cached = await this.audioCache.match(lectureId, this.contentHash);
+            if (lectureId !== this.lectureId) return;
+            if (cached) {
+                this.audioLoader.store(lectureId, cached);
+            }
+        }
+
+        // Packaged lectures load only the segments around the playhead
+        if (manifestUrl && this.useSegments && !this.audioLoader.isLoaded(this.lectureId)) {
+            if (this.segmentLoader) {
+                this.startSegments(manifestUrl);
+                return;
+            }
+            if (this.audio.canPlayType('application/vnd.apple.mpegurl')) {
+                // Native HLS (Safari, iOS)
+                this.isSegmented = true;
+                this.startStreaming(manifestUrl);
+                return;
+            }
+        }
+
+        // Stream unless a blob is already held for this lecture
+        if (this.audioLoader.streaming && !this.audioLoader.isLoaded(this.lectureId)) {
+            this.startStreaming(audioUrl);
+            return;
+        }
+
         try {
             if (this.audioLoader.isLoaded(this.lectureId)) {
                 this.isFullyLoaded = true;
@@ -218,6 +493,9 @@ export class LecturePlayer {
                 if (this.isIOS) {
                     this.audio.load();
                 }
+
+                // Blob was kept from an earlier switch, no download to wait for
+                this.onLoadComplete({ url: objectURL });
             } else {
                 this.isLoading = true;
                 
@@ -229,10 +507,45 @@ export class LecturePlayer {
                 }
             }
         } catch (error) {
+            if (error.name === 'AbortError') return;
             this.onLoadError(error);
         }
     }
 
+    startStreaming(audioUrl) {
+        this.isStreaming = true;
+        this.isLoading = true;
+        this.audio.preload = 'auto';
+        // A media fragment makes the first range request start at the
+        // shared or saved time instead of buffering from the beginning
+        this.audio.src = this.targetSeekTime > 0
+            ? `${audioUrl}#t=${this.targetSeekTime.toFixed(2)}`
+            : audioUrl;
+        this.audio.load();
+    }
+
+    startSegments(manifestUrl) {
+        this.isStreaming = true;
+        this.isSegmented = true;
+        this.isLoading = true;
+        this.segmentLoader.attach(manifestUrl, this.targetSeekTime || 0)
+            .catch((error) => this.onSegmentsFailed(error));
+    }
+
+    /**
+     * Segments could not be played, stream the whole file from now on
+     */
+    onSegmentsFailed(error) {
+        console.error('Segmented playback failed:', error);
+        this.useSegments = false;
+        this.isSegmented = false;
+        this.segmentLoader?.detach();
+        this.isStreaming = false;
+        this.isAudioReady = false;
+        this.isFullyLoaded = false;
+        this.loadLecture();
+    }
+
     requestPlay() {
         if (this.isAudioReady && this.isFullyLoaded) {
             this.startPlayback();
@@ -250,6 +563,8 @@ export class LecturePlayer {
 
     onTimeUpdate() {
         this.progressBar.updateProgress();
+        this.prefetchNextIfNearEnd();
+        this.cacheIfListening();
     }
 
     onSeeked() {
@@ -272,6 +587,12 @@ export class LecturePlayer {
 
     async onEnded() {
         await this.saveCurrentProgress(true);
+
+        // Continue with the next lecture, usually already prefetched
+        const next = this.getNextEntry();
+        if (next) {
+            this.switchLecture(next.id, { autoplay: true });
+        }
     }
 
     onError(e) {
@@ -280,6 +601,21 @@ export class LecturePlayer {
         }
         
         console.error('Audio error:', e);
+
+        if (this.isSegmented) {
+            this.onSegmentsFailed(e);
+            return;
+        }
+
+        if (this.isStreaming) {
+            // The element could not stream the file, download it whole instead
+            this.isStreaming = false;
+            this.audioLoader.fallbackToBlob();
+            this.isAudioReady = false;
+            this.isFullyLoaded = false;
+            this.loadLecture();
+            return;
+        }
         
         this.audioLoader.abort();
         
@@ -331,6 +667,12 @@ export class LecturePlayer {
 
         console.log(`Saving progress: ${currentTime}s of ${duration}s (completed: ${completed})`);
 
+        // Persistent socket first, the server coalesces and saves periodically
+        if (this.socket.sendProgress(this.lectureId, currentTime, completed)) {
+            this.lastSavedTime = currentTime;
+            return;
+        }
+
         try {
             const response = await fetch(`/api/v1/lectures/${this.lectureId}/progress/`, {
                 method: 'POST',
@@ -0,0 +1,122 @@
+export class PlayerSocket {
+    constructor() {
+        this.socket = null;
+        this.enabled = true;
+        this.reconnectTimeout = null;
+        this.reconnectDelay = 1000;
+        this.MAX_RECONNECT_DELAY = 30000;
+        this.openCallbacks = [];
+        this.eventCallbacks = new Map();
+    }
+
+    onOpen(callback) {
+        // Also runs after every reconnect, e.g. to restore subscriptions
+        this.openCallbacks.push(callback);
+        if (this.isConnected()) callback();
+    }
+
+    on(type, callback) {
+        if (!this.eventCallbacks.has(type)) {
+            this.eventCallbacks.set(type, []);
+        }
+        this.eventCallbacks.get(type).push(callback);
+    }
+
+    init() {
+        window.addEventListener('beforeunload', () => this.close());
+        this.connect();
+    }
+
+    connect() {
+        if (!this.enabled || !('WebSocket' in window)) return;
+
+        const protocol = window.location.protocol === 'https:' ? 'wss' : 'ws';
+
+        try {
+            this.socket = new WebSocket(`${protocol}://${window.location.host}/ws/`);
+        } catch (error) {
+            console.error('WebSocket connection failed:', error);
+            this.scheduleReconnect();
+            return;
+        }
+
+        this.socket.addEventListener('open', () => {
+            this.reconnectDelay = 1000;
+            this.openCallbacks.forEach((callback) => callback());
+        });
+
+        this.socket.addEventListener('message', (e) => this.onMessage(e));
+
+        this.socket.addEventListener('close', () => {
+            this.socket = null;
+            this.scheduleReconnect();
+        });
+    }
+
+    onMessage(e) {
+        let message;
+        try {
+            message = JSON.parse(e.data);
+        } catch (error) {
+            return;
+        }
+
+        if (message.type === 'error' && message.error?.code === 'UNAUTHORIZED') {
+            // Session is not valid for the socket, stay on REST
+            this.enabled = false;
+            this.close();
+            return;
+        }
+
+        (this.eventCallbacks.get(message.type) || []).forEach((callback) => {
+            callback(message.data || {});
+        });
+    }
+
+    scheduleReconnect() {
+        if (!this.enabled || this.reconnectTimeout) return;
+
+        this.reconnectTimeout = setTimeout(() => {
+            this.reconnectTimeout = null;
+            this.connect();
+        }, this.reconnectDelay);
+
+        this.reconnectDelay = Math.min(this.reconnectDelay * 2, this.MAX_RECONNECT_DELAY);
+    }
+
+    isConnected() {
+        return this.enabled && this.socket !== null && this.socket.readyState === WebSocket.OPEN;
+    }
+
+    send(type, data) {
+        if (!this.isConnected()) return false;
+
+        try {
+            this.socket.send(JSON.stringify({ type, data }));
+            return true;
+        } catch (error) {
+            console.error('WebSocket send failed:', error);
+            return false;
+        }
+    }
+
+    sendProgress(lectureId, currentTime, completed = false) {
+        return this.send('progress', {
+            lecture_id: lectureId,
+            current_time: currentTime,
+            completed: completed
+        });
+    }
+
+    close() {
+        this.enabled = false;
+        if (this.reconnectTimeout) {
+            clearTimeout(this.reconnectTimeout);
+            this.reconnectTimeout = null;
+        }
+        if (this.socket) {
+            this.socket.close();
+            this.socket = null;
+        }
+    }
+}
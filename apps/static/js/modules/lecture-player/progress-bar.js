@@ -12,6 +12,10 @@ export class ProgressBar {
         this.currentBufferPercent = 0;
         this.savedProgressPercent = 0;
         this.isInitialProgressAnimationRunning = false;
+        this.waveformCanvas = null;
+        this.waveformUrl = '';
+        this.peaks = null;
+        this.waveformController = null;
         
         this.createBufferIndicator();
         this.createLoadingIndicator();
@@ -37,6 +41,10 @@ export class ProgressBar {
     init() {
         if (this.progressBar) {
             this.progressBar.addEventListener('click', (e) => this.seek(e));
+
+            if ('ResizeObserver' in window) {
+                new ResizeObserver(() => this.drawWaveform()).observe(this.progressBar);
+            }
         }
         
         this.player.audio.addEventListener('progress', () => this.updateBuffer());
@@ -70,6 +78,117 @@ export class ProgressBar {
         }
     }
 
+    reset() {
+        this.isSeeking = false;
+        this.isLoadingComplete = false;
+        this.currentBufferPercent = 0;
+
+        if (this.bufferIndicator) {
+            this.bufferIndicator.style.width = '0%';
+        }
+
+        if (this.timeTotal) {
+            this.timeTotal.textContent = '--:--';
+        }
+
+        this.initializeFromTemplate();
+    }
+
+    /**
+     * Fetch the lecture's peaks (one byte per bucket, see the waveform
+     * endpoint) and draw them on the bar. The URL is versioned by the audio
+     * content, so after the first visit it comes from the browser cache.
+     */
+    async loadWaveform(url) {
+        if (!this.progressBar || url === this.waveformUrl) return;
+
+        this.clearWaveform();
+        this.waveformUrl = url || '';
+        if (!url) return;
+
+        const controller = new AbortController();
+        this.waveformController = controller;
+
+        try {
+            const response = await fetch(url, { signal: controller.signal });
+            if (!response.ok) return;
+
+            const peaks = new Uint8Array(await response.arrayBuffer());
+            if (controller.signal.aborted || !peaks.length) return;
+
+            this.peaks = peaks;
+            this.progressBar.classList.add('has-waveform');
+            this.drawWaveform();
+        } catch (error) {
+            // The plain bar stays, the waveform is decoration
+            if (error.name !== 'AbortError') {
+                console.warn('Waveform unavailable:', error);
+            }
+        } finally {
+            if (this.waveformController === controller) {
+                this.waveformController = null;
+            }
+        }
+    }
+
+    clearWaveform() {
+        if (this.waveformController) {
+            this.waveformController.abort();
+            this.waveformController = null;
+        }
+        this.peaks = null;
+        this.waveformUrl = '';
+
+        if (this.waveformCanvas) {
+            this.waveformCanvas.remove();
+            this.waveformCanvas = null;
+        }
+        if (this.progressBar) {
+            this.progressBar.classList.remove('has-waveform');
+        }
+    }
+
+    drawWaveform() {
+        if (!this.peaks) return;
+
+        if (!this.waveformCanvas) {
+            this.waveformCanvas = document.createElement('canvas');
+            this.waveformCanvas.className = 'progress-waveform';
+            this.progressBar.appendChild(this.waveformCanvas);
+        }
+
+        const canvas = this.waveformCanvas;
+        const ratio = window.devicePixelRatio || 1;
+        const width = Math.round(canvas.clientWidth * ratio);
+        const height = Math.round(canvas.clientHeight * ratio);
+        if (!width || !height) return;
+
+        canvas.width = width;
+        canvas.height = height;
+
+        const context = canvas.getContext('2d');
+        context.fillStyle = getComputedStyle(canvas).color;
+
+        // One bar per 3 CSS pixels, each the loudest bucket it covers
+        const barWidth = 2 * ratio;
+        const step = 3 * ratio;
+        const bars = Math.max(1, Math.floor(width / step));
+        const peaks = this.peaks;
+
+        for (let bar = 0; bar < bars; bar++) {
+            const first = Math.floor(bar * peaks.length / bars);
+            const last = Math.max(first + 1, Math.floor((bar + 1) * peaks.length / bars));
+
+            let level = 0;
+            for (let index = first; index < last; index++) {
+                level = Math.max(level, peaks[index]);
+            }
+
+            const barHeight = Math.max(ratio, (level / 255) * height);
+            context.fillRect(bar * step, (height - barHeight) / 2, barWidth, barHeight);
+        }
+    }
+
     hideLoading() {
         if (this.loadingIndicator) {
             this.loadingIndicator.style.display = 'none';
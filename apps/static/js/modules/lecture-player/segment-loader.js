@@ -0,0 +1,225 @@
+/**
+ * Plays a packaged lecture, an HLS-style playlist of MP3 segments, through
+ * Media Source Extensions.
+ *
+ * Only the segments around the playhead are fetched: up to AHEAD_SECONDS in
+ * front of it, and segments further than BEHIND_SECONDS behind or twice the
+ * lookahead in front are removed again, so memory stays bounded however long
+ * the lecture is. Each segment is placed at its playlist time, which makes a
+ * seek fetch the one segment it lands in.
+ */
+export class SegmentLoader {
+    constructor(audio) {
+        this.audio = audio;
+        this.AHEAD_SECONDS = 30;
+        this.BEHIND_SECONDS = 60;
+
+        this.segments = [];
+        this.appended = new Set();
+        this.mediaSource = null;
+        this.sourceBuffer = null;
+        this.objectURL = null;
+        this.controller = null;
+        this.pendingIndex = null;
+        this.startTime = 0;
+        this.started = false;
+        this.onError = null;
+
+        this.handleUpdate = () => this.onUpdateEnd();
+        this.handleTime = () => this.fill();
+        this.handleSeeking = () => this.onSeeking();
+    }
+
+    static isSupported() {
+        return 'MediaSource' in window && MediaSource.isTypeSupported('audio/mpeg');
+    }
+
+    get active() {
+        return this.mediaSource !== null;
+    }
+
+    async attach(manifestUrl, startTime = 0) {
+        this.detach();
+
+        const response = await fetch(manifestUrl);
+        if (!response.ok) {
+            throw new Error(`HTTP ${response.status}: ${response.statusText}`);
+        }
+        const segments = this.parseManifest(await response.text(), response.url);
+        if (!segments.length) {
+            throw new Error('Empty segment playlist');
+        }
+
+        this.segments = segments;
+        this.startTime = startTime;
+        this.mediaSource = new MediaSource();
+        this.objectURL = URL.createObjectURL(this.mediaSource);
+
+        await new Promise((resolve) => {
+            this.mediaSource.addEventListener('sourceopen', resolve, { once: true });
+            this.audio.src = this.objectURL;
+        });
+
+        this.sourceBuffer = this.mediaSource.addSourceBuffer('audio/mpeg');
+        // MP3 carries no timestamps, each segment is placed by timestampOffset
+        this.sourceBuffer.mode = 'sequence';
+        this.sourceBuffer.addEventListener('updateend', this.handleUpdate);
+
+        const last = segments[segments.length - 1];
+        this.mediaSource.duration = last.start + last.duration;
+
+        this.audio.addEventListener('timeupdate', this.handleTime);
+        this.audio.addEventListener('seeking', this.handleSeeking);
+        this.fill();
+    }
+
+    detach() {
+        if (this.controller) {
+            this.controller.abort();
+        }
+        if (this.sourceBuffer) {
+            this.sourceBuffer.removeEventListener('updateend', this.handleUpdate);
+        }
+        this.audio.removeEventListener('timeupdate', this.handleTime);
+        this.audio.removeEventListener('seeking', this.handleSeeking);
+        if (this.objectURL) {
+            URL.revokeObjectURL(this.objectURL);
+        }
+
+        this.segments = [];
+        this.appended.clear();
+        this.mediaSource = null;
+        this.sourceBuffer = null;
+        this.objectURL = null;
+        this.controller = null;
+        this.pendingIndex = null;
+        this.started = false;
+    }
+
+    parseManifest(text, baseUrl) {
+        const segments = [];
+        let duration = null;
+        let start = 0;
+
+        text.split('\n').forEach((line) => {
+            line = line.trim();
+            if (line.startsWith('#EXTINF:')) {
+                duration = parseFloat(line.slice('#EXTINF:'.length));
+            } else if (line && !line.startsWith('#') && duration !== null) {
+                segments.push({ url: new URL(line, baseUrl).href, start, duration });
+                start += duration;
+                duration = null;
+            }
+        });
+        return segments;
+    }
+
+    indexAt(time) {
+        const index = this.segments.findIndex(segment => time < segment.start + segment.duration);
+        return index >= 0 ? index : this.segments.length - 1;
+    }
+
+    playhead() {
+        return this.started ? this.audio.currentTime : this.startTime;
+    }
+
+    /**
+     * Append the next missing segment near the playhead, or remove one
+     * that is out of range. Runs again after every buffer update.
+     */
+    fill() {
+        if (!this.sourceBuffer || this.sourceBuffer.updating || this.pendingIndex !== null) return;
+
+        const time = this.playhead();
+        if (this.evict(time)) return;
+
+        for (let index = this.indexAt(time); index < this.segments.length; index++) {
+            if (this.segments[index].start > time + this.AHEAD_SECONDS) break;
+            if (!this.appended.has(index)) {
+                this.load(index);
+                return;
+            }
+        }
+    }
+
+    evict(time) {
+        for (const index of this.appended) {
+            const segment = this.segments[index];
+            const end = segment.start + segment.duration;
+            if (end < time - this.BEHIND_SECONDS || segment.start > time + 2 * this.AHEAD_SECONDS) {
+                this.appended.delete(index);
+                this.sourceBuffer.remove(segment.start, end);
+                return true;
+            }
+        }
+        return false;
+    }
+
+    async load(index) {
+        const segment = this.segments[index];
+        const controller = new AbortController();
+        this.pendingIndex = index;
+        this.controller = controller;
+
+        try {
+            const response = await fetch(segment.url, { signal: controller.signal });
+            if (!response.ok) {
+                throw new Error(`HTTP ${response.status}: ${response.statusText}`);
+            }
+            const data = await response.arrayBuffer();
+            if (controller.signal.aborted || !this.sourceBuffer) return;
+
+            // Also reopens the source if endOfStream() was called
+            this.sourceBuffer.timestampOffset = segment.start;
+            this.sourceBuffer.appendBuffer(data);
+            this.appended.add(index);
+        } catch (error) {
+            if (error.name === 'AbortError') return;
+            this.fail(error);
+        } finally {
+            if (this.controller === controller) {
+                this.controller = null;
+                this.pendingIndex = null;
+            }
+        }
+    }
+
+    onUpdateEnd() {
+        if (!this.sourceBuffer) return;
+
+        if (!this.started) {
+            this.started = true;
+            if (this.startTime > 0) {
+                // Data is buffered at the start time, the element can play there
+                this.audio.currentTime = this.startTime;
+            }
+        }
+
+        // Let the element reach "ended" once the last segment is buffered
+        const last = this.segments.length - 1;
+        if (this.appended.has(last) && this.mediaSource.readyState === 'open') {
+            this.mediaSource.endOfStream();
+        }
+
+        this.fill();
+    }
+
+    onSeeking() {
+        // A fetch for a segment far from the new position is not needed now
+        if (this.pendingIndex !== null) {
+            const segment = this.segments[this.pendingIndex];
+            const time = this.audio.currentTime;
+            if (segment.start > time + this.AHEAD_SECONDS || segment.start + segment.duration < time) {
+                this.controller.abort();
+                this.controller = null;
+                this.pendingIndex = null;
+            }
+        }
+        this.fill();
+    }
+
+    fail(error) {
+        console.error('Segment loading failed:', error);
+        if (this.onError) this.onError(error);
+    }
+}
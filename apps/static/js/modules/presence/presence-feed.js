@@ -0,0 +1,111 @@
+import { PlayerSocket } from '../lecture-player/player-socket.js';
+
+export class PresenceFeed {
+    constructor() {
+        this.containers = document.querySelectorAll('[data-presence-feed]');
+        this.socket = new PlayerSocket();
+        this.currentUserId = parseInt(this.containers[0]?.dataset.currentUser || '0');
+    }
+
+    init() {
+        if (!this.containers.length || !this.currentUserId) return;
+
+        this.socket.on('presence', (data) => this.applyChanges(data.changes || []));
+        this.socket.onOpen(() => {
+            this.socket.send('presence_subscribe', { scope: 'global' });
+        });
+        this.socket.init();
+    }
+
+    applyChanges(changes) {
+        changes.forEach((change) => {
+            if (change.user_id === this.currentUserId) return;
+
+            this.containers.forEach((container) => {
+                const existing = container.querySelector(`[data-user-id="${change.user_id}"]`);
+
+                if (change.event === 'left') {
+                    existing?.remove();
+                } else if (change.lecture) {
+                    const card = this.renderCard(change, container.dataset.presenceFeed);
+                    if (existing) {
+                        existing.replaceWith(card);
+                    } else {
+                        container.querySelector('.empty-state')?.remove();
+                        container.prepend(card);
+                    }
+                }
+
+                this.updateCounter(container);
+            });
+        });
+    }
+
+    updateCounter(container) {
+        const counter = document.querySelector('[data-presence-count]');
+        if (counter && container.dataset.presenceFeed === 'list') {
+            const count = container.querySelectorAll('[data-user-id]').length;
+            counter.textContent = `${count} активных`;
+        }
+    }
+
+    renderCard(change, variant) {
+        const lecture = change.lecture;
+        const card = document.createElement('a');
+        card.href = `/lecture/${change.lecture_id}/`;
+        card.dataset.userId = change.user_id;
+
+        const photo = lecture.lecturer_photo
+            ? `<img src="${this.escape(lecture.lecturer_photo)}" alt="${this.escape(lecture.lecturer_name)}">`
+            : '<i class="fas fa-user"></i>';
+        const email = this.truncate(change.email, variant === 'list' ? 25 : 20);
+
+        if (variant === 'list') {
+            card.className = 'card-item';
+            card.innerHTML = `
+                <div class="card-icon">${photo}</div>
+                <div class="card-content">
+                    <h3 class="card-title">${this.escape(lecture.title)}</h3>
+                    <div class="card-meta">
+                        <div class="listening-user">
+                            <i class="fas fa-user-circle"></i>
+                            ${this.escape(email)}
+                        </div>
+                        <div class="lecture-info">
+                            ${this.escape(lecture.lecturer_name)} • ${this.escape(lecture.topic_title)}
+                        </div>
+                        <div class="live-status">
+                            <span class="live-indicator">
+                                <i class="fas fa-circle"></i>
+                                Слушает сейчас
+                            </span>
+                        </div>
+                    </div>
+                </div>`;
+        } else {
+            card.className = 'compact-card-item';
+            card.innerHTML = `
+                <div class="compact-card-icon">${photo}</div>
+                <div class="compact-card-content">
+                    <h4 class="compact-card-title">${this.escape(lecture.title)}</h4>
+                    <div class="compact-card-meta">
+                        ${this.escape(email)} • ${this.escape(lecture.lecturer_name)}
+                    </div>
+                </div>`;
+        }
+
+        return card;
+    }
+
+    truncate(text, length) {
+        text = text || '';
+        return text.length > length ? `${text.slice(0, length - 1)}…` : text;
+    }
+
+    escape(text) {
+        // Also used inside attribute values, so quotes are escaped too
+        const div = document.createElement('div');
+        div.textContent = text || '';
+        return div.innerHTML.replace(/"/g, '&quot;').replace(/'/g, '&#39;');
+    }
+}
@@ -1,4 +1,5 @@
 from django.contrib import admin
+from django.db.models import Count, OuterRef, Subquery
 from django.utils.html import format_html
 from django.urls import reverse
 from django.utils.safestring import mark_safe
@@ -78,13 +79,12 @@ class UserActivityAdmin(admin.ModelAdmin):
     session_hash_short.admin_order_field = "session_hash"
 
     def visit_count_display(self, obj):
-        count = obj.visit_count
-        return format_html("<strong>{}</strong> visits", count)
+        return format_html("<strong>{}</strong> visits", obj.visit_total)
 
     visit_count_display.short_description = "Visits"
 
     def last_url_display(self, obj):
-        url = obj.last_url
+        url = obj.last_log_url
         if not url:
             return "-"
         if len(url) > 50:
@@ -94,7 +94,7 @@ class UserActivityAdmin(admin.ModelAdmin):
     last_url_display.short_description = "Last URL"
 
     def last_visit_display(self, obj):
-        return obj.last_visit
+        return obj.last_log_at or obj.updated_at
 
     last_visit_display.short_description = "Last Visit"
     last_visit_display.admin_order_field = "updated_at"
@@ -112,6 +112,22 @@ class UserActivityAdmin(admin.ModelAdmin):
     def has_add_permission(self, request):
         return False
 
+    def get_queryset(self, request):
+        # Visit stats of every row in the same query instead of three per row
+        last_log = ActivityLog.objects.filter(activity=OuterRef("pk")).order_by(
+            "-timestamp"
+        )
+        return (
+            super()
+            .get_queryset(request)
+            .select_related("user")
+            .annotate(
+                visit_total=Count("logs"),
+                last_log_url=Subquery(last_log.values("url")[:1]),
+                last_log_at=Subquery(last_log.values("timestamp")[:1]),
+            )
+        )
+
 
 @admin.register(ActivityLog)
 class ActivityLogAdmin(admin.ModelAdmin):
@@ -230,3 +246,6 @@ class ActivityLogAdmin(admin.ModelAdmin):
 
     def has_delete_permission(self, request, obj=None):
         return request.user.is_superuser
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related("activity__user")
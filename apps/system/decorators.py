@@ -5,7 +5,14 @@ from apps.system.services import Logger
 logger = Logger(app_name="activity_decorator")
 
 
-def track_activity(view_func):
+def track_activity(view_func=None, *, view_name=None):
+    """Log every request of the view, ``view_name`` defaults to the view's own
+    name and lets an endpoint count as another view"""
+    if view_func is None:
+        return lambda func: track_activity(func, view_name=view_name)
+
+    logged_name = view_name or view_func.__name__
+
     @wraps(view_func)
     def wrapper(request, *args, **kwargs):
         try:
@@ -14,13 +21,13 @@ def track_activity(view_func):
             ActivityLog.create_log(
                 activity=activity,
                 request=request,
-                view_name=view_func.__name__,
+                view_name=logged_name,
                 url_kwargs=kwargs,
             )
 
             logger.debug(
                 f"Activity tracked: {activity.session_hash[:8]}...",
-                f"View: {view_func.__name__}",
+                f"View: {logged_name}",
                 f"URL: {request.path}",
                 f"User: {activity.user.email if activity.user else 'Anonymous'}",
             )
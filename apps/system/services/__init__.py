@@ -1,4 +1,23 @@
 # -*- coding: utf-8 -*-
+from .file_offload.service import FileOffload
+from .file_stream.service import FileRange, FileStream
+from .keyset_paginator.service import InvalidCursor, KeysetPage, KeysetPaginator
 from .logger.service import Logger
+from .redis_client.service import RedisClient
+from .stale_cache.service import StaleCache
+from .zip_stream.service import ZipEntry, ZipStream, ZipStreamError
 
-__all__ = ["Logger"]
+__all__ = [
+    "FileOffload",
+    "FileRange",
+    "FileStream",
+    "InvalidCursor",
+    "KeysetPage",
+    "KeysetPaginator",
+    "Logger",
+    "RedisClient",
+    "StaleCache",
+    "ZipEntry",
+    "ZipStream",
+    "ZipStreamError",
+]
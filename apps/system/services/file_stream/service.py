@@ -0,0 +1,148 @@
+import os
+import re
+
+from django.http import FileResponse, HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import (
+    content_disposition_header,
+    http_date,
+    parse_http_date_safe,
+    quote_etag,
+)
+
+RANGE_RE = re.compile(r"^\s*bytes\s*=\s*(\d*)\s*-\s*(\d*)\s*$", re.IGNORECASE)
+
+
+def requested_range(request, size, etag, last_modified=None):
+    """``(start, end)`` of the ``Range`` of a request for ``size`` bytes,
+    ``None`` for the whole content or ``False`` when it cannot be satisfied"""
+    header = request.META.get("HTTP_RANGE")
+    if not header or not if_range_passes(request, etag, last_modified):
+        return None
+
+    match = RANGE_RE.match(header)
+    if not match:
+        # Multiple or malformed ranges, send the whole content
+        return None
+
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        if last and int(last) < start:
+            return None
+        if start >= size:
+            return False
+        end = min(int(last), size - 1) if last else size - 1
+    elif last:
+        suffix = int(last)
+        if suffix == 0:
+            return False
+        start, end = max(size - suffix, 0), size - 1
+    else:
+        return None
+
+    return start, end
+
+
+def if_range_passes(request, etag, last_modified=None):
+    """A stale ``If-Range`` turns a range request into a full one"""
+    if_range = request.META.get("HTTP_IF_RANGE")
+    if not if_range:
+        return True
+    if if_range.startswith('"'):
+        return if_range == etag
+    return last_modified is not None and parse_http_date_safe(if_range) == last_modified
+
+
+class FileRange:
+    """Read-only view of ``length`` bytes of an open file from ``start``.
+
+    Keeps ``fileno()`` so a WSGI server can hand the range to
+    ``os.sendfile``: gunicorn sends from the current offset up to the
+    ``Content-Length`` of the response. Servers without sendfile read it in
+    blocks, which never go past the end of the range.
+    """
+
+    def __init__(self, file, start, length):
+        self.file = file
+        self.file.seek(start)
+        self.remaining = length
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b""
+        if size is None or size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def close(self):
+        self.file.close()
+
+
+class FileStream:
+    """Serve a local file with byte ranges and conditional requests.
+
+    Handles ``Range`` (a single range, ``206``/``416``), ``If-Range``,
+    ``If-None-Match``/``If-Modified-Since`` (``304``) and
+    ``If-Match``/``If-Unmodified-Since`` (``412``). The ETag is built from
+    the file size and modification time unless one is given.
+    """
+
+    def __init__(self, path, content_type, etag=None, max_age=0):
+        self.path = path
+        self.content_type = content_type
+        self.max_age = max_age
+
+        stat = os.stat(path)
+        self.size = stat.st_size
+        self.last_modified = int(stat.st_mtime)
+        self.etag = quote_etag(etag or f"{self.size:x}-{stat.st_mtime_ns:x}")
+
+    def response(self, request, filename=None, as_attachment=False):
+        conditional = get_conditional_response(
+            request, etag=self.etag, last_modified=self.last_modified
+        )
+        if conditional is not None:
+            return self._add_validators(conditional)
+
+        byte_range = requested_range(
+            request, self.size, self.etag, last_modified=self.last_modified
+        )
+        if byte_range is False:
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{self.size}"
+            return self._add_validators(response)
+
+        start, end = byte_range or (0, self.size - 1)
+        length = max(end - start + 1, 0)
+
+        if request.method == "HEAD":
+            response = HttpResponse(content_type=self.content_type)
+        else:
+            response = FileResponse(
+                FileRange(open(self.path, "rb"), start, length),
+                content_type=self.content_type,
+            )
+
+        if byte_range:
+            response.status_code = 206
+            response["Content-Range"] = f"bytes {start}-{end}/{self.size}"
+        response["Content-Length"] = length
+
+        disposition = content_disposition_header(as_attachment, filename)
+        if disposition:
+            response["Content-Disposition"] = disposition
+
+        return self._add_validators(response)
+
+    def _add_validators(self, response):
+        response["Accept-Ranges"] = "bytes"
+        response["ETag"] = self.etag
+        response["Last-Modified"] = http_date(self.last_modified)
+        patch_cache_control(response, public=True, max_age=self.max_age)
+        return response
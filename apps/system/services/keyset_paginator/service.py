@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, List, Optional, Sequence
+
+from django.core import signing
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+
+class InvalidCursor(ValueError):
+    """Raised when a cursor is malformed or was not issued for this ordering"""
+
+
+@dataclass(slots=True)
+class KeysetPage:
+    items: List[Any]
+    next_cursor: Optional[str]
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+
+class KeysetPaginator:
+    """Seek pagination over an ordered queryset.
+
+    Instead of ``OFFSET`` the next page continues after the sort key of the
+    last row: ``WHERE (key, id) < (last_key, last_id)``, expanded into plain
+    comparisons so every backend can use the index. Each page costs the
+    same no matter how deep it is.
+
+    ``ordering`` is a sequence of field paths as for ``order_by``. The last
+    one must be unique (usually ``id``) so rows with equal sort keys are
+    neither skipped nor repeated. Cursors are signed, opaque strings.
+    """
+
+    SALT = "keyset-paginator"
+
+    def __init__(self, queryset, ordering: Sequence[str], page_size: int):
+        self.queryset = queryset
+        self.ordering = list(ordering)
+        self.page_size = page_size
+        self.fields = [field.lstrip("-") for field in self.ordering]
+
+    def get_page(self, cursor: Optional[str] = None) -> KeysetPage:
+        """Return the page that starts after ``cursor`` (the first if None)"""
+        queryset = self.queryset.order_by(*self.ordering)
+        if cursor:
+            queryset = queryset.filter(self._after(self.decode_cursor(cursor)))
+
+        items = list(queryset[: self.page_size + 1])
+        next_cursor = None
+        if len(items) > self.page_size:
+            items = items[: self.page_size]
+            next_cursor = self.encode_cursor(items[-1])
+
+        return KeysetPage(items=items, next_cursor=next_cursor)
+
+    def encode_cursor(self, item) -> str:
+        values = [
+            self._encode_value(self._resolve(item, field)) for field in self.fields
+        ]
+        return signing.dumps([self.fields, values], salt=self.SALT)
+
+    def decode_cursor(self, cursor: str) -> List[Any]:
+        try:
+            fields, values = signing.loads(cursor, salt=self.SALT)
+        except (signing.BadSignature, TypeError, ValueError):
+            raise InvalidCursor("Invalid cursor")
+
+        if fields != self.fields or len(values) != len(fields):
+            raise InvalidCursor("Cursor does not match this list")
+        return [self._decode_value(value) for value in values]
+
+    def _after(self, values):
+        """(a, b, c) after (x, y, z): a>x | a=x & b>y | a=x & b=y & c>z"""
+        condition = Q()
+        for position, ordering in enumerate(self.ordering):
+            lookup = "lt" if ordering.startswith("-") else "gt"
+            equal = {self.fields[i]: values[i] for i in range(position)}
+            condition |= Q(
+                **equal, **{f"{self.fields[position]}__{lookup}": values[position]}
+            )
+        return condition
+
+    @staticmethod
+    def _resolve(item, field):
+        value = item
+        for part in field.split("__"):
+            value = getattr(value, part)
+        return value
+
+    @staticmethod
+    def _encode_value(value):
+        if isinstance(value, datetime):
+            return {"dt": value.isoformat()}
+        return value
+
+    @staticmethod
+    def _decode_value(value):
+        if isinstance(value, dict):
+            parsed = parse_datetime(value.get("dt") or "")
+            if parsed is None:
+                raise InvalidCursor("Invalid cursor")
+            return parsed
+        return value
@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+import redis
+
+from django.conf import settings
+
+
+class RedisClient:
+    """Shared connection to the live-state Redis database.
+
+    The Django cache API covers plain key/value caching. Data structures it
+    can't express (hashes, sets, sorted sets, scripts) go through this client.
+    """
+
+    _client = None
+
+    @classmethod
+    def get(cls) -> redis.Redis:
+        """Return a process-wide client backed by a connection pool"""
+        if cls._client is None:
+            cls._client = redis.Redis.from_url(
+                settings.REDIS_URL_STATE,
+                decode_responses=True,
+                socket_timeout=1,
+                socket_connect_timeout=1,
+            )
+        return cls._client
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+import random
+import time
+import uuid
+from typing import Any, Callable, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+from ..logger.service import Logger
+
+logger = Logger(app_name="stale_cache")
+
+
+class StaleCache:
+    """Cached computations that don't stampede when they expire.
+
+    Every entry has a soft and a hard expiry. Until the soft expiry the
+    value is fresh. Between the soft and the hard expiry the value is stale:
+    one caller takes a lock (``cache.add``, a ``SET NX`` on Redis) and
+    recomputes it while everyone else keeps getting the stale value. After
+    the hard expiry the entry is gone; callers that lose the lock race wait
+    briefly for the winner instead of recomputing the same thing.
+
+    Soft expiries are jittered so entries written together don't expire
+    together.
+    """
+
+    LOCK_KEY = "{key}:lock"
+    POLL_INTERVAL = 0.05
+
+    def __init__(self, backend=None):
+        self.cache = backend or cache
+
+    def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Any],
+        timeout: int,
+        stale_timeout: Optional[int] = None,
+    ) -> Any:
+        """Return the cached value of ``key``, computing it when needed"""
+        entry = self.cache.get(key)
+
+        if entry is not None:
+            value, soft_expires_at = entry
+            if time.time() < soft_expires_at:
+                return value
+
+            # Stale: one caller refreshes, the rest serve the old value
+            token = self._acquire(key)
+            if token is None:
+                return value
+
+            try:
+                return self._refresh(key, compute, timeout, stale_timeout)
+            except Exception as e:
+                logger.error(f"Refreshing {key} failed, serving stale value: {str(e)}")
+                return value
+            finally:
+                self._release(key, token)
+
+        token = self._acquire(key)
+        if token is None:
+            entry = self._wait_for(key)
+            if entry is not None:
+                return entry[0]
+            # The lock holder is slow or died, compute without it
+            return self._refresh(key, compute, timeout, stale_timeout)
+
+        try:
+            return self._refresh(key, compute, timeout, stale_timeout)
+        finally:
+            self._release(key, token)
+
+    def delete(self, *keys: str) -> None:
+        """Drop entries so the next read recomputes them"""
+        self.cache.delete_many(keys)
+
+    def _refresh(self, key, compute, timeout, stale_timeout):
+        if stale_timeout is None:
+            stale_timeout = settings.CACHE_STALE_TIMEOUT
+
+        value = compute()
+
+        jitter = settings.CACHE_TIMEOUT_JITTER
+        fresh_for = timeout * (1 - random.uniform(0, jitter))
+        self.cache.set(
+            key,
+            (value, time.time() + fresh_for),
+            int(fresh_for) + stale_timeout,
+        )
+        return value
+
+    def _acquire(self, key):
+        token = uuid.uuid4().hex
+        lock_key = self.LOCK_KEY.format(key=key)
+        if self.cache.add(lock_key, token, settings.CACHE_LOCK_TIMEOUT):
+            return token
+        return None
+
+    def _release(self, key, token):
+        lock_key = self.LOCK_KEY.format(key=key)
+        # Don't drop a lock that expired and was taken by someone else
+        if self.cache.get(lock_key) == token:
+            self.cache.delete(lock_key)
+
+    def _wait_for(self, key):
+        deadline = time.monotonic() + settings.CACHE_LOCK_WAIT
+        while time.monotonic() < deadline:
+            time.sleep(self.POLL_INTERVAL)
+            entry = self.cache.get(key)
+            if entry is not None:
+                return entry
+        return None
@@ -0,0 +1,299 @@
+import struct
+import zlib
+
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import content_disposition_header, quote_etag
+
+from apps.system.services.file_stream.service import requested_range
+
+LOCAL_HEADER = struct.Struct("<IHHHHHIIIHH")
+DESCRIPTOR = struct.Struct("<IIII")
+DESCRIPTOR64 = struct.Struct("<IIQQ")
+CENTRAL_HEADER = struct.Struct("<IHHHHHHIIIHHHHHII")
+END64 = struct.Struct("<IQHHIIQQQQ")
+END64_LOCATOR = struct.Struct("<IIQI")
+END = struct.Struct("<IHHHHIIH")
+
+# Bit 3: CRC in a descriptor after the data, bit 11: UTF-8 names
+FLAGS = 0x0808
+VERSION = 20
+VERSION64 = 45
+LIMIT32 = 0xFFFFFFFF
+LIMIT16 = 0xFFFF
+
+
+class ZipStreamError(IOError):
+    """Raised when a file does not have the size the archive was laid out with"""
+
+
+class ZipEntry:
+    """A file of the archive, ``size`` bytes read through ``reader``.
+
+    ``reader(offset)`` yields the bytes from ``offset`` to the end in
+    chunks. ``crc32`` can be given if known from an earlier download,
+    ``on_crc32`` is called with it once computed.
+    """
+
+    def __init__(self, name, size, reader, modified, crc32=None, on_crc32=None):
+        self.name = name.encode()
+        self.size = size
+        self.reader = reader
+        self.modified = modified
+        self.crc32 = crc32
+        self.on_crc32 = on_crc32
+
+    @property
+    def zip64(self):
+        return self.size >= LIMIT32
+
+    def set_crc32(self, crc32):
+        self.crc32 = crc32
+        if self.on_crc32:
+            self.on_crc32(crc32)
+
+
+class ZipStream:
+    """A stored (uncompressed) ZIP archive written on the fly.
+
+    The layout depends only on the names and sizes of the entries, so the
+    length is known before any file is read and every byte has a fixed
+    offset: a ``Range`` request skips the files before it. CRCs are
+    computed while the data streams and written in a descriptor after each
+    file and in the central directory. Entries and archives past 4 GB use
+    the ZIP64 extensions.
+    """
+
+    CONTENT_TYPE = "application/zip"
+
+    def __init__(self, entries):
+        self.entries = list(entries)
+        self.offsets = []
+        self.parts = []
+        self.size = 0
+        self._layout()
+
+    def response(self, request, filename, etag):
+        """Streaming response of the archive or of the requested range"""
+        etag = quote_etag(etag)
+        conditional = get_conditional_response(request, etag=etag)
+        if conditional is not None:
+            return self._add_validators(conditional, etag)
+
+        byte_range = requested_range(request, self.size, etag)
+        if byte_range is False:
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{self.size}"
+            return self._add_validators(response, etag)
+
+        start, end = byte_range or (0, self.size - 1)
+        if request.method == "HEAD":
+            response = HttpResponse(content_type=self.CONTENT_TYPE)
+        else:
+            response = StreamingHttpResponse(
+                self.iter_range(start, end), content_type=self.CONTENT_TYPE
+            )
+
+        if byte_range:
+            response.status_code = 206
+            response["Content-Range"] = f"bytes {start}-{end}/{self.size}"
+        response["Content-Length"] = end - start + 1
+        response["Content-Disposition"] = content_disposition_header(True, filename)
+        return self._add_validators(response, etag)
+
+    def iter_range(self, start, end):
+        """Bytes ``start`` to ``end`` (inclusive) of the archive"""
+        offset = 0
+        for kind, length, value in self.parts:
+            part_start = offset
+            offset += length
+            if offset <= start:
+                continue
+            if part_start > end:
+                break
+
+            first = max(start - part_start, 0)
+            last = min(end + 1 - part_start, length)
+            if kind == "data":
+                yield from self._data(value, first, last)
+            else:
+                data = value() if callable(value) else value
+                yield data[first:last]
+
+    def _layout(self):
+        for entry in self.entries:
+            self.offsets.append(self.size)
+            header = self._local_header(entry)
+            descriptor_size = (DESCRIPTOR64 if entry.zip64 else DESCRIPTOR).size
+            self._add("bytes", len(header), header)
+            self._add("data", entry.size, entry)
+            self._add("bytes", descriptor_size, lambda e=entry: self._descriptor(e))
+
+        central_offset = self.size
+        central_size = sum(
+            len(self._central_header(entry, offset, 0))
+            for entry, offset in zip(self.entries, self.offsets)
+        )
+        self._add("bytes", central_size, self._central_directory)
+        end = self._end(central_offset, central_size)
+        self._add("bytes", len(end), end)
+
+    def _add(self, kind, length, value):
+        self.parts.append((kind, length, value))
+        self.size += length
+
+    def _data(self, entry, first, last):
+        """Bytes ``first`` to ``last`` (exclusive) of a file, computing the
+        CRC on the way if the range reaches the end of it"""
+        if entry.size == 0:
+            entry.set_crc32(0)
+            return
+
+        compute = entry.crc32 is None and last == entry.size
+        position = 0 if compute else first
+        crc32 = 0
+
+        for chunk in entry.reader(position):
+            chunk = chunk[: entry.size - position]
+            if compute:
+                crc32 = zlib.crc32(chunk, crc32)
+            if position + len(chunk) > first:
+                yield chunk[max(first - position, 0) : last - position]
+            position += len(chunk)
+            if position >= last:
+                break
+
+        if position < last:
+            raise ZipStreamError(
+                f"{entry.name.decode()} is shorter than {entry.size} bytes"
+            )
+        if compute:
+            entry.set_crc32(crc32)
+
+    def _crc32(self, entry):
+        """CRC of an entry whose data was not streamed in this range"""
+        if entry.crc32 is None:
+            for _ in self._data(entry, entry.size, entry.size):
+                pass
+        return entry.crc32
+
+    def _local_header(self, entry):
+        extra = b""
+        size = entry.size
+        if entry.zip64:
+            extra = struct.pack("<HHQQ", 1, 16, entry.size, entry.size)
+            size = LIMIT32
+        time, date = self._dos_time(entry.modified)
+        return (
+            LOCAL_HEADER.pack(
+                0x04034B50,
+                VERSION64 if entry.zip64 else VERSION,
+                FLAGS,
+                0,
+                time,
+                date,
+                0,
+                size,
+                size,
+                len(entry.name),
+                len(extra),
+            )
+            + entry.name
+            + extra
+        )
+
+    def _descriptor(self, entry):
+        crc32 = self._crc32(entry)
+        if entry.zip64:
+            return DESCRIPTOR64.pack(0x08074B50, crc32, entry.size, entry.size)
+        return DESCRIPTOR.pack(0x08074B50, crc32, entry.size, entry.size)
+
+    def _central_directory(self):
+        return b"".join(
+            self._central_header(entry, offset, self._crc32(entry))
+            for entry, offset in zip(self.entries, self.offsets)
+        )
+
+    def _central_header(self, entry, offset, crc32):
+        fields = []
+        size = entry.size
+        if entry.zip64:
+            fields += [entry.size, entry.size]
+            size = LIMIT32
+        if offset >= LIMIT32:
+            fields.append(offset)
+            offset = LIMIT32
+        extra = b""
+        if fields:
+            extra = struct.pack(f"<HH{len(fields)}Q", 1, 8 * len(fields), *fields)
+
+        version = VERSION64 if fields else VERSION
+        time, date = self._dos_time(entry.modified)
+        return (
+            CENTRAL_HEADER.pack(
+                0x02014B50,
+                version,
+                version,
+                FLAGS,
+                0,
+                time,
+                date,
+                crc32,
+                size,
+                size,
+                len(entry.name),
+                len(extra),
+                0,
+                0,
+                0,
+                0,
+                offset,
+            )
+            + entry.name
+            + extra
+        )
+
+    def _end(self, central_offset, central_size):
+        count = len(self.entries)
+        end = b""
+        if count >= LIMIT16 or central_offset >= LIMIT32 or central_size >= LIMIT32:
+            end64_offset = central_offset + central_size
+            end += END64.pack(
+                0x06064B50,
+                END64.size - 12,
+                VERSION64,
+                VERSION64,
+                0,
+                0,
+                count,
+                count,
+                central_size,
+                central_offset,
+            )
+            end += END64_LOCATOR.pack(0x07064B50, 0, end64_offset, 1)
+
+        return end + END.pack(
+            0x06054B50,
+            0,
+            0,
+            min(count, LIMIT16),
+            min(count, LIMIT16),
+            min(central_size, LIMIT32),
+            min(central_offset, LIMIT32),
+            0,
+        )
+
+    @staticmethod
+    def _dos_time(moment):
+        if moment.year < 1980:
+            return 0, (1 << 5) | 1
+        time = (moment.hour << 11) | (moment.minute << 5) | (moment.second // 2)
+        date = ((moment.year - 1980) << 9) | (moment.month << 5) | moment.day
+        return time, date
+
+    @staticmethod
+    def _add_validators(response, etag):
+        response["Accept-Ranges"] = "bytes"
+        response["ETag"] = etag
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
@@ -1,11 +1,14 @@
+import asyncio
 import json
 import traceback
 from datetime import datetime, timezone
 
 from channels.generic.websocket import AsyncWebsocketConsumer
+from django.conf import settings
 
 from apps.system.services import Logger
 from .services.event_dispatcher import EventDispatcher
+from .services.handlers.progress import ProgressHandler
 
 logger = Logger(app_name="websocket")
 
@@ -14,6 +17,11 @@ class WebSocketConsumer(AsyncWebsocketConsumer):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.event_dispatcher = EventDispatcher()
+        # Latest player position per lecture, persisted by _progress_loop
+        self.pending_progress = {}
+        self.progress_task = None
+        # Presence channel groups this connection subscribed to
+        self.presence_groups = set()
 
     async def connect(self):
         # Simple shared channel for all connections
@@ -23,6 +31,8 @@ class WebSocketConsumer(AsyncWebsocketConsumer):
             await self.channel_layer.group_add(self.room_group_name, self.channel_name)
             await self.accept()
 
+            self.progress_task = asyncio.create_task(self._progress_loop())
+
             # Send connection confirmation
             await self.send_response(
                 "connected", {"message": "Camera control connected"}
@@ -32,6 +42,17 @@ class WebSocketConsumer(AsyncWebsocketConsumer):
             logger.error(traceback.format_exc())
 
     async def disconnect(self, close_code):
+        if self.progress_task:
+            self.progress_task.cancel()
+        await ProgressHandler.flush(self)
+
+        for group in self.presence_groups:
+            try:
+                await self.channel_layer.group_discard(group, self.channel_name)
+            except Exception:
+                logger.error(traceback.format_exc())
+        self.presence_groups.clear()
+
         if hasattr(self, "room_group_name") and hasattr(self, "channel_name"):
             try:
                 await self.channel_layer.group_discard(
@@ -62,6 +83,12 @@ class WebSocketConsumer(AsyncWebsocketConsumer):
             logger.error(traceback.format_exc())
             await self.send_error("PROCESSING_ERROR", "Internal server error")
 
+    async def _progress_loop(self):
+        """Periodically persist coalesced player heartbeats"""
+        while True:
+            await asyncio.sleep(settings.PROGRESS_WS_FLUSH_INTERVAL)
+            await ProgressHandler.flush(self)
+
     async def handle_event(self, event_data):
         """Handle incoming events through dispatcher"""
         await self.event_dispatcher.dispatch(self, event_data)
@@ -7,11 +7,15 @@ WebSocket Services
 from .base import BaseEventHandler
 from .event_dispatcher import EventDispatcher
 from .handlers import (
+    PresenceHandler,
+    ProgressHandler,
     SystemHandler,
 )
 
 __all__ = [
     "EventDispatcher",
     "BaseEventHandler",
+    "PresenceHandler",
+    "ProgressHandler",
     "SystemHandler",
 ]
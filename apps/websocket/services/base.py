@@ -25,15 +25,26 @@ class BaseEventHandler(ABC):
         """Send event to current user"""
         await self.consumer.send_response(event_type, data)
 
-    async def send_to_room(self, event_type: str, data: Dict[str, Any] = None):
-        """Send event to all users in room"""
-        message = {
+    @staticmethod
+    def build_room_message(event_type: str, data: Dict[str, Any] = None):
+        """Build a group message handled by WebSocketConsumer.room_message"""
+        return {
             "type": "room_message",
             "event_type": event_type,
             "data": data,
             "timestamp": datetime.now(timezone.utc).isoformat(),
         }
-        await self.channel_layer.group_send(self.room_group_name, message)
+
+    async def send_to_room(self, event_type: str, data: Dict[str, Any] = None):
+        """Send event to all users in room"""
+        await self.send_to_group(self.room_group_name, event_type, data)
+
+    async def send_to_group(
+        self, group_name: str, event_type: str, data: Dict[str, Any] = None
+    ):
+        """Send event to all connections subscribed to a group"""
+        message = self.build_room_message(event_type, data)
+        await self.channel_layer.group_send(group_name, message)
 
     async def send_error(self, code: str, message: str):
         """Send error response"""
@@ -3,6 +3,8 @@ from typing import Dict, Type
 from apps.system.services import Logger
 
 from .base import BaseEventHandler
+from .handlers.presence import PresenceHandler
+from .handlers.progress import ProgressHandler
 from .handlers.system import SystemHandler
 
 logger = Logger(app_name="websocket")
@@ -15,6 +17,10 @@ class EventDispatcher:
         self.handlers: Dict[str, Type[BaseEventHandler]] = {
             # System events
             "ping": SystemHandler,
+            # Player events
+            "progress": ProgressHandler,
+            "presence_subscribe": PresenceHandler,
+            "presence_unsubscribe": PresenceHandler,
         }
 
     async def dispatch(self, consumer, event_data: Dict) -> bool:
@@ -35,7 +41,7 @@ class EventDispatcher:
             return False
 
         try:
-            handler = handler_class(consumer, user=None)
+            handler = handler_class(consumer, user=consumer.scope.get("user"))
 
             await handler.handle(event_data)
             return True
@@ -4,6 +4,8 @@
 WebSocket Event Handlers
 """
 
+from .presence import PresenceHandler
+from .progress import ProgressHandler
 from .system import SystemHandler
 
-__all__ = ["SystemHandler"]
+__all__ = ["PresenceHandler", "ProgressHandler", "SystemHandler"]
@@ -0,0 +1,58 @@
+from typing import Any, Dict
+
+from django.conf import settings
+
+from ..base import BaseEventHandler
+
+
+class PresenceHandler(BaseEventHandler):
+    """Subscriptions to live "now listening" changes.
+
+    Subscribed connections receive ``presence`` events with the joined,
+    left and moved listeners of the chosen scope: ``global``, one
+    ``topic`` or one ``lecture``.
+    """
+
+    async def handle(self, event_data: Dict[str, Any]):
+        """Handle presence subscription event"""
+        if not self.user or not self.user.is_authenticated:
+            await self.send_error("UNAUTHORIZED", "Authentication required")
+            return
+
+        from apps.lecture.services import PresenceBroadcaster
+
+        data = event_data.get("data") or {}
+
+        try:
+            group = PresenceBroadcaster.group_name(data.get("scope"), data.get("id"))
+        except (TypeError, ValueError):
+            group = None
+
+        if group is None:
+            await self.send_error(
+                "VALIDATION_ERROR", "Field 'scope' must be global, topic or lecture"
+            )
+            return
+
+        if event_data.get("type") == "presence_subscribe":
+            await self._subscribe(group)
+        else:
+            await self._unsubscribe(group)
+
+    async def _subscribe(self, group):
+        groups = self.consumer.presence_groups
+        if group not in groups:
+            if len(groups) >= settings.PRESENCE_MAX_SUBSCRIPTIONS:
+                await self.send_error("LIMIT_EXCEEDED", "Too many subscriptions")
+                return
+            await self.channel_layer.group_add(group, self.consumer.channel_name)
+            groups.add(group)
+
+        await self.send_to_user("presence_subscribed", {"group": group})
+
+    async def _unsubscribe(self, group):
+        if group in self.consumer.presence_groups:
+            await self.channel_layer.group_discard(group, self.consumer.channel_name)
+            self.consumer.presence_groups.discard(group)
+
+        await self.send_to_user("presence_unsubscribed", {"group": group})
@@ -0,0 +1,79 @@
+from typing import Any, Dict
+
+from channels.db import database_sync_to_async
+from rest_framework.exceptions import ValidationError
+from rest_framework.fields import BooleanField
+
+from apps.system.services import Logger
+
+from ..base import BaseEventHandler
+
+logger = Logger(app_name="websocket")
+
+
+class ProgressHandler(BaseEventHandler):
+    """Player heartbeat handler.
+
+    Heartbeats are coalesced per connection: only the latest position of
+    each lecture is kept in ``consumer.pending_progress`` and persisted by
+    the consumer on an interval and on disconnect. Completions are persisted
+    right away so a later heartbeat can't swallow the listen count bump.
+    """
+
+    async def handle(self, event_data: Dict[str, Any]):
+        """Handle progress event"""
+        if not self.user or not self.user.is_authenticated:
+            await self.send_error("UNAUTHORIZED", "Authentication required")
+            return
+
+        data = event_data.get("data") or {}
+
+        try:
+            lecture_id = int(data["lecture_id"])
+            current_time = max(0.0, float(data.get("current_time", 0)))
+        except (KeyError, TypeError, ValueError):
+            await self.send_error(
+                "VALIDATION_ERROR",
+                "Fields 'lecture_id' and 'current_time' are required",
+            )
+            return
+
+        try:
+            completed = BooleanField().to_internal_value(data.get("completed", False))
+        except ValidationError:
+            await self.send_error(
+                "VALIDATION_ERROR", "Field 'completed' must be a boolean"
+            )
+            return
+
+        self.consumer.pending_progress[lecture_id] = (current_time, completed)
+
+        if completed:
+            await self.flush(self.consumer)
+
+    @classmethod
+    async def flush(cls, consumer):
+        """Persist coalesced positions of a connection"""
+        if not consumer.pending_progress:
+            return
+
+        pending, consumer.pending_progress = consumer.pending_progress, {}
+        user = consumer.scope.get("user")
+
+        try:
+            await database_sync_to_async(cls._persist)(user, pending)
+        except Exception as e:
+            logger.error(f"Error persisting websocket progress: {str(e)}")
+
+    @staticmethod
+    def _persist(user, pending):
+        from apps.lecture.models import Lecture
+        from apps.lecture.services import ProgressManager
+
+        manager = ProgressManager(user)
+        lectures = Lecture.objects.in_bulk(pending.keys())
+
+        for lecture_id, (current_time, completed) in pending.items():
+            lecture = lectures.get(lecture_id)
+            if lecture is not None:
+                manager.save(lecture, current_time, completed)
@@ -5,7 +5,7 @@ from channels.auth import AuthMiddlewareStack
 from channels.routing import ProtocolTypeRouter, URLRouter
 from django.core.asgi import get_asgi_application
 
-os.environ.setdefault("DJANGO_SETTINGS_MODULE", "camera.settings")
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "lecture.settings")
 
 
 def get_websocket_routes():
@@ -295,11 +295,13 @@ REDIS_PORT = env.int("REDIS_PORT", "6379")
 # DB 0 - Cache storage (Django cache framework)
 # DB 1 - Django Channels (WebSocket connections)
 # DB 2 - Celery (task broker and results)
+# DB 3 - Live state (progress write-behind buffer, listener presence)
 
 REDIS_URL_BASE = f"redis://{REDIS_HOST}:{REDIS_PORT}"
 REDIS_URL_DEFAULT = f"{REDIS_URL_BASE}/0"  # DB 0 - for cache
 REDIS_URL_CHANNELS = f"{REDIS_URL_BASE}/1"  # DB 1 - for Channels
 REDIS_URL_CELERY = f"{REDIS_URL_BASE}/2"  # DB 2 - for Celery
+REDIS_URL_STATE = f"{REDIS_URL_BASE}/3"  # DB 3 - for live state
 
 # ==============================================================================
 # CACHE CONFIGURATION
@@ -320,6 +322,58 @@ CACHE_TIMEOUT_MEDIUM = 300  # 5 minutes
 CACHE_TIMEOUT_LONG = 3600  # 1 hour
 CACHE_TIMEOUT_DAY = 86400  # 24 hours
 
+# Stale-while-revalidate (apps.system StaleCache)
+CACHE_STALE_TIMEOUT = CACHE_TIMEOUT_MEDIUM  # serve stale this long after expiry
+CACHE_TIMEOUT_JITTER = 0.1  # expire up to 10% early
+CACHE_LOCK_TIMEOUT = 10  # seconds a refresh may hold the lock
+CACHE_LOCK_WAIT = 2  # seconds a cold miss waits for another worker
+
+# Random sampling pools, dropped on catalog changes
+CATALOG_POOL_TIMEOUT = CACHE_TIMEOUT_DAY
+
+# Per-topic navigation index, dropped when lectures change
+TOPIC_INDEX_TIMEOUT = CACHE_TIMEOUT_DAY
+
+# Browser cache lifetime of lecture audio, revalidated by ETag afterwards
+AUDIO_CACHE_MAX_AGE = CACHE_TIMEOUT_DAY
+
+# CRCs of lecture files for topic ZIP downloads, keyed by content hash
+TOPIC_ARCHIVE_CRC_TIMEOUT = 30 * CACHE_TIMEOUT_DAY
+
+# Threads reading duration, seek table and waveform of uploads during import
+LECTURE_IMPORT_WORKERS = env.int("LECTURE_IMPORT_WORKERS", default=4)
+
+# Optional packaging after import: cut MP3s into segments with an HLS playlist
+AUDIO_SEGMENTING = env.bool("AUDIO_SEGMENTING", default=False)
+AUDIO_SEGMENT_DURATION = 10  # seconds
+
+# Waveform peaks computed at import, drawn on the player progress bar.
+# MP3GainDecoder reads MP3 headers only, FFmpegDecoder decodes any format.
+WAVEFORM_DECODER = env.str(
+    "WAVEFORM_DECODER",
+    default="apps.lecture.services.waveform.service.MP3GainDecoder",
+)
+WAVEFORM_BUCKETS = 1000
+# Browser cache lifetime of a waveform, its URL changes with the audio
+WAVEFORM_CACHE_MAX_AGE = 365 * CACHE_TIMEOUT_DAY
+
+# On-device audio cache of the player (Cache Storage), LRU evicted past this
+PLAYER_AUDIO_CACHE_BYTES = env.int(
+    "PLAYER_AUDIO_CACHE_BYTES", default=500 * 1024 * 1024
+)
+
+# Hand media transfers to the front proxy: "" (Django streams the file),
+# "accel" (nginx X-Accel-Redirect) or "sendfile" (X-Sendfile)
+MEDIA_OFFLOAD = env.str("MEDIA_OFFLOAD", default="")
+# Internal proxy location aliased to MEDIA_ROOT, for "accel"
+MEDIA_OFFLOAD_LOCATION = env.str("MEDIA_OFFLOAD_LOCATION", default="/protected-media/")
+
+# Anonymous catalog pages, keyed by the catalog version
+CATALOG_PAGE_TIMEOUT = CACHE_TIMEOUT_DAY
+
+# Cards per page of keyset paginated lists
+LIST_PAGE_SIZE = 30
+
 # ==============================================================================
 # CELERY CONFIGURATION
 # ==============================================================================
@@ -343,6 +397,40 @@ CELERY_TASK_ACKS_LATE = True
 # Beat scheduler timezone settings
 CELERY_BEAT_SCHEDULE_FILENAME = "celerybeat-schedule"
 
+CELERY_BEAT_SCHEDULE = {
+    "flush-progress-buffer": {
+        "task": "apps.lecture.tasks.flush_progress_buffer",
+        "schedule": env.int("PROGRESS_FLUSH_INTERVAL", default=10),
+    },
+    "sweep-listener-presence": {
+        "task": "apps.lecture.tasks.sweep_listener_presence",
+        "schedule": 30,
+    },
+    "flush-presence-broadcasts": {
+        "task": "apps.lecture.tasks.flush_presence_broadcasts",
+        "schedule": 2,
+    },
+}
+
+# ==============================================================================
+# LECTURE PROGRESS CONFIGURATION
+# ==============================================================================
+
+# Write-behind mode: heartbeats land in Redis and are flushed to the DB in bulk
+PROGRESS_WRITE_BEHIND = env.bool("PROGRESS_WRITE_BEHIND", default=False)
+PROGRESS_BUFFER_TTL = 3600  # Buffered entry lifetime in seconds
+PROGRESS_FLUSH_BATCH_SIZE = 1000  # Max entries written per flush statement
+PROGRESS_WS_FLUSH_INTERVAL = 15  # Seconds between WebSocket heartbeat saves
+
+# Max client events accepted by one /api/v1/sync/ request
+SYNC_MAX_EVENTS = 500
+
+# "Now listening" presence: a listener is live for this long after a heartbeat
+PRESENCE_TTL = 60
+PRESENCE_LIST_LIMIT = 50  # Max sessions shown on the now listening page
+PRESENCE_BROADCAST_THROTTLE_MS = 500  # Min interval between sends per group
+PRESENCE_MAX_SUBSCRIPTIONS = 5  # Presence groups one socket may join
+
 # ==============================================================================
 # DJANGO CHANNELS CONFIGURATION
 # ==============================================================================
@@ -359,8 +447,11 @@ CHANNEL_LAYERS = {
 
 # File upload limits
 DATA_UPLOAD_MAX_NUMBER_FILES = 2000
-FILE_UPLOAD_MAX_MEMORY_SIZE = 500 * 1024 * 1024
+# Larger uploads are spooled to temporary files instead of held in memory
+FILE_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024
 DATA_UPLOAD_MAX_MEMORY_SIZE = 500 * 1024 * 1024
 DATA_UPLOAD_MAX_NUMBER_FIELDS = 10000
 
+# Build identifier, change it on every deploy: it also versions the cached
+# anonymous catalog pages and their ETags
 STATIC_VERSION = env.str("STATIC_VERSION", "1.0.0")